@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Attachment index for the WordPress to Jekyll converter
+
+Maps WordPress attachments to their files in the media directory by ID, by
+parent post and by URL. URLs are normalized before they are used as keys, so
+every variant of an upload resolves with a single dict lookup:
+    
+    https://example.com/wp-content/uploads/2019/01/photo.jpg
+    http://www.example.com/wp-content/uploads/2019/01/photo-300x200.jpg?w=300
+    https://i0.wp.com/example.com/wp-content/uploads/2019/01/photo.jpg
+    https://example.files.wordpress.com/2019/01/photo-1024x768.jpg
+
+all share the base key 2019/01/photo.jpg. Hits and misses are counted so the
+converter can report how many images needed a media directory search.
+"""
+
+import re
+from collections import ChainMap
+from urllib.parse import urlparse, unquote
+
+# Photon CDN hosts, which put the origin host in front of the path
+CDN_HOST_PATTERN = re.compile(r'^i\d\.wp\.com$')
+
+# Size suffix WordPress appends to resized copies (photo-300x200.jpg), and
+# the suffix of originals it scaled down on upload (photo-scaled.jpg)
+SIZE_SUFFIX_PATTERN = re.compile(r'-(?:\d+x\d+|scaled)(?=\.[^./]+$)')
+
+UPLOADS_PREFIX = '/wp-content/uploads/'
+
+def url_keys(url):
+    """Return the (exact, base) keys of a media URL.
+    
+    The exact key is the upload path without scheme, host, query and the
+    uploads prefix; the base key additionally drops the size suffix.
+    """
+    parsed = urlparse(url)
+    path = unquote(parsed.path)
+    
+    # i0.wp.com/example.com/wp-content/... serves example.com/wp-content/...
+    if CDN_HOST_PATTERN.match(parsed.netloc.lower()):
+        path = '/' + path.lstrip('/').partition('/')[2]
+    
+    if UPLOADS_PREFIX in path:
+        path = path.split(UPLOADS_PREFIX, 1)[1]
+    exact = path.lstrip('/')
+    return exact, SIZE_SUFFIX_PATTERN.sub('', exact)
+
+class AttachmentIndex:
+    def __init__(self):
+        """Create an empty index."""
+        # Attachment ID to media path
+        self.by_id = {}
+        
+        # Normalized URL key to media path
+        self.by_url = {}
+        
+        # Parent post ID to list of attachment IDs
+        self.by_parent = {}
+        
+        self.hits = 0
+        self.misses = 0
+    
+    def add_child(self, parent_id, attachment_id):
+        """Record attachment_id as attached to the post parent_id."""
+        self.by_parent.setdefault(parent_id, []).append(attachment_id)
+    
+    def children(self, post_id):
+        """Return the IDs of the attachments of a post."""
+        return self.by_parent.get(post_id, [])
+    
+    def has_children(self, post_id):
+        """Check whether a post has any attachments."""
+        return post_id in self.by_parent
+    
+    def add(self, attachment_id, url, path):
+        """Map an attachment ID and its URL (and every size of it) to a media path."""
+        exact, base = url_keys(url)
+        self.by_id[attachment_id] = path
+        self.by_url[exact] = path
+        self.by_url.setdefault(base, path)
+    
+    def add_id(self, attachment_id, path):
+        """Map an attachment ID to a media path."""
+        self.by_id[attachment_id] = path
+    
+    def add_url(self, url, path):
+        """Map exactly this URL to a media path, e.g. a resized copy found on disk."""
+        self.by_url[url_keys(url)[0]] = path
+    
+    def get(self, attachment_id):
+        """Return the media path of an attachment ID, or None."""
+        return self._count(self.by_id.get(attachment_id))
+    
+    def resolve(self, url, sizes=True):
+        """Return the media path for a URL, or None.
+        
+        The exact upload path wins over a different size of the same image,
+        which is only returned if sizes is true.
+        """
+        exact, base = url_keys(url)
+        path = self.by_url.get(exact)
+        if path is None and sizes:
+            path = self.by_url.get(base)
+        return self._count(path)
+    
+    def other_size(self, url):
+        """Return the media path of another size of the image at url, or None.
+        
+        Not counted: it follows a resolve() that already missed.
+        """
+        return self.by_url.get(url_keys(url)[1])
+    
+    def _count(self, path):
+        if path is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return path
+    
+    def overlay(self):
+        """Return a view whose additions stay local and do not touch this index.
+        
+        Lookups fall through to this index; counters start at zero.
+        """
+        view = AttachmentIndex()
+        view.by_id = ChainMap({}, self.by_id)
+        view.by_url = ChainMap({}, self.by_url)
+        view.by_parent = self.by_parent
+        return view
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for WordPressToJekyllConverter.group_consecutive_images
+
+Builds synthetic posts with thousands of nodes (paragraphs and runs of sibling
+images inside one container) and times the single-pass grouping against the
+previous implementation, which wrapped each run with insert_before/append
+while scanning the tree. Both must produce the same HTML.
+
+Usage:
+    python _scripts/benchmarks/bench_group_images.py [--sizes 1000,5000,20000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from wp_to_jekyll import WordPressToJekyllConverter
+
+WRAPPER_STYLE = 'text-align: left !important; margin: 20px 0; display: block !important;'
+
+def synthetic_post(nodes):
+    """Return HTML with roughly the given number of nodes.
+    
+    The content sits in one container, as with page builders and expanded
+    galleries: sections of a paragraph followed by a run of sibling images,
+    with a larger gallery every tenth section. Runs therefore share a parent
+    with thousands of other nodes, which is where position lookups add up.
+    """
+    parts = []
+    count = 0
+    section = 0
+    while count < nodes:
+        parts.append(f'<p>Section {section} with <strong>some</strong> text.</p>')
+        run_length = 12 if section % 10 == 0 else 3
+        parts.extend(f'<img src="/images/s{section}_{i}.jpg"/>' for i in range(run_length))
+        count += 3 + run_length
+        section += 1
+    return '<div class="entry-content">' + ''.join(parts) + '</div>'
+
+def reference_group_consecutive_images(soup):
+    """The previous implementation, kept for comparison."""
+    for parent in soup.find_all():
+        children = list(parent.children)
+        img_groups = []
+        current_group = []
+        
+        for child in children:
+            if hasattr(child, 'name') and child.name == 'img':
+                current_group.append(child)
+            else:
+                if len(current_group) > 1:
+                    img_groups.append(current_group)
+                current_group = []
+        
+        if len(current_group) > 1:
+            img_groups.append(current_group)
+        
+        for group in img_groups:
+            wrapper = soup.new_tag('div', style=WRAPPER_STYLE)
+            group[0].insert_before(wrapper)
+            for img in group:
+                wrapper.append(img)
+    
+    return soup
+
+def time_grouping(group, html, repeat):
+    """Return (best time in seconds, resulting HTML) of grouping html."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        soup = BeautifulSoup(html, 'html.parser')
+        start = time.perf_counter()
+        group(soup)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        result = str(soup)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark group_consecutive_images')
+    parser.add_argument('--sizes', default='1000,5000,20000', help='Comma-separated node counts')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size (best is reported)')
+    args = parser.parse_args()
+    
+    # Only the grouping method is exercised, so skip the converter's setup
+    converter = WordPressToJekyllConverter.__new__(WordPressToJekyllConverter)
+    
+    print(f"{'nodes':>8} {'previous (s)':>14} {'single-pass (s)':>16} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        html = synthetic_post(size)
+        old_time, old_html = time_grouping(reference_group_consecutive_images, html, args.repeat)
+        new_time, new_html = time_grouping(converter.group_consecutive_images, html, args.repeat)
+        if old_html != new_html:
+            print(f"❌ Output differs for {size} nodes")
+            sys.exit(1)
+        print(f"{size:>8} {old_time:>14.4f} {new_time:>16.4f} {old_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
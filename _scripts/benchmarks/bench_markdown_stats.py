@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark for markdown_stats.scan_markdown
+
+Builds large synthetic posts (front matter, headers, long paragraphs, lists,
+images, links and fenced code blocks with Markdown inside) and times the
+single-pass scanner against the separate regex scans check_drafts.py and
+validate_post.py each ran before, including the stripped copy made for the
+reading time. Counts the two approaches must agree on (words, reading words,
+lines) are compared; code blocks, headers and images differ by design, as
+the previous scans did not know about code fences.
+
+Usage:
+    python _scripts/benchmarks/bench_markdown_stats.py [--sizes 100,1000,10000] [--repeat 5]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from markdown_stats import body_start, scan_markdown
+
+FRONT_MATTER = """---
+title: A synthetic post for benchmarking
+date: 2025-01-01 10:00:00 +0100
+categories: [Benchmarks]
+tags: [python, markdown]
+---
+
+"""
+
+SECTION = """## Section {i}
+
+This is a paragraph with **bold**, _italic_ and `inline code` in section {i}. It links to
+[an external site](https://example.com/{i}) and to [another page](/about/) - nothing fancy.
+Sentences go on for a while so that paragraphs reach a realistic length for a blog post.
+
+![A photo from section {i}](/images/2025/01/photo-{i}.jpg)
+
+- first item of a list
+- second item with a [link](https://example.org/item/{i})
+* third item
+
+```bash
+# not a header: a shell comment in section {i}
+curl -s https://example.com/api/{i} | jq '.items[]'
+echo "![not an image](x.png)"
+```
+
+"""
+
+def synthetic_post(sections):
+    """Return a post with the given number of sections (about 15 lines each)."""
+    return FRONT_MATTER + ''.join(SECTION.format(i=i) for i in range(sections))
+
+def previous_draft_stats(content):
+    """The separate scans of check_drafts.analyze_draft, kept for comparison."""
+    return {
+        'words': len(content.split()),
+        'lines': len(content.splitlines()),
+        'images': len(re.findall(r'!\[.*?\]\(.+?\)', content)),
+        'code_blocks': len(re.findall(r'```', content)) // 2,
+    }
+
+def previous_post_stats(content):
+    """The separate scans of validate_post.analyze_post, kept for comparison."""
+    headers = re.findall(r'^#{1,6}\s+(.+)$', content, re.MULTILINE)
+    paragraphs = content.split('\n\n')
+    long_paragraphs = [p for p in paragraphs if len(p) > 500 and not p.startswith('```')]
+    code_languages = re.findall(r'```(\w+)?\n', content)
+    image_alts = re.findall(r'!\[(.*?)\]\(.+?\)', content)
+    
+    # Links were extracted once for the checks and once for the result
+    links = re.findall(r'\[.*?\]\((https?://[^\)]+)\)', content)
+    links = re.findall(r'\[.*?\]\((https?://[^\)]+)\)', content)
+    
+    text_content = re.sub(r'^---.*?---\n', '', content, flags=re.DOTALL)
+    text_content = re.sub(r'[#*`\[\]()_-]', '', text_content)
+    
+    return {
+        'text_words': len(text_content.split()),
+        'headers': len(headers),
+        'long_paragraphs': len(long_paragraphs),
+        'code_languages': code_languages,
+        'image_alts': image_alts,
+        'links': links,
+    }
+
+def draft_stats(content):
+    """The statistics check_drafts.analyze_draft collects now."""
+    stats = scan_markdown(content)
+    return {'words': stats.words, 'lines': stats.lines, 'images': len(stats.image_alts),
+            'code_blocks': len(stats.code_languages)}
+
+def post_stats(content):
+    """The statistics validate_post.analyze_post collects now."""
+    stats = scan_markdown(content, body_start(content))
+    return {'text_words': stats.text_words, 'headers': stats.headers, 'long_paragraphs': stats.long_paragraphs,
+            'code_languages': stats.code_languages, 'image_alts': stats.image_alts, 'links': stats.links}
+
+# Statistics the previous scans got right; the others changed with fence awareness
+COMPARED = ('words', 'lines', 'text_words')
+
+def time_stats(collect, content, repeat):
+    """Return (best time in seconds, result) of collecting the statistics of content."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = collect(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the single-pass Markdown scanner')
+    parser.add_argument('--sizes', default='100,1000,10000', help='Comma-separated section counts (about 15 lines each)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per size (best is reported)')
+    args = parser.parse_args()
+    
+    print(f"{'':>19} {'check_drafts':^31} {'validate_post':^31}")
+    print(f"{'sections':>8} {'size (KB)':>10} " + f"{'previous':>10} {'scanner':>10} {'speedup':>9} " * 2 + "(ms)")
+    for size in (int(s) for s in args.sizes.split(',')):
+        content = synthetic_post(size)
+        row = f"{size:>8} {len(content) / 1024:>10.0f}"
+        for script, previous, current in [('check_drafts', previous_draft_stats, draft_stats),
+                                          ('validate_post', previous_post_stats, post_stats)]:
+            old_time, old_stats = time_stats(previous, content, args.repeat)
+            new_time, new_stats = time_stats(current, content, args.repeat)
+            mismatched = [key for key in COMPARED if key in new_stats and new_stats[key] != old_stats[key]]
+            if mismatched:
+                print(f"❌ {script}: {', '.join(mismatched)} differ for {size} sections")
+                sys.exit(1)
+            row += f" {old_time * 1000:>10.2f} {new_time * 1000:>10.2f} {old_time / new_time:>8.1f}x"
+        print(row)
+
+if __name__ == "__main__":
+    main()
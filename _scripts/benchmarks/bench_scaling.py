@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the WordPress import and draft scripts
+
+For each size, generates a synthetic export and media tree with
+synthetic_wordpress.py in a temporary directory, then runs every entry point
+in a fresh interpreter against it: listing the export, converting it (with
+the DOM parser and with --stream, each into its own site) and checking and
+validating the converted drafts. Each entry point runs --repeat times; the
+first run is cold (empty caches, nothing converted yet), later runs are warm
+(media index, manifest and front matter index in place). Reports the wall
+time, the peak RSS of the process and the throughput in posts per second.
+
+Results are written as JSON (by default to .cache/benchmarks/) with the
+sizes, the environment and the commit they were measured on; pass
+--compare with an earlier results file to print the change of every
+measurement. The draft scripts keep their front matter index in the .cache/
+of this repository, as they always do; entries of the temporary sites are
+dropped the next time the index is saved.
+
+Usage:
+    python _scripts/benchmarks/bench_scaling.py [--sizes 100,1000,5000] [--attachments-per-post 4] [--repeat 2]
+                                                [--output results.json] [--compare previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fsutil import JEKYLL_ROOT, atomic_write_json, cache_dir
+from synthetic_wordpress import generate
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+RESULTS_VERSION = 1
+
+# (name, script and arguments, working directory, what the posts per second are counted on)
+# Placeholders are filled in per size; converters write into their own site directory
+ENTRY_POINTS = [
+    ('list_wordpress_posts', ['list_wordpress_posts.py', '--xml-file', '{xml}', '--format', 'ndjson'], '{work}', 'posts'),
+    ('wp_to_jekyll', ['wp_to_jekyll.py', '--xml-file', '{xml}', '--media-dir', '{media}',
+                      '--output-dir', '{site}/_drafts'], '{work}', 'posts'),
+    ('wp_to_jekyll --stream', ['wp_to_jekyll.py', '--xml-file', '{xml}', '--media-dir', '{media}',
+                               '--output-dir', '{work}/stream-site/_drafts', '--stream'], '{work}', 'posts'),
+    ('check_drafts', ['check_drafts.py', '--format', 'ndjson'], '{site}', 'published'),
+    ('validate_post --all', ['validate_post.py', '--all', '--format', 'ndjson', '--jobs', '1'], '{site}', 'published'),
+]
+
+def peak_rss_mb(usage):
+    """Return ru_maxrss of a child in MB (it is in KB on Linux, bytes on macOS)."""
+    return usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def run(command, cwd, log_file):
+    """Run a command with its output going to log_file; return (exit code, seconds, peak RSS in MB)."""
+    with open(log_file, 'ab') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 returns the resource usage of this child alone, unlike RUSAGE_CHILDREN
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, elapsed, peak_rss_mb(usage)
+
+def measure_size(posts, attachments, repeat, seed):
+    """Generate an export of the given size and run every entry point on it; return the results."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-scaling-') as tmp:
+        work = Path(tmp)
+        start = time.perf_counter()
+        stats = generate(work, posts, attachments, seed)
+        stats['generate_s'] = round(time.perf_counter() - start, 3)
+        # The converters do not create the posts directory
+        for site in ('site', 'stream-site'):
+            (work / site / '_drafts').mkdir(parents=True)
+        
+        values = {'xml': work / 'export.xml', 'media': work / 'media', 'site': work / 'site', 'work': work}
+        for name, arguments, cwd, counted in ENTRY_POINTS:
+            command = [sys.executable, str(SCRIPTS_DIR / arguments[0])] + [a.format(**values) for a in arguments[1:]]
+            for run_number in range(repeat):
+                log_file = work / f"{name.split()[0]}.log"
+                exit_code, elapsed, rss = run(command, cwd.format(**values), log_file)
+                results.append({
+                    'entry_point': name,
+                    'posts': posts,
+                    'attachments': attachments,
+                    'run': 'cold' if run_number == 0 else 'warm',
+                    'wall_s': round(elapsed, 3),
+                    'peak_rss_mb': round(rss, 1),
+                    'posts_per_s': round(stats[counted] / elapsed, 1),
+                    'exit_code': exit_code,
+                })
+                if exit_code != 0:
+                    tail = log_file.read_text(encoding='utf-8', errors='replace').splitlines()[-5:]
+                    print(f"❌ {name} exited with {exit_code} at {posts} posts:\n   " + '\n   '.join(tail))
+    return stats, results
+
+def git_commit():
+    """Return the commit of the working tree, or None outside a git checkout."""
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=JEKYLL_ROOT,
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def environment():
+    """Return what the results depend on besides the code."""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': git_commit(),
+    }
+
+def result_key(result):
+    return result['entry_point'], result['posts'], result['run']
+
+def print_results(results, previous=None):
+    """Print a table of results, with the change against previous results if given."""
+    baseline = {result_key(result): result for result in previous or []}
+    header = f"{'entry point':<22} {'posts':>6} {'run':<5} {'wall (s)':>9} {'peak RSS (MB)':>14} {'posts/s':>9}"
+    print(header + ('   vs. previous (wall, RSS)' if previous is not None else ''))
+    for result in results:
+        line = (f"{result['entry_point']:<22} {result['posts']:>6} {result['run']:<5} {result['wall_s']:>9.2f}"
+                f" {result['peak_rss_mb']:>14.1f} {result['posts_per_s']:>9.1f}")
+        before = baseline.get(result_key(result))
+        if before:
+            line += (f"   {(result['wall_s'] / before['wall_s'] - 1) * 100:+6.1f}%"
+                     f" {(result['peak_rss_mb'] / before['peak_rss_mb'] - 1) * 100:+6.1f}%")
+        elif previous is not None:
+            line += '   (new)'
+        if result['exit_code']:
+            line += f"   ❌ exit {result['exit_code']}"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the import and draft scripts on synthetic exports of several sizes')
+    parser.add_argument('--sizes', default='100,1000,5000', help='Comma-separated numbers of posts (default: 100,1000,5000)')
+    parser.add_argument('--attachments-per-post', type=float, default=4, help='Attachments per post (default: 4)')
+    parser.add_argument('--repeat', type=int, default=2, help='Runs per entry point; the first is cold (default: 2)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic exports (default: 0)')
+    parser.add_argument('--output', help='Results file (default: .cache/benchmarks/scaling-<time>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare with')
+    args = parser.parse_args()
+    
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)['results']
+    
+    started = datetime.now(timezone.utc)
+    exports = []
+    results = []
+    for posts in (int(size) for size in args.sizes.split(',')):
+        attachments = round(posts * args.attachments_per_post)
+        print(f"⏱️  {posts} posts, {attachments} attachments")
+        stats, size_results = measure_size(posts, attachments, args.repeat, args.seed)
+        exports.append(stats)
+        results.extend(size_results)
+    
+    print()
+    print_results(results, previous)
+    
+    output = Path(args.output) if args.output else cache_dir() / 'benchmarks' / f"scaling-{started:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write_json(output, {
+        'version': RESULTS_VERSION,
+        'started': started.isoformat(timespec='seconds'),
+        'environment': environment(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'exports': exports,
+        'results': results,
+    })
+    print(f"\n📄 Results: {output}")
+    
+    if any(result['exit_code'] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark for search_index.build_search_index
+
+Writes a synthetic corpus of posts (words drawn from a Zipf-like vocabulary,
+so a few words are in almost every post and most are rare) to a temporary
+directory, builds the sharded index and compares it with a single search
+JSON of the kind the theme downloads (title, URL, date, taxonomy and content
+of every post). Reports the build time, the total size of both, and the
+bytes a client fetches for sample queries: the manifest, the shards of the
+query words and the documents file of the first results.
+
+Usage:
+    python _scripts/benchmarks/bench_search_index.py [--posts 1000,10000] [--words 600] [--queries 50]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import MANIFEST_NAME, build_search_index, index_sizes, read_posts
+
+VOCABULARY_SIZE = 30000
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ber', 'dan', 'gel', 'hor', 'lin', 'mar', 'pol', 'ster']
+
+def synthetic_vocabulary(rng):
+    """Return VOCABULARY_SIZE made-up words and their cumulative Zipf weights."""
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    
+    cumulative = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        cumulative.append(total)
+    return words, cumulative
+
+def write_corpus(posts_dir, posts, words_per_post, rng):
+    """Write posts with front matter and paragraphs of synthetic words."""
+    words, cumulative = synthetic_vocabulary(rng)
+    tags = words[100:400]
+    for i in range(posts):
+        body = rng.choices(words, cum_weights=cumulative, k=words_per_post)
+        paragraphs = '\n\n'.join(' '.join(body[j:j + 60]) for j in range(0, len(body), 60))
+        post_tags = ', '.join(rng.sample(tags, 3))
+        date = f"20{10 + i % 15:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}"
+        (posts_dir / f"{date}-post-{i}.md").write_text(
+            f"---\ntitle: Post {i} {' '.join(body[:4])}\ndate: {date} 10:00:00 +0100\n"
+            f"categories: [Category{i % 7}]\ntags: [{post_tags}]\n---\n\n{paragraphs}\n",
+            encoding='utf-8')
+    return words, cumulative
+
+def monolithic_size(posts_dir):
+    """Return (raw, gzip) bytes of one search JSON with the content of every post."""
+    entries = []
+    documents, _ = read_posts(posts_dir)
+    for document, path in zip(documents, sorted(posts_dir.glob('*.md'))):
+        content = path.read_text(encoding='utf-8').split('---\n', 2)[2]
+        entries.append({**document, 'content': ' '.join(content.split())})
+    data = json.dumps(entries, ensure_ascii=False).encode('utf-8')
+    return len(data), len(gzip.compress(data))
+
+def query_bytes(output_dir, manifest, query):
+    """Return the bytes a client fetches to show the first results of a query."""
+    fetched = len(gzip.compress((output_dir / MANIFEST_NAME).read_bytes()))
+    results = None
+    for word in query:
+        shard = manifest['shards'].get(word[:manifest['prefix_length']])
+        if not shard:
+            return fetched
+        fetched += shard['bytes']
+        postings = json.loads(gzip.decompress((output_dir / shard['file']).read_bytes())).get(word, [])
+        documents, previous = set(), 0
+        for gap in postings[::2]:
+            previous += gap
+            documents.add(previous)
+        results = documents if results is None else results & documents
+    
+    files = {document // manifest['docs_per_file'] for document in sorted(results or [])[:10]}
+    return fetched + sum(manifest['docs'][i]['bytes'] for i in files)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sharded search index against one search JSON')
+    parser.add_argument('--posts', default='1000,10000', help='Comma-separated corpus sizes')
+    parser.add_argument('--words', type=int, default=600, help='Words per post')
+    parser.add_argument('--queries', type=int, default=50, help='Sample two-word queries per size')
+    args = parser.parse_args()
+    
+    print(f"{'posts':>7} {'build':>8} {'shards':>7} {'index (KB)':>11} {'largest':>8} "
+          f"{'single JSON raw/gz (KB)':>24} {'per query (KB)':>15}")
+    for size in (int(s) for s in args.posts.split(',')):
+        rng = random.Random(size)
+        with tempfile.TemporaryDirectory() as tmp:
+            posts_dir = Path(tmp) / '_posts'
+            output_dir = Path(tmp) / 'search'
+            posts_dir.mkdir()
+            words, cumulative = write_corpus(posts_dir, size, args.words, rng)
+            
+            start = time.perf_counter()
+            manifest = build_search_index(posts_dir, output_dir)
+            build_time = time.perf_counter() - start
+            
+            sizes = index_sizes(manifest)
+            raw, compressed = monolithic_size(posts_dir)
+            # Queries are two of the 2000 most common words, as people search for words that occur
+            queries = [rng.sample(words[:2000], 2) for _ in range(args.queries)]
+            per_query = sum(query_bytes(output_dir, manifest, query) for query in queries) / len(queries)
+        
+        print(f"{size:>7} {build_time:>7.2f}s {sizes['shards']:>7} {(sizes['shard_bytes'] + sizes['docs_bytes']) / 1024:>11.0f}"
+              f" {sizes['largest_shard'] / 1024:>6.0f}KB {raw / 1024:>12.0f} / {compressed / 1024:<9.0f} {per_query / 1024:>15.1f}")
+
+if __name__ == "__main__":
+    main()
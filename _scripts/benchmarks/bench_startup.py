@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for the _scripts entry points
+
+Imports each script in a fresh interpreter with -X importtime and reports the
+cumulative import time of the script module itself (everything it imports at
+module level), the wall time of the whole interpreter and the heaviest
+imports it pulls in. Interpreter start-up and site packages are outside the
+scripts' control and are excluded from the import time.
+
+Heavy packages (BeautifulSoup, requests, Pillow, ...) are imported on the
+code paths that use them, so they must not show up here. Pass --budget-ms to
+fail when an entry point exceeds a budget, e.g. in CI.
+
+Usage:
+    python _scripts/benchmarks/bench_startup.py [--repeat 5] [--budget-ms 50] [--json]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    'wp_to_jekyll',
+    'list_wordpress_posts',
+    'validate_post',
+    'check_drafts',
+    'process_draft',
+    'publish_post',
+    'blog',
+    'front_matter',
+    'tag_suggester',
+    'related_posts',
+    'search_index',
+    'build_image_derivatives',
+]
+
+def parse_importtime(stderr, module):
+    """Return (cumulative µs, {import: cumulative µs}) of module from -X importtime output.
+
+    Imports are listed after their dependencies, so the lines since the
+    previous top-level import are the ones module pulled in.
+    """
+    subtree = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = len(name) - len(name.lstrip()) - 1
+        if depth == 0:
+            if name.strip() == module:
+                return int(cumulative), subtree
+            subtree = {}
+        else:
+            subtree[name.strip()] = int(cumulative)
+    raise ValueError(f"{module} not found in -X importtime output")
+
+def measure(module, repeat):
+    """Import module in fresh interpreters; return the medians and heaviest imports."""
+    code = f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); import {module}"
+    import_times = []
+    wall_times = []
+    subtree = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                capture_output=True, text=True, check=True)
+        wall_times.append((time.perf_counter() - start) * 1000)
+        cumulative, subtree = parse_importtime(result.stderr, module)
+        import_times.append(cumulative / 1000)
+
+    # Attribute submodules to their top-level package
+    packages = {}
+    for name, cumulative in subtree.items():
+        package = name.split('.')[0]
+        packages[package] = max(packages.get(package, 0), cumulative)
+    heaviest = sorted(packages.items(), key=lambda item: -item[1])[:3]
+    
+    return {
+        'module': module,
+        'import_ms': round(statistics.median(import_times), 1),
+        'wall_ms': round(statistics.median(wall_times), 1),
+        'heaviest': {name: round(cumulative / 1000, 1) for name, cumulative in heaviest},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the start-up time of the _scripts entry points')
+    parser.add_argument('--repeat', type=int, default=5, help='Interpreters started per entry point (median is reported)')
+    parser.add_argument('--budget-ms', type=float, help='Fail if an entry point takes longer to import')
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON')
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat) for module in ENTRY_POINTS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'entry point':<26} {'import (ms)':>11} {'process (ms)':>13}  heaviest imports")
+        for result in results:
+            heaviest = ', '.join(f"{name} {ms:.0f}" for name, ms in result['heaviest'].items())
+            print(f"{result['module']:<26} {result['import_ms']:>11.1f} {result['wall_ms']:>13.1f}  {heaviest}")
+
+    if args.budget_ms is not None:
+        over = [r for r in results if r['import_ms'] > args.budget_ms]
+        for result in over:
+            print(f"❌ {result['module']} imports in {result['import_ms']:.1f} ms (budget {args.budget_ms:.0f} ms)")
+        if over:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
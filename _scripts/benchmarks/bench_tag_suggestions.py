@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark for tag_suggester.TermMatcher
+
+Builds synthetic vocabularies of one- to three-word terms and a long draft
+that mentions some of them, then times the Aho-Corasick matcher against the
+substring test per term process_draft.py ran before ("term in content" for
+every term). The matcher's time per draft should stay flat as the number of
+terms grows; the substring test grows with it. The substring test also finds
+terms inside longer words, which the matcher does not; both counts are shown.
+
+Usage:
+    python _scripts/benchmarks/bench_tag_suggestions.py [--terms 100,1000,10000] [--words 5000] [--repeat 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tag_suggester import TermMatcher, tokenize
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ber', 'dan', 'gel', 'hor', 'lin', 'mar', 'pol', 'ster']
+
+def synthetic_word(rng):
+    """Return a made-up word of two to four syllables."""
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+def synthetic_terms(count, rng):
+    """Return count distinct terms of one to three made-up words."""
+    terms = set()
+    while len(terms) < count:
+        terms.add(' '.join(synthetic_word(rng) for _ in range(rng.choice((1, 1, 1, 2, 3)))))
+    return sorted(terms)
+
+def synthetic_draft(terms, words, rng):
+    """Return a draft of about the given number of words, one in ten from a term."""
+    parts = []
+    while len(parts) < words:
+        parts.append(rng.choice(terms) if rng.random() < 0.1 else synthetic_word(rng))
+    return ' '.join(parts)
+
+def substring_matches(terms, content):
+    """The previous keyword test: every term against the lowercased content."""
+    content_lower = content.lower()
+    return [term for term in terms if term in content_lower]
+
+def matcher_matches(matcher, content):
+    """The terms found by the automaton on word boundaries."""
+    return [matcher.terms[term_id] for term_id in matcher.count(tokenize(content))]
+
+def best_time(function, repeat):
+    """Return (best time in seconds, result) of calling function."""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Aho-Corasick tag matcher')
+    parser.add_argument('--terms', default='100,1000,10000', help='Comma-separated vocabulary sizes')
+    parser.add_argument('--words', type=int, default=5000, help='Words in the synthetic draft')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per size (best is reported)')
+    args = parser.parse_args()
+    
+    print(f"{'terms':>8} {'build':>9} {'substring':>10} {'matcher':>9} {'speedup':>8} {'found (substring/matcher)':>27}")
+    for size in (int(s) for s in args.terms.split(',')):
+        rng = random.Random(size)
+        terms = synthetic_terms(size, rng)
+        content = synthetic_draft(terms, args.words, rng)
+        
+        build_time, matcher = best_time(lambda: TermMatcher(terms), 1)
+        old_time, old_found = best_time(lambda: substring_matches(terms, content), args.repeat)
+        new_time, new_found = best_time(lambda: matcher_matches(matcher, content), args.repeat)
+        
+        missing = set(new_found) - set(old_found)
+        if missing:
+            print(f"❌ The matcher found terms that are not in the draft: {sorted(missing)[:5]}")
+            sys.exit(1)
+        
+        print(f"{size:>8} {build_time * 1000:>7.1f}ms {old_time * 1000:>8.2f}ms {new_time * 1000:>7.2f}ms"
+              f" {old_time / new_time:>7.1f}x {len(old_found):>14}/{len(new_found)}")
+
+if __name__ == "__main__":
+    main()
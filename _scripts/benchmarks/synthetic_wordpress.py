@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic WordPress export (WXR) and media tree
+
+Writes export.xml with the given number of posts and attachments, and a
+media/ directory laid out like a WordPress media export (YYYY/MM/file, plus
+some resized -300x200 copies), so the import scripts can be measured at any
+size. Posts have paragraphs, headers, lists, the occasional code block and
+external link, inline images of their attachments (full size, ?w= and
+-WxH variants), Jetpack tiled galleries, [gallery ids="..."] and plain
+[gallery] shortcodes, and a reference to an image that is not in the media
+tree. Some posts are drafts, and some attachments are missing from the media
+tree, as in real exports. The same arguments always produce the same files.
+
+Usage:
+    python _scripts/benchmarks/synthetic_wordpress.py --posts 1000 --attachments 4000 --output-dir /tmp/wxr [--seed 0]
+"""
+
+import argparse
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+SITE_URL = 'https://example.wordpress.com'
+MEDIA_URL = 'https://example.files.wordpress.com'
+
+WORDS = ('the and of to in is for with on that this from by at as are be it an we our you can '
+         'python jekyll blog post image gallery photo travel berlin leadership management team '
+         'software development automation design code data cloud customer project strategy '
+         'workshop meeting summer community decision value principle story idea system process').split()
+
+CATEGORIES = ['Business', 'Development', 'Leadership', 'Photography', 'Technology', 'Tools', 'Travel', 'Tutorials']
+TAGS = [f'tag-{i}' for i in range(200)]
+
+# One post in this many is a draft; one attachment in this many is not in the media tree
+DRAFT_EVERY = 10
+MISSING_EVERY = 50
+
+# One attachment in this many also has a resized copy in the media tree
+RESIZED_EVERY = 4
+
+# Attachments shown inline before the rest go into galleries
+INLINE_IMAGES = 2
+
+FIRST_POST_ID = 1000
+FIRST_DATE = datetime(2008, 1, 1, 9, 0, 0)
+
+HEADER = '''<?xml version="1.0" encoding="UTF-8" ?>
+<rss version="2.0"
+	xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
+	xmlns:content="http://purl.org/rss/1.0/modules/content/"
+	xmlns:wfw="http://wellformedweb.org/CommentAPI/"
+	xmlns:dc="http://purl.org/dc/elements/1.1/"
+	xmlns:wp="http://wordpress.org/export/1.2/"
+>
+<channel>
+	<title>Synthetic Blog</title>
+	<link>{site}</link>
+	<wp:wxr_version>1.2</wp:wxr_version>
+'''
+
+FOOTER = '''</channel>
+</rss>
+'''
+
+def sentence(rng, words=12):
+    """Return a sentence of random words."""
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + '.'
+
+def paragraph(rng):
+    """Return a paragraph of three to six sentences."""
+    return ' '.join(sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(3, 6)))
+
+def cdata(text):
+    """Wrap text in CDATA, splitting any ']]>' it contains."""
+    return '<![CDATA[' + text.replace(']]>', ']]]]><![CDATA[>') + ']]>'
+
+class Attachment:
+    def __init__(self, attachment_id, parent_id, date, name, in_media):
+        self.id = attachment_id
+        self.parent_id = parent_id
+        self.date = date
+        self.name = name
+        self.in_media = in_media
+    
+    @property
+    def folder(self):
+        return f"{self.date:%Y}/{self.date:%m}"
+    
+    @property
+    def url(self):
+        return f"{MEDIA_URL}/{self.folder}/{self.name}"
+    
+    def resized_url(self):
+        """URL of the 300x200 copy WordPress creates"""
+        stem, dot, extension = self.name.rpartition('.')
+        return f"{MEDIA_URL}/{self.folder}/{stem}-300x200.{extension}"
+
+def image_tag(attachment, variant):
+    """Return the <img> WordPress writes for an attachment, in one of three sizes."""
+    if variant == 0:
+        src = attachment.url
+    elif variant == 1:
+        src = f"{attachment.url}?w=300"
+    else:
+        src = attachment.resized_url()
+    img = f'<img class="alignnone size-medium wp-image-{attachment.id}" src="{src}" alt="Photo {attachment.id}" width="300" height="200" />'
+    return f'<a href="{attachment.url}">{img}</a>' if variant else img
+
+def gallery(attachments, kind):
+    """Return a gallery of attachments as a Jetpack block or a shortcode."""
+    ids = ','.join(str(attachment.id) for attachment in attachments)
+    if kind == 0:
+        return ('<!-- wp:jetpack/tiled-gallery {"columnWidths":[["50","50"]],"ids":[' + ids + '],"roundedCorners":0} /-->\n'
+                '<div class="wp-block-jetpack-tiled-gallery aligncenter is-style-rectangular"></div>\n'
+                '<!-- /wp:jetpack/tiled-gallery -->')
+    if kind == 1:
+        return f'[gallery ids="{ids}" columns="3"]'
+    return '[gallery]'
+
+def post_content(rng, post_number, date, attachments):
+    """Return the HTML content of a post with its images and galleries."""
+    parts = [f'<p>{paragraph(rng)}</p>']
+    for i, attachment in enumerate(attachments[:INLINE_IMAGES]):
+        parts.append(image_tag(attachment, (post_number + i) % 3))
+        parts.append(f'<p>{paragraph(rng)}</p>')
+    
+    parts.append(f'<h2>{sentence(rng, 4)[:-1]}</h2>')
+    parts.append(f'<p>{paragraph(rng)} See <a href="https://example.org/{post_number}">this page</a>.</p>')
+    parts.append('<ul>' + ''.join(f'<li>{sentence(rng, 5)}</li>' for _ in range(3)) + '</ul>')
+    
+    rest = attachments[INLINE_IMAGES:]
+    if rest:
+        parts.append(gallery(rest, post_number % 3))
+    
+    if post_number % 5 == 0:
+        parts.append(f'<pre><code>for item in range({post_number}):\n    print(item)</code></pre>')
+    parts.append(f'<img src="{MEDIA_URL}/{date:%Y}/{date:%m}/missing-{post_number}.jpg" alt="" />')
+    parts.append(f'<h2>{sentence(rng, 3)[:-1]}</h2>')
+    parts.append(f'<p>{paragraph(rng)}</p>')
+    return '\n'.join(parts)
+
+def attachment_item(attachment):
+    """Return the <item> of an attachment."""
+    return f'''	<item>
+		<title>{escape(attachment.name)}</title>
+		<link>{SITE_URL}/?attachment_id={attachment.id}</link>
+		<wp:post_id>{attachment.id}</wp:post_id>
+		<wp:post_date>{attachment.date:%Y-%m-%d %H:%M:%S}</wp:post_date>
+		<wp:post_name>{escape(attachment.name.rpartition('.')[0])}</wp:post_name>
+		<wp:status>inherit</wp:status>
+		<wp:post_parent>{attachment.parent_id}</wp:post_parent>
+		<wp:post_type>attachment</wp:post_type>
+		<wp:attachment_url>{attachment.url}</wp:attachment_url>
+	</item>
+'''
+
+def post_item(rng, post_id, post_number, date, attachments):
+    """Return the <item> of a post."""
+    title = sentence(rng, rng.randint(3, 8))[:-1] + f' & more {post_number}'
+    status = 'draft' if post_number % DRAFT_EVERY == DRAFT_EVERY - 1 else 'publish'
+    taxonomy = [f'\t\t<category domain="category" nicename="{category.lower()}">{cdata(category)}</category>'
+                for category in rng.sample(CATEGORIES, rng.randint(1, 2))]
+    taxonomy += [f'\t\t<category domain="post_tag" nicename="{tag}">{cdata(tag)}</category>'
+                 for tag in rng.sample(TAGS, rng.randint(1, 5))]
+    return f'''	<item>
+		<title>{escape(title)}</title>
+		<link>{SITE_URL}/{date:%Y/%m/%d}/post-{post_number}/</link>
+		<dc:creator>{cdata('author')}</dc:creator>
+		<content:encoded>{cdata(post_content(rng, post_number, date, attachments))}</content:encoded>
+		<excerpt:encoded>{cdata(sentence(rng, 10))}</excerpt:encoded>
+		<wp:post_id>{post_id}</wp:post_id>
+		<wp:post_date>{date:%Y-%m-%d %H:%M:%S}</wp:post_date>
+		<wp:post_name>post-{post_number}</wp:post_name>
+		<wp:status>{status}</wp:status>
+		<wp:post_parent>0</wp:post_parent>
+		<wp:post_type>post</wp:post_type>
+{chr(10).join(taxonomy)}
+	</item>
+'''
+
+def generate(output_dir, posts, attachments, seed=0, image_bytes=2048):
+    """Write export.xml and media/ to output_dir; return counts of what was generated
+    
+    Attachments are spread over the posts round-robin and dated like their
+    post. Image files hold random bytes, not real images: the converter only
+    copies them.
+    """
+    rng = random.Random(seed)
+    output_dir = Path(output_dir)
+    media_dir = output_dir / 'media'
+    media_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Posts are a day and a few hours apart, so the dates spread over years
+    dates = [FIRST_DATE + timedelta(days=i, hours=i % 11) for i in range(posts)]
+    by_post = [[] for _ in range(posts)]
+    for i in range(attachments if posts else 0):
+        post_number = i % posts
+        extension = 'png' if i % 7 == 0 else 'jpg'
+        attachment = Attachment(FIRST_POST_ID + posts + i, FIRST_POST_ID + post_number, dates[post_number],
+                                f'photo-{i}.{extension}', i % MISSING_EVERY != MISSING_EVERY - 1)
+        by_post[post_number].append(attachment)
+    
+    stats = {'posts': posts, 'published': 0, 'attachments': 0, 'media_files': 0, 'galleries': 0}
+    with open(output_dir / 'export.xml', 'w', encoding='utf-8') as xml:
+        xml.write(HEADER.format(site=SITE_URL))
+        for post_number in range(posts):
+            post_attachments = by_post[post_number]
+            for attachment in post_attachments:
+                xml.write(attachment_item(attachment))
+                stats['attachments'] += 1
+                if not attachment.in_media:
+                    continue
+                folder = media_dir / attachment.folder
+                folder.mkdir(parents=True, exist_ok=True)
+                data = rng.randbytes(image_bytes)
+                (folder / attachment.name).write_bytes(data)
+                stats['media_files'] += 1
+                if attachment.id % RESIZED_EVERY == 0:
+                    (folder / Path(attachment.resized_url()).name).write_bytes(data[:image_bytes // 4])
+                    stats['media_files'] += 1
+            
+            xml.write(post_item(rng, FIRST_POST_ID + post_number, post_number, dates[post_number], post_attachments))
+            if post_number % DRAFT_EVERY != DRAFT_EVERY - 1:
+                stats['published'] += 1
+            if len(post_attachments) > INLINE_IMAGES:
+                stats['galleries'] += 1
+        xml.write(FOOTER)
+    
+    stats['export_bytes'] = (output_dir / 'export.xml').stat().st_size
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic WordPress export and media tree')
+    parser.add_argument('--posts', type=int, default=100, help='Number of posts (default: 100)')
+    parser.add_argument('--attachments', type=int, help='Number of attachments (default: four per post)')
+    parser.add_argument('--output-dir', required=True, help='Where to write export.xml and media/')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--image-bytes', type=int, default=2048, help='Size of each media file (default: 2048)')
+    args = parser.parse_args()
+    
+    attachments = args.attachments if args.attachments is not None else args.posts * 4
+    stats = generate(args.output_dir, args.posts, attachments, args.seed, args.image_bytes)
+    print(f"✅ {stats['posts']} posts ({stats['published']} published), {stats['attachments']} attachments, "
+          f"{stats['media_files']} media files, {stats['galleries']} galleries")
+    print(f"📄 {Path(args.output_dir) / 'export.xml'} ({stats['export_bytes'] / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
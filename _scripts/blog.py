@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Blog authoring workflow in one command
+Usage: python _scripts/blog.py check
+       python _scripts/blog.py process _drafts/my-post.md
+       python _scripts/blog.py validate [--all] [--check-links] _drafts/my-post.md
+       python _scripts/blog.py publish _drafts/my-post.md
+       python _scripts/blog.py process validate publish _drafts/my-post.md
+       python _scripts/blog.py publish related _drafts/my-post.md
+
+Runs the same steps as check_drafts.py, process_draft.py, validate_post.py,
+publish_post.py and related_posts.py, but in one process: several commands in
+a row share the loaded drafts, so each file is read and its front matter
+parsed only once.
+The chain stops at the first command that fails, like `&&` in the shell.
+"""
+
+import argparse
+import sys
+
+from check_drafts import check_drafts
+from corpus import Corpus
+from front_matter import FrontMatterIndex
+from process_draft import process_draft
+from publish_post import POLICIES, publish_post, publish_posts
+from related_posts import update_related_posts
+from validate_post import find_posts, validate_post, validate_posts
+
+COMMANDS = ('check', 'process', 'validate', 'publish', 'related')
+
+def run_check(files, args, corpus):
+    """List all drafts with their status"""
+    check_drafts(corpus)
+    return True
+
+def run_process(files, args, corpus):
+    """Turn Bear exports into Jekyll drafts"""
+    return all([process_draft(path, corpus) for path in files])
+
+def run_validate(files, args, corpus):
+    """Validate posts, with the detailed report for a single file"""
+    paths = find_posts(files, args.all)
+    
+    checker = None
+    if args.check_links:
+        # requests is only needed (and imported) for link checking
+        from link_checker import LinkChecker
+        checker = LinkChecker()
+    
+    if len(paths) == 1 and not args.all:
+        return validate_post(paths[0], checker, corpus)
+    return validate_posts(paths, quiet=args.quiet, checker=checker, corpus=corpus)
+
+def run_publish(files, args, corpus):
+    """Move drafts to _posts with a Jekyll filename, without asking for several drafts"""
+    if len(files) == 1:
+        return publish_post(files[0], corpus, overwrite=args.overwrite or 'ask', remove=args.remove_draft or 'ask')
+    return publish_posts(files, corpus, overwrite=args.overwrite or 'never', remove=args.remove_draft or 'never')
+
+def run_related(files, args, corpus):
+    """Update _data/related_posts.json for the posts that changed"""
+    return update_related_posts()
+
+RUNNERS = {
+    'check': run_check,
+    'process': run_process,
+    'validate': run_validate,
+    'publish': run_publish,
+    'related': run_related,
+}
+
+def split_commands(words):
+    """Split the leading command names from the file arguments"""
+    commands = []
+    for word in words:
+        if word not in COMMANDS:
+            break
+        commands.append(word)
+    return commands, words[len(commands):]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Blog authoring workflow: ' + ', '.join(COMMANDS),
+        usage='%(prog)s [options] command [command ...] [file ...]'
+    )
+    parser.add_argument('words', nargs='+', metavar='command|file', help=f"Commands to run in order ({', '.join(COMMANDS)}), then the files")
+    parser.add_argument('--all', action='store_true', help='validate: check every post in _drafts/ and _posts/')
+    parser.add_argument('--check-links', action='store_true', help='validate: check that external links are reachable')
+    parser.add_argument('--quiet', '-q', action='store_true', help='validate: only report errors for several files')
+    parser.add_argument('--overwrite', choices=POLICIES, help='publish: replace existing posts (default: ask for one draft, never for several)')
+    parser.add_argument('--remove-draft', choices=POLICIES, help='publish: remove published drafts (default: ask for one draft, never for several)')
+    
+    args = parser.parse_args(argv)
+    commands, files = split_commands(args.words)
+    if not commands:
+        parser.error(f"unknown command: {args.words[0]} (choose from {', '.join(COMMANDS)})")
+    
+    if not files and any(c in ('process', 'publish') or (c == 'validate' and not args.all) for c in commands):
+        parser.error("process, validate and publish need at least one file")
+    
+    corpus = Corpus(FrontMatterIndex())
+    try:
+        for index, command in enumerate(commands):
+            if index:
+                print(f"\n{'=' * 80}\n")
+            if not RUNNERS[command](files, args, corpus):
+                return 1
+        return 0
+    finally:
+        corpus.save_index()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Responsive Image Derivative Builder
+
+This script generates resized WebP/JPEG derivatives of the images in the
+Jekyll images directory and (optionally) rewrites the image references in
+_posts to offer them through srcset, so readers no longer download
+full-resolution photos to view 200px thumbnails. With several formats, images
+become a <picture> with a <source> per preferred format (WebP) and the JPEG
+derivatives in the srcset of the <img>, for browsers without WebP support.
+
+Derivatives are written to images/derived/ mirroring the original paths,
+e.g. images/2019-04-02/img_3367.jpg becomes
+images/derived/2019-04-02/img_3367-480w.webp. They are cached by the hash of
+their source, and only new or changed images are re-encoded, in parallel.
+Derivatives of deleted images, or of earlier settings, are deleted.
+
+Usage:
+    python _scripts/build_image_derivatives.py [--images-dir images] [--widths 480,960,1600] [--formats webp,jpeg] [--jobs N] [--rewrite-posts]
+
+Requirements:
+    - Pillow
+"""
+
+import argparse
+import html
+import importlib.util
+import os
+import re
+import sys
+from pathlib import Path
+
+from fsutil import JEKYLL_ROOT, atomic_write_json, atomic_write_text, cache_dir, hash_file, load_json
+
+DERIVED_DIR = 'derived'
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_FORMATS = ('webp', 'jpeg')
+FORMAT_EXTENSIONS = {'webp': '.webp', 'jpeg': '.jpg'}
+MIME_TYPES = {'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+
+# Format every browser decodes, used by the <img> of a <picture>
+FALLBACK_FORMAT = 'jpeg'
+QUALITY = 80
+
+# Bump to re-encode every derivative after changing the encoder settings
+CACHE_VERSION = 1
+
+# Sizes hint for images the WordPress converter displays as 200px thumbnails
+THUMBNAIL_SIZES = '200px'
+CONTENT_SIZES = '(max-width: 800px) 100vw, 800px'
+
+# Image references in posts: HTML img tags and Markdown images
+HTML_IMG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+HTML_SRC_PATTERN = re.compile(r'\bsrc=(["\'])(/images/[^"\']+)\1')
+MARKDOWN_IMG_PATTERN = re.compile(r'(!\[([^\]]*)\]\((/images/[^)\s]+)\))(\{:[^}]*\})?')
+
+def derivative_path(derived_root, rel_path, width, fmt):
+    """Return the path of one derivative of the image at rel_path."""
+    rel = Path(rel_path)
+    return derived_root / rel.parent / f"{rel.stem}-{width}w{FORMAT_EXTENSIONS[fmt]}"
+
+def encode_derivatives(source_path, derived_root, rel_path, widths, formats):
+    """Encode all derivatives of one image; return (source width, {format: [(width, path)]}).
+    
+    Widths at or above the source width are skipped, so small images only
+    get the derivatives that actually save bytes.
+    """
+    # Imported here so that only the workers pay for it
+    from PIL import Image, ImageOps
+    
+    outputs = {fmt: [] for fmt in formats}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        for width in sorted(widths):
+            if width >= image.width:
+                continue
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.LANCZOS)
+            
+            for fmt in formats:
+                target = derivative_path(derived_root, rel_path, width, fmt)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                frame = resized
+                if fmt == 'jpeg' and frame.mode not in ('RGB', 'L'):
+                    frame = frame.convert('RGB')
+                frame.save(target, fmt.upper(), quality=QUALITY, optimize=True)
+                outputs[fmt].append((width, target.relative_to(derived_root.parent).as_posix()))
+        return image.width, outputs
+
+def _build_one(job):
+    """Worker entry point: hash and encode one image and report the result."""
+    source_path, derived_root, rel_path, widths, formats = job
+    try:
+        sha256 = hash_file(source_path)
+        width, outputs = encode_derivatives(source_path, derived_root, rel_path, widths, formats)
+        return rel_path, sha256, width, outputs, None
+    except Exception as e:
+        return rel_path, None, None, None, str(e)
+
+class DerivativeBuilder:
+    def __init__(self, images_dir, widths=DEFAULT_WIDTHS, formats=DEFAULT_FORMATS, jobs=None):
+        """Initialize the builder for an images directory."""
+        self.images_dir = Path(images_dir)
+        self.derived_root = self.images_dir / DERIVED_DIR
+        self.widths = tuple(widths)
+        self.formats = tuple(formats)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_file = cache_dir(self.images_dir.parent) / 'image-derivatives.json'
+        self.cache = {}
+    
+    def settings_key(self):
+        """Return the encoder settings that derivatives depend on."""
+        return [CACHE_VERSION, list(self.widths), list(self.formats), QUALITY]
+    
+    def find_sources(self):
+        """Return all original images (relative paths), skipping derivatives."""
+        sources = []
+        for root, dirs, files in os.walk(self.images_dir):
+            rel_root = Path(root).relative_to(self.images_dir)
+            if rel_root == Path('.'):
+                dirs[:] = [d for d in dirs if d != DERIVED_DIR]
+            for name in files:
+                if Path(name).suffix.lower() in SOURCE_EXTENSIONS:
+                    sources.append((rel_root / name).as_posix())
+        return sorted(sources)
+    
+    def is_current(self, rel_path, entry):
+        """Check whether the cached derivatives of an image are still valid.
+        
+        Size and mtime are compared first; if they moved, the source hash
+        decides, so touching or re-copying an image does not re-encode it.
+        """
+        if not entry or entry.get('settings') != self.settings_key():
+            return False
+        
+        for outputs in entry['outputs'].values():
+            for _, output in outputs:
+                if not (self.images_dir / output).exists():
+                    return False
+        
+        stat = os.stat(self.images_dir / rel_path)
+        if (stat.st_size, stat.st_mtime_ns) == (entry['size'], entry['mtime_ns']):
+            return True
+        if hash_file(self.images_dir / rel_path) == entry['sha256']:
+            entry['size'], entry['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+            return True
+        return False
+    
+    def build(self):
+        """Encode derivatives for new or changed images; return the derivative map."""
+        self.cache = load_json(self.cache_file, {})
+        sources = self.find_sources()
+        
+        pending = [rel for rel in sources if not self.is_current(rel, self.cache.get(rel))]
+        print(f"🖼️  {len(sources)} images, {len(pending)} need new derivatives")
+        
+        from concurrent.futures import ProcessPoolExecutor
+        jobs = [(self.images_dir / rel, self.derived_root, rel, self.widths, self.formats) for rel in pending]
+        failed = 0
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            for rel_path, sha256, width, outputs, error in pool.map(_build_one, jobs):
+                if error:
+                    print(f"❌ {rel_path}: {error}")
+                    self.remove_outputs(self.cache.pop(rel_path, None))
+                    failed += 1
+                    continue
+                
+                # Derivatives of earlier settings (e.g. other widths) are not written again
+                self.remove_outputs(self.cache.get(rel_path), keep=outputs)
+                stat = os.stat(self.images_dir / rel_path)
+                self.cache[rel_path] = {
+                    'sha256': sha256,
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'width': width,
+                    'settings': self.settings_key(),
+                    'outputs': outputs,
+                }
+                print(f"✅ {rel_path}: {sum(len(o) for o in outputs.values())} derivatives")
+        
+        # Forget images that no longer exist, and delete their derivatives
+        removed = sum(self.remove_outputs(self.cache.pop(rel_path)) for rel_path in set(self.cache) - set(sources))
+        if removed:
+            print(f"🗑️  Removed {removed} derivatives of deleted images")
+        
+        atomic_write_json(self.cache_file, self.cache)
+        if failed:
+            print(f"⚠️  {failed} images could not be processed")
+        return self.cache
+    
+    def remove_outputs(self, entry, keep=None):
+        """Delete the derivatives of a cache entry that are not in keep; return how many were deleted."""
+        kept = {output for outputs in (keep or {}).values() for _, output in outputs}
+        removed = 0
+        for outputs in (entry or {}).get('outputs', {}).values():
+            for _, output in outputs:
+                # Only ever delete below images/derived/, whatever the cache says
+                if output in kept or not output.startswith(f"{DERIVED_DIR}/"):
+                    continue
+                try:
+                    (self.images_dir / output).unlink()
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+    
+    def picture_formats(self):
+        """Return (formats of the <source> elements, format of the <img> srcset)."""
+        fallback = FALLBACK_FORMAT if FALLBACK_FORMAT in self.formats else self.formats[0]
+        return [fmt for fmt in self.formats if fmt != fallback], fallback
+    
+    def srcset(self, image_url, fmt):
+        """Return the srcset value of one format for an /images/ URL, or None if there are no derivatives.
+        
+        The original stays the largest candidate, so wide screens still get
+        full resolution.
+        """
+        entry = self.cache.get(image_url[len('/images/'):])
+        if not entry:
+            return None
+        
+        candidates = entry['outputs'].get(fmt)
+        if not candidates:
+            return None
+        
+        srcset = [f"/images/{path} {width}w" for width, path in candidates]
+        srcset.append(f"{image_url} {entry['width']}w")
+        return ', '.join(srcset)
+
+def picture_sources(image_url, sizes, builder):
+    """Return the <source> elements of the preferred formats of an image."""
+    sources = []
+    for fmt in builder.picture_formats()[0]:
+        srcset = builder.srcset(image_url, fmt)
+        if srcset:
+            sources.append(f'<source type="{MIME_TYPES[fmt]}" srcset="{srcset}" sizes="{sizes}">')
+    return ''.join(sources)
+
+def rewrite_html_img(tag, builder):
+    """Add srcset/sizes to an HTML img tag that points into /images/, wrapped in <picture> if there are several formats."""
+    if 'srcset=' in tag:
+        return tag
+    
+    match = HTML_SRC_PATTERN.search(tag)
+    srcset = builder.srcset(match.group(2), builder.picture_formats()[1]) if match else None
+    if not srcset:
+        return tag
+    
+    sizes = THUMBNAIL_SIZES if re.search(r'width:\s*200px', tag) else CONTENT_SIZES
+    closing = '/>' if tag.endswith('/>') else '>'
+    img = f'{tag[:-len(closing)].rstrip()} srcset="{srcset}" sizes="{sizes}" {closing}'
+    sources = picture_sources(match.group(2), sizes, builder)
+    return f'<picture>{sources}{img}</picture>' if sources else img
+
+def rewrite_markdown_img(match, builder):
+    """Offer the derivatives of a Markdown image.
+    
+    With one format, a kramdown attribute list adds srcset/sizes; with
+    several, the image becomes an HTML <picture>, which Markdown cannot express.
+    """
+    if match.group(4):
+        return match.group(0)
+    
+    image_url = match.group(3)
+    srcset = builder.srcset(image_url, builder.picture_formats()[1])
+    if not srcset:
+        return match.group(0)
+    
+    sources = picture_sources(image_url, CONTENT_SIZES, builder)
+    if not sources:
+        return f'{match.group(1)}{{: srcset="{srcset}" sizes="{CONTENT_SIZES}"}}'
+    alt = html.escape(match.group(2))
+    return f'<picture>{sources}<img src="{image_url}" alt="{alt}" srcset="{srcset}" sizes="{CONTENT_SIZES}" /></picture>'
+
+def rewrite_posts(posts_dir, builder):
+    """Rewrite image references in all posts to use the derivatives."""
+    changed = 0
+    for post_path in sorted(Path(posts_dir).glob('*.md')):
+        with open(post_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        updated = HTML_IMG_PATTERN.sub(lambda m: rewrite_html_img(m.group(0), builder), content)
+        updated = MARKDOWN_IMG_PATTERN.sub(lambda m: rewrite_markdown_img(m, builder), updated)
+        
+        if updated != content:
+            atomic_write_text(post_path, updated)
+            print(f"📝 Updated image references: {post_path}")
+            changed += 1
+    
+    print(f"📝 {changed} posts updated")
+
+def main():
+    parser = argparse.ArgumentParser(description='Build responsive image derivatives')
+    parser.add_argument('--images-dir', default=str(JEKYLL_ROOT / 'images'), help='Jekyll images directory (default: images)')
+    parser.add_argument('--posts-dir', default=str(JEKYLL_ROOT / '_posts'), help='Jekyll posts directory (default: _posts)')
+    parser.add_argument('--widths', default=','.join(map(str, DEFAULT_WIDTHS)), help='Comma-separated derivative widths in pixels')
+    parser.add_argument('--formats', default=','.join(DEFAULT_FORMATS),
+                        help='Comma-separated output formats (webp, jpeg); jpeg is the <img> fallback, the others <picture> sources in this order')
+    parser.add_argument('--jobs', type=int, default=0, help='Number of worker processes (default: one per CPU)')
+    parser.add_argument('--rewrite-posts', action='store_true', help='Add srcset attributes to image references in posts')
+    
+    args = parser.parse_args()
+    
+    if importlib.util.find_spec('PIL') is None:
+        print("Required packages missing. Install with: pip install Pillow")
+        sys.exit(1)
+    
+    formats = [fmt.strip().lower() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMAT_EXTENSIONS]
+    if unknown:
+        parser.error(f"Unsupported format(s): {', '.join(unknown)}")
+    
+    builder = DerivativeBuilder(
+        images_dir=args.images_dir,
+        widths=[int(width) for width in args.widths.split(',')],
+        formats=formats,
+        jobs=args.jobs
+    )
+    builder.build()
+    
+    if args.rewrite_posts:
+        rewrite_posts(args.posts_dir, builder)
+
+if __name__ == "__main__":
+    main()
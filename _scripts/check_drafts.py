@@ -1,59 +1,60 @@
 #!/usr/bin/env python3
 """
 Check and list all drafts with their status
-Usage: python _scripts/check_drafts.py
+Usage: python _scripts/check_drafts.py [--watch] [--format text|json|ndjson]
 """
 
+import argparse
 import os
-import re
-import yaml
+import time
 from pathlib import Path
 from datetime import datetime
 
+from corpus import Corpus
+from dir_watcher import DirectoryWatcher
+from front_matter import FrontMatterIndex, parse_frontmatter
+from markdown_stats import scan_markdown
+from records import RecordWriter, add_format_argument
+
+# Fields a draft needs before it can be published
+REQUIRED_FIELDS = ['title', 'date', 'categories', 'tags']
+
+# Status of a draft: no front matter, some required fields missing, complete
+STATUS_LABELS = {
+    'needs_processing': "🔴 Needs Processing",
+    'missing_fields': "🟡 Missing",
+    'ready': "🟢 Ready to Publish",
+}
+
 def extract_frontmatter(content):
     """Extract front matter from content"""
-    if not content.startswith('---\n'):
-        return None
-    
-    end_idx = content.find('\n---\n', 4)
-    if end_idx == -1:
-        return None
-    
-    try:
-        fm_content = content[4:end_idx]
-        return yaml.safe_load(fm_content)
-    except yaml.YAMLError:
-        return None
+    return parse_frontmatter(content)[0]
 
-def analyze_draft(file_path):
+def analyze_draft(file_path, corpus=None):
     """Analyze a single draft file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        document = (corpus or Corpus()).get(file_path)
     except Exception as e:
         return {'error': str(e)}
     
-    frontmatter = extract_frontmatter(content)
+    content = document.content
+    frontmatter = document.frontmatter
     
-    # Basic stats
-    words = len(content.split())
-    lines = len(content.splitlines())
-    
-    # Check for images
-    images = len(re.findall(r'!\[.*?\]\(.+?\)', content))
-    
-    # Check for code blocks
-    code_blocks = len(re.findall(r'```', content)) // 2
+    # Basic stats, images and code blocks in one pass
+    stats = scan_markdown(content)
+    words = stats.words
+    lines = stats.lines
+    images = len(stats.image_alts)
+    code_blocks = len(stats.code_languages)
     
     # Status assessment
-    status = "🔴 Needs Processing"
-    if frontmatter:
-        required_fields = ['title', 'date', 'categories', 'tags']
-        if all(field in frontmatter for field in required_fields):
-            status = "🟢 Ready to Publish"
-        else:
-            missing = [f for f in required_fields if f not in frontmatter]
-            status = f"🟡 Missing: {', '.join(missing)}"
+    missing = [f for f in REQUIRED_FIELDS if f not in frontmatter] if frontmatter else []
+    if not frontmatter:
+        status = 'needs_processing'
+    elif missing:
+        status = 'missing_fields'
+    else:
+        status = 'ready'
     
     return {
         'frontmatter': frontmatter,
@@ -62,68 +63,72 @@ def analyze_draft(file_path):
         'images': images,
         'code_blocks': code_blocks,
         'status': status,
+        'missing': missing,
         'size': os.path.getsize(file_path)
     }
 
-def check_drafts():
-    """Main function to check all drafts"""
-    drafts_dir = Path('_drafts')
+def status_label(analysis):
+    """Render the status of an analysis for people"""
+    label = STATUS_LABELS[analysis['status']]
+    if analysis['missing']:
+        label += f": {', '.join(analysis['missing'])}"
+    return label
+
+def draft_record(draft_file, analysis):
+    """Return an analysis as a record for the structured formats"""
+    return {'type': 'draft', 'path': str(draft_file), **analysis}
+
+def print_draft(draft_file, analysis):
+    """Print the status of one draft with the next step"""
+    print(f"\n📄 {draft_file.name}")
+    print("-" * 50)
     
-    if not drafts_dir.exists():
-        print("📁 No _drafts directory found. Creating it...")
-        drafts_dir.mkdir()
-        print("✅ Created _drafts directory")
+    if 'error' in analysis:
+        print(f"❌ Error reading file: {analysis['error']}")
         return
     
-    draft_files = list(drafts_dir.glob('*.md'))
+    print(f"Status: {status_label(analysis)}")
+    print(f"📊 Stats: {analysis['words']} words, {analysis['lines']} lines, {analysis['size']} bytes")
+    
+    if analysis['images']:
+        print(f"🖼️  Images: {analysis['images']}")
+    
+    if analysis['code_blocks']:
+        print(f"💻 Code blocks: {analysis['code_blocks']}")
     
-    if not draft_files:
+    if analysis['frontmatter']:
+        fm = analysis['frontmatter']
+        if 'title' in fm:
+            print(f"📝 Title: {fm['title']}")
+        if 'date' in fm:
+            print(f"📅 Date: {fm['date']}")
+        if 'categories' in fm:
+            print(f"🏷️  Categories: {', '.join(fm.get('categories', []))}")
+        if 'tags' in fm:
+            print(f"🔖 Tags: {', '.join(fm.get('tags', []))}")
+    else:
+        print("⚠️  No front matter found")
+    
+    # Suggestions
+    if analysis['status'] == 'needs_processing':
+        print(f"💡 Next: python _scripts/process_draft.py {draft_file}")
+    elif analysis['status'] == 'missing_fields':
+        print(f"💡 Next: Edit front matter, then validate")
+    elif analysis['status'] == 'ready':
+        print(f"💡 Next: python _scripts/validate_post.py {draft_file}")
+
+def print_report(analyses):
+    """Print the status of all drafts, given as {path: analysis}"""
+    if not analyses:
         print("📝 No drafts found in _drafts directory")
         print("💡 Export your Bear notes as Markdown to _drafts/ to get started!")
         return
     
-    print(f"📚 Found {len(draft_files)} draft(s)")
+    print(f"📚 Found {len(analyses)} draft(s)")
     print("=" * 80)
     
-    for draft_file in sorted(draft_files):
-        print(f"\n📄 {draft_file.name}")
-        print("-" * 50)
-        
-        analysis = analyze_draft(draft_file)
-        
-        if 'error' in analysis:
-            print(f"❌ Error reading file: {analysis['error']}")
-            continue
-        
-        print(f"Status: {analysis['status']}")
-        print(f"📊 Stats: {analysis['words']} words, {analysis['lines']} lines, {analysis['size']} bytes")
-        
-        if analysis['images']:
-            print(f"🖼️  Images: {analysis['images']}")
-        
-        if analysis['code_blocks']:
-            print(f"💻 Code blocks: {analysis['code_blocks']}")
-        
-        if analysis['frontmatter']:
-            fm = analysis['frontmatter']
-            if 'title' in fm:
-                print(f"📝 Title: {fm['title']}")
-            if 'date' in fm:
-                print(f"📅 Date: {fm['date']}")
-            if 'categories' in fm:
-                print(f"🏷️  Categories: {', '.join(fm.get('categories', []))}")
-            if 'tags' in fm:
-                print(f"🔖 Tags: {', '.join(fm.get('tags', []))}")
-        else:
-            print("⚠️  No front matter found")
-        
-        # Suggestions
-        if analysis['status'] == "🔴 Needs Processing":
-            print(f"💡 Next: python _scripts/process_draft.py {draft_file}")
-        elif analysis['status'].startswith("🟡"):
-            print(f"💡 Next: Edit front matter, then validate")
-        elif analysis['status'] == "🟢 Ready to Publish":
-            print(f"💡 Next: python _scripts/validate_post.py {draft_file}")
+    for draft_file in sorted(analyses):
+        print_draft(draft_file, analyses[draft_file])
     
     print("\n" + "=" * 80)
     print("🛠️  Available commands:")
@@ -131,5 +136,96 @@ def check_drafts():
     print("   python _scripts/validate_post.py _drafts/filename.md")
     print("   python _scripts/publish_post.py _drafts/filename.md")
 
+def check_drafts(corpus=None, output_format='text'):
+    """Main function to check all drafts"""
+    drafts_dir = Path('_drafts')
+    
+    if output_format != 'text':
+        write_records(drafts_dir, corpus, output_format)
+        return
+    
+    if not drafts_dir.exists():
+        print("📁 No _drafts directory found. Creating it...")
+        drafts_dir.mkdir()
+        print("✅ Created _drafts directory")
+        return
+    
+    # Front matter of unchanged drafts comes from the index in .cache/
+    own_corpus = corpus is None
+    corpus = corpus or Corpus(FrontMatterIndex())
+    
+    analyses = {path: analyze_draft(path, corpus) for path in drafts_dir.glob('*.md')}
+    print_report(analyses)
+    
+    if own_corpus:
+        corpus.save_index()
+
+def write_records(drafts_dir, corpus, output_format):
+    """Write a record per draft as soon as it is analyzed"""
+    own_corpus = corpus is None
+    corpus = corpus or Corpus(FrontMatterIndex())
+    
+    with RecordWriter(output_format) as writer:
+        for path in sorted(drafts_dir.glob('*.md')):
+            writer.write(draft_record(path, analyze_draft(path, corpus)))
+    
+    if own_corpus:
+        corpus.save_index()
+
+def watch_drafts(interval=0.5):
+    """Show the status of all drafts and update it whenever a draft changes
+    
+    Results are kept in memory and only changed drafts are analyzed again.
+    """
+    drafts_dir = Path('_drafts')
+    drafts_dir.mkdir(exist_ok=True)
+    
+    corpus = Corpus(FrontMatterIndex())
+    analyses = {path: analyze_draft(path, corpus) for path in drafts_dir.glob('*.md')}
+    
+    def render(status):
+        # Clear the terminal and redraw from the cached analyses
+        print("\033[H\033[2J", end="")
+        print_report(analyses)
+        print(f"\n👀 {status}. Press Ctrl+C to stop.", flush=True)
+    
+    try:
+        with DirectoryWatcher(drafts_dir, interval=interval) as watcher:
+            render(f"Watching {drafts_dir}/ ({watcher.method})")
+            for changed in watcher.changes():
+                start = time.perf_counter()
+                for path in changed:
+                    corpus.discard(path)
+                    if path.exists():
+                        analyses[path] = analyze_draft(path, corpus)
+                    else:
+                        analyses.pop(path, None)
+                
+                names = ', '.join(sorted(path.name for path in changed))
+                elapsed = (time.perf_counter() - start) * 1000
+                render(f"Updated {names} in {elapsed:.0f} ms at {datetime.now():%H:%M:%S} ({watcher.method})")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    except FileNotFoundError as e:
+        print(f"\n❌ Stopped watching: {e}")
+    finally:
+        corpus.save_index()
+
+def main():
+    parser = argparse.ArgumentParser(description='Check and list all drafts with their status')
+    parser.add_argument('--watch', action='store_true', help='Keep running and update the list whenever a draft changes')
+    parser.add_argument('--interval', type=float, default=0.5, help='Seconds between checks when inotify is not available (default: 0.5)')
+    add_format_argument(parser)
+    
+    args = parser.parse_args()
+    
+    if args.watch and args.format != 'text':
+        parser.error("--watch only supports text output")
+    
+    if args.watch:
+        watch_drafts(args.interval)
+    else:
+        check_drafts(output_format=args.format)
+
 if __name__ == "__main__":
-    check_drafts()
\ No newline at end of file
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+In-memory model of the posts and drafts the blog scripts work on
+
+A Corpus reads each file at most once and keeps it as a Document, whose
+front matter is parsed at most once per version of its content (or not at
+all when a FrontMatterIndex already holds the front matter of the unchanged
+file). Writes go through the corpus, so a command that runs after another in
+the same process (e.g. blog.py process validate publish) sees the updated
+post without reading or parsing it again.
+"""
+
+import copy
+import os
+from pathlib import Path
+
+from front_matter import parse_frontmatter
+from fsutil import atomic_write_text
+
+class Document:
+    def __init__(self, path, content, index=None, stat_key=None):
+        """Create a document for a file (path may be None) with the given content
+        
+        With an index, stat_key is the (mtime, size) of the file the content
+        was read from.
+        """
+        self.path = Path(path) if path else None
+        self.content = content
+        self.index = index
+        self.stat_key = stat_key
+        self._parsed = None
+    
+    def update(self, content):
+        """Replace the content, dropping the parsed front matter"""
+        self.content = content
+        self.stat_key = None
+        self._parsed = None
+    
+    def _parse(self):
+        if self._parsed is None:
+            parsed = self.index.lookup(self.path, self.stat_key) if self.stat_key else None
+            if parsed is None:
+                parsed = parse_frontmatter(self.content)
+                if self.stat_key:
+                    self.index.store(self.path, self.stat_key, parsed)
+            frontmatter, error, offset = parsed
+            self._parsed = (frontmatter, error, self.content[offset:])
+        return self._parsed
+    
+    @property
+    def frontmatter(self):
+        """Parsed front matter (a copy callers may change), or None if missing or invalid"""
+        return copy.deepcopy(self._parse()[0])
+    
+    @property
+    def frontmatter_error(self):
+        """Why there is no front matter: MISSING_START, MISSING_END, the YAML error or None"""
+        return self._parse()[1]
+    
+    @property
+    def body(self):
+        """Content after the front matter (all content if there is none or it is invalid)"""
+        return self._parse()[2]
+
+class Corpus:
+    def __init__(self, index=None):
+        """Create an empty corpus; documents are loaded on first use
+        
+        Front matter is looked up in and added to index, if given.
+        """
+        self.documents = {}
+        self.index = index
+    
+    @staticmethod
+    def _key(path):
+        return os.path.abspath(path)
+    
+    def get(self, path):
+        """Return the document for path, reading the file only the first time"""
+        key = self._key(path)
+        if key not in self.documents:
+            stat_key = self.index.stat_key(path) if self.index else None
+            with open(path, 'r', encoding='utf-8') as f:
+                self.documents[key] = Document(path, f.read(), self.index, stat_key)
+        return self.documents[key]
+    
+    def discard(self, path):
+        """Forget the loaded document of path, so it is read again on next use"""
+        self.documents.pop(self._key(path), None)
+    
+    def glob(self, directory, pattern='*.md'):
+        """Return the documents of all files in directory matching pattern, sorted by path"""
+        return [self.get(path) for path in sorted(Path(directory).glob(pattern))]
+    
+    def write(self, path, content):
+        """Write content to path atomically and keep it as the current version of the document"""
+        atomic_write_text(path, content)
+        
+        key = self._key(path)
+        if key in self.documents:
+            self.documents[key].update(content)
+        else:
+            self.documents[key] = Document(path, content)
+        return self.documents[key]
+    
+    def remove(self, path):
+        """Delete a file and forget its document"""
+        os.remove(path)
+        self.documents.pop(self._key(path), None)
+        if self.index:
+            self.index.forget(path)
+    
+    def save_index(self):
+        """Write the front matter index back, if there is one"""
+        if self.index:
+            self.index.save()
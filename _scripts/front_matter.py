@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Front matter parsing shared by the blog scripts, with a persistent index
+Usage: python _scripts/front_matter.py [--tag TAG] [--category CATEGORY] [--missing FIELD] [path ...]
+
+Front matter is the YAML block between the leading '---' lines of a post. It
+is parsed with the libyaml CSafeLoader when available. FrontMatterIndex reads
+only the header of a file (up to the closing delimiter) and keeps the result
+in .cache/frontmatter.pickle keyed by path, modification time and size, so
+listing or filtering many posts only parses the files that changed since the
+last run.
+"""
+
+import argparse
+import os
+import pickle
+from pathlib import Path
+
+import yaml
+
+from fsutil import atomic_write_bytes, cache_dir
+
+# The libyaml loader parses front matter many times faster when available
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# The same for writing; its output matches yaml.dump for front matter values
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Reasons a post has no front matter (besides YAML errors)
+MISSING_START = 'missing start delimiter'
+MISSING_END = 'missing closing delimiter'
+
+# Characters read at a time while looking for the closing delimiter
+HEADER_CHUNK = 4096
+
+INDEX_NAME = 'frontmatter.pickle'
+
+# Bump when the format of the index entries changes
+INDEX_VERSION = 1
+
+# Directories listed when no paths are given
+POST_DIRS = ('_drafts', '_posts')
+
+def parse_frontmatter(content):
+    """Parse the front matter at the start of content into (front matter, error, body offset)
+    
+    The front matter is None if it is missing or invalid, and error tells why:
+    MISSING_START, MISSING_END or the YAML error message. The body starts at
+    body offset, which is 0 unless the front matter is valid.
+    """
+    if not content.startswith('---\n'):
+        return None, MISSING_START, 0
+    
+    end_idx = content.find('\n---\n', 4)
+    if end_idx == -1:
+        return None, MISSING_END, 0
+    
+    try:
+        return yaml.load(content[4:end_idx], Loader=YAML_LOADER), None, end_idx + 5
+    except yaml.YAMLError as e:
+        return None, str(e), 0
+
+def extract_frontmatter(content):
+    """Extract and parse front matter; return (front matter or None, body)"""
+    frontmatter, _, offset = parse_frontmatter(content)
+    return frontmatter, content[offset:]
+
+def dump_frontmatter(frontmatter):
+    """Serialize front matter into the block that starts a post, followed by an empty line"""
+    return "---\n" + yaml.dump(frontmatter, Dumper=YAML_DUMPER, default_flow_style=False, allow_unicode=True) + "---\n\n"
+
+def read_header(path):
+    """Read a post only as far as needed to parse its front matter"""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.read(HEADER_CHUNK)
+        if not header.startswith('---\n'):
+            return header[:4]
+        
+        start = 4
+        while True:
+            end_idx = header.find('\n---\n', start)
+            if end_idx != -1:
+                return header[:end_idx + 5]
+            
+            chunk = f.read(HEADER_CHUNK)
+            if not chunk:
+                return header
+            # The delimiter may straddle the chunk boundary
+            start = max(4, len(header) - 4)
+            header += chunk
+
+class FrontMatterIndex:
+    def __init__(self, cache_file=None):
+        """Load the index from cache_file (default: .cache/frontmatter.pickle)"""
+        self.cache_file = cache_file or cache_dir() / INDEX_NAME
+        
+        # Absolute path to ((mtime_ns, size), (front matter, error, body offset))
+        self.entries = self._load()
+        self.changed = False
+        self.hits = 0
+        self.misses = 0
+    
+    def _load(self):
+        # A missing, outdated or corrupt index is simply rebuilt
+        try:
+            with open(self.cache_file, 'rb') as f:
+                version, entries = pickle.load(f)
+        except Exception:
+            return {}
+        return entries if version == INDEX_VERSION else {}
+    
+    @staticmethod
+    def stat_key(path):
+        """Return the (mtime, size) an index entry of path is valid for"""
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def lookup(self, path, key):
+        """Return the indexed (front matter, error, body offset) of path, or None if stale"""
+        entry = self.entries.get(os.path.abspath(path))
+        if entry is None or entry[0] != key:
+            return None
+        self.hits += 1
+        return entry[1]
+    
+    def store(self, path, key, parsed):
+        """Remember the parse result of path as of key"""
+        self.entries[os.path.abspath(path)] = (key, parsed)
+        self.changed = True
+        self.misses += 1
+    
+    def forget(self, path):
+        """Drop the entry of a removed file"""
+        if self.entries.pop(os.path.abspath(path), None) is not None:
+            self.changed = True
+    
+    def get(self, path):
+        """Return (front matter, error, body offset) of a post, parsing its header only if it changed
+        
+        The front matter is shared with the index; copy it before changing it.
+        """
+        # Stat before reading, so a concurrent edit leaves a stale key behind
+        key = self.stat_key(path)
+        parsed = self.lookup(path, key)
+        if parsed is None:
+            parsed = parse_frontmatter(read_header(path))
+            self.store(path, key, parsed)
+        return parsed
+    
+    def save(self):
+        """Write the index back if it changed, dropping files that no longer exist"""
+        if not self.changed:
+            return
+        self.entries = {path: entry for path, entry in self.entries.items() if os.path.exists(path)}
+        atomic_write_bytes(self.cache_file, pickle.dumps((INDEX_VERSION, self.entries), protocol=pickle.HIGHEST_PROTOCOL))
+        self.changed = False
+
+def as_list(value):
+    """Return a categories or tags value as a list"""
+    if isinstance(value, list):
+        return value
+    return [value] if value else []
+
+def find_posts(paths):
+    """Expand directories into the posts they contain"""
+    posts = []
+    for path in paths or [d for d in POST_DIRS if Path(d).is_dir()]:
+        if Path(path).is_dir():
+            posts.extend(str(post) for post in sorted(Path(path).glob('*.md')))
+        else:
+            posts.append(path)
+    return posts
+
+def main():
+    parser = argparse.ArgumentParser(description='List posts by their front matter (indexed in .cache/)')
+    parser.add_argument('paths', nargs='*', help='Posts or directories (default: _drafts and _posts)')
+    parser.add_argument('--tag', help='Only list posts with this tag')
+    parser.add_argument('--category', help='Only list posts in this category')
+    parser.add_argument('--missing', metavar='FIELD', action='append', default=[], help='Only list posts without this field (repeatable)')
+    
+    args = parser.parse_args()
+    
+    index = FrontMatterIndex()
+    posts = find_posts(args.paths)
+    listed = 0
+    for path in posts:
+        try:
+            frontmatter, error, _ = index.get(path)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ {path}: {e}")
+            continue
+        
+        fm = frontmatter or {}
+        if args.tag and args.tag not in as_list(fm.get('tags')):
+            continue
+        if args.category and args.category not in as_list(fm.get('categories')):
+            continue
+        if any(field in fm for field in args.missing):
+            continue
+        
+        listed += 1
+        if error:
+            print(f"⚠️  {path}: no front matter ({error.splitlines()[0]})")
+        else:
+            print(f"📄 {path}  {fm.get('date', '')}  {fm.get('title', '')}")
+    
+    index.save()
+    print(f"\n📚 {listed} of {len(posts)} posts ({index.misses} parsed, {index.hits} from the index)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Filesystem helpers shared by the blog and migration scripts
+
+Provides the location of the local cache directory and atomic writes
+(temporary file in the same directory followed by a rename), so that an
+interrupted run never leaves a half-written post, cache or manifest behind.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+# Root of the Jekyll site (parent of _scripts)
+JEKYLL_ROOT = Path(__file__).resolve().parent.parent
+
+# Buffer size for copying and hashing files
+CHUNK_SIZE = 1024 * 1024
+
+def cache_dir(jekyll_root=None):
+    """Return the cache directory of a Jekyll site, creating it if needed."""
+    path = Path(jekyll_root or JEKYLL_ROOT) / '.cache'
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _default_mode():
+    """Return the permission bits a newly created file would get."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def atomic_write_bytes(path, data):
+    """Write bytes to path atomically."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, _default_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def atomic_write_text(path, text, encoding='utf-8'):
+    """Write text to path atomically."""
+    atomic_write_bytes(path, text.encode(encoding))
+
+def atomic_write_json(path, data):
+    """Serialize data as JSON and write it to path atomically."""
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, sort_keys=True))
+
+def load_json(path, default=None):
+    """Load a JSON file, returning default if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_file(source_path, target_path):
+    """Copy a file with its metadata like shutil.copy2; return its SHA-256.
+    
+    The data is hashed while it is copied, so callers that need the digest of
+    the copy do not have to read it a second time.
+    """
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            dst.write(chunk)
+    shutil.copystat(source_path, target_path)
+    return digest.hexdigest()
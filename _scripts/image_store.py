@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Content-addressed image store for the WordPress to Jekyll converter
+
+Stores every distinct image once under images/cas/<xx>/<digest><ext>, keyed
+by the SHA-256 of its content. The per-post paths the converter would have
+used (images/<YYYY-MM-DD>/<filename>) are recorded as aliases that resolve to
+the stored blob, so an upload embedded in several posts is kept only once and
+every post links to the same file.
+
+The alias index is kept in images/cas/.index.json (ignored by Jekyll); the
+digests of media files are cached by path, size and mtime so unchanged media
+is not hashed again.
+"""
+
+import os
+from pathlib import Path
+
+from fsutil import atomic_write_json, hash_file, load_json
+
+STORE_DIR = 'cas'
+INDEX_NAME = '.index.json'
+
+# Number of hex digits of the SHA-256 used in blob names
+DIGEST_LENGTH = 32
+
+class ImageStore:
+    def __init__(self, images_dir, cache_file):
+        """Create a store inside images_dir, caching media digests in cache_file."""
+        self.images_dir = Path(images_dir)
+        self.root = self.images_dir / STORE_DIR
+        self.index_file = self.root / INDEX_NAME
+        self.cache_file = Path(cache_file)
+        
+        # Per-post image path to blob path, both relative to images_dir
+        self.aliases = {}
+        
+        # Media file path to [size, mtime_ns, sha256]
+        self.digests = {}
+        
+        # Entries added since the last call to drain(), and how each blob was
+        # placed: blob path to (copy/reflink/hardlink/deduplicated/skipped, bytes written)
+        self.new_aliases = {}
+        self.new_digests = {}
+        self.new_blobs = {}
+        
+        # How the posts merged so far in this run placed each blob: written
+        # (copy/reflink/hardlink) if any of them wrote it
+        self.claimed = {}
+    
+    def load(self):
+        """Load the alias index and the digest cache."""
+        self.aliases = load_json(self.index_file, {})
+        self.digests = load_json(self.cache_file, {})
+        return self
+    
+    def save(self):
+        """Write the alias index and the digest cache atomically."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_write_json(self.index_file, self.aliases)
+        atomic_write_json(self.cache_file, self.digests)
+    
+    def digest(self, source_path):
+        """Return the SHA-256 of a media file, using the cache when it is unchanged."""
+        stat = os.stat(source_path)
+        key = str(source_path)
+        cached = self.digests.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        
+        sha256 = hash_file(source_path)
+        self.digests[key] = self.new_digests[key] = [stat.st_size, stat.st_mtime_ns, sha256]
+        return sha256
+    
+    def blob_path(self, source_path, alias):
+        """Return the blob path for source_path and record alias as pointing to it."""
+        sha256 = self.digest(source_path)
+        suffix = Path(source_path).suffix.lower()
+        blob = self.root / sha256[:2] / f"{sha256[:DIGEST_LENGTH]}{suffix}"
+        
+        blob_rel = blob.relative_to(self.images_dir).as_posix()
+        if self.aliases.get(alias) != blob_rel:
+            self.aliases[alias] = self.new_aliases[alias] = blob_rel
+        
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        return blob, sha256
+    
+    def resolve(self, alias):
+        """Return the blob path an alias resolves to, or None."""
+        blob_rel = self.aliases.get(alias)
+        return self.images_dir / blob_rel if blob_rel else None
+    
+    def placed(self, blob, how, bytes_written=0):
+        """Record how a post placed a blob (the first time it used it)."""
+        self.new_blobs.setdefault(str(blob), (how, bytes_written))
+    
+    def drain(self):
+        """Return and reset the entries added since the last call."""
+        changes = {'aliases': self.new_aliases, 'digests': self.new_digests, 'blobs': self.new_blobs}
+        self.new_aliases = {}
+        self.new_digests = {}
+        self.new_blobs = {}
+        return changes
+    
+    def merge(self, changes):
+        """Merge entries drained from another copy of the store (e.g. a worker).
+        
+        Workers converting posts at the same time do not see each other's
+        blobs, so the first post to use a blob may find it already written by
+        a later one, and two posts may both write it. Merged in post order,
+        each blob counts once the way it was placed, written if any post
+        wrote it, and every other use counts as deduplicated, as in a serial
+        run. Return (blob, how, bytes written) for each use to count as
+        deduplicated instead.
+        """
+        self.aliases.update(changes['aliases'])
+        self.digests.update(changes['digests'])
+        duplicates = []
+        for blob, (how, bytes_written) in changes['blobs'].items():
+            if blob not in self.claimed:
+                self.claimed[blob] = how
+                continue
+            first = self.claimed[blob]
+            written = how not in ('deduplicated', 'skipped')
+            if written and first in ('deduplicated', 'skipped'):
+                # The first use found the blob this post wrote
+                self.claimed[blob] = how
+                how, bytes_written = first, 0
+            elif not written:
+                bytes_written = 0
+            if how != 'deduplicated':
+                duplicates.append((blob, how, bytes_written))
+        return duplicates
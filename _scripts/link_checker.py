@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Concurrent external link checker with a persistent result cache
+
+Checks the reachability of many URLs at once: requests run in worker threads
+driven by an asyncio loop, with a limit on open connections overall and per
+host, so a post with twenty links to one site does not hammer it. Each URL is
+requested with HEAD first and with GET when the server rejects HEAD or
+reports an error.
+
+Results are cached in .cache/link-check.json and shared by all posts, so a
+link that was checked recently (by any post) is not requested again until
+its entry expires. Broken links expire sooner than working ones.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+
+from fsutil import atomic_write_json, cache_dir, load_json
+
+CACHE_NAME = 'link-check.json'
+
+# Seconds a cached result stays valid
+OK_TTL = 7 * 24 * 60 * 60
+BROKEN_TTL = 60 * 60
+
+USER_AGENT = 'Mozilla/5.0 (compatible; jekyll-link-checker)'
+
+class LinkChecker:
+    def __init__(self, cache_file=None, connections=32, per_host=4, timeout=10, refresh=False):
+        """Create a checker caching its results in cache_file (default: .cache/link-check.json)."""
+        self.cache_file = cache_file or cache_dir() / CACHE_NAME
+        self.connections = max(1, connections)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.refresh = refresh
+        
+        # URL to {'status', 'ok', 'error', 'method', 'latency_ms', 'checked_at'}
+        self.cache = {}
+        
+        self._local = threading.local()
+    
+    def check_all(self, urls):
+        """Check URLs concurrently; return URL to result, with 'cached' set for cache hits."""
+        self.cache = load_json(self.cache_file, {})
+        try:
+            return asyncio.run(self._check_all(sorted(set(urls))))
+        finally:
+            atomic_write_json(self.cache_file, self.cache)
+    
+    def is_fresh(self, result):
+        """Check whether a cached result has not expired yet."""
+        ttl = OK_TTL if result['ok'] else BROKEN_TTL
+        return time.time() - result['checked_at'] < ttl
+    
+    async def _check_all(self, urls):
+        results = {}
+        pending = []
+        for url in urls:
+            cached = self.cache.get(url)
+            if cached and not self.refresh and self.is_fresh(cached):
+                results[url] = dict(cached, cached=True)
+            else:
+                pending.append(url)
+        
+        loop = asyncio.get_running_loop()
+        connections = asyncio.Semaphore(self.connections)
+        hosts = {}
+        
+        async def check(url, executor):
+            host = hosts.setdefault(urlparse(url).netloc.lower(), asyncio.Semaphore(self.per_host))
+            # Wait for the host first, so links queued behind a busy host hold no connection
+            async with host, connections:
+                result = await loop.run_in_executor(executor, self.check, url)
+            self.cache[url] = result
+            results[url] = dict(result, cached=False)
+        
+        with ThreadPoolExecutor(max_workers=self.connections) as executor:
+            await asyncio.gather(*(check(url, executor) for url in pending))
+        return results
+    
+    def session(self):
+        """Return the HTTP session of the current worker thread."""
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+            self._local.session.headers['User-Agent'] = USER_AGENT
+        return self._local.session
+    
+    def check(self, url):
+        """Request one URL (HEAD, then GET if needed) and return the result."""
+        session = self.session()
+        status = error = method = None
+        start = time.perf_counter()
+        try:
+            method = 'HEAD'
+            response = session.head(url, allow_redirects=True, timeout=self.timeout)
+            
+            # Many servers reject or mishandle HEAD, so confirm errors with GET
+            if response.status_code >= 400:
+                method = 'GET'
+                response = session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                response.close()
+            status = response.status_code
+        except requests.RequestException as e:
+            error = type(e).__name__
+        
+        return {
+            'status': status,
+            'ok': status is not None and status < 400,
+            'error': error,
+            'method': method,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 1),
+            'checked_at': time.time(),
+        }
@@ -6,24 +6,18 @@ This script lists all posts from WordPress export XML files with their
 post ID, date, title, and number of images referenced in the content.
 
 Usage:
-    python list_wordpress_posts.py --xml-file <wordpress_export.xml> [--output <output.csv>]
+    python list_wordpress_posts.py --xml-file <wordpress_export.xml> [--output <output.csv>] [--format text|csv|json|ndjson]
 """
 
 import argparse
+import contextlib
 import csv
 import re
 import sys
-import xml.etree.ElementTree as ET
 from datetime import datetime
-from pathlib import Path
 
-# Define XML namespaces used in WordPress export
-NAMESPACES = {
-    'wp': 'http://wordpress.org/export/1.2/',
-    'content': 'http://purl.org/rss/1.0/modules/content/',
-    'dc': 'http://purl.org/dc/elements/1.1/',
-    'excerpt': 'http://wordpress.org/export/1.2/excerpt/',
-}
+from records import RecordWriter
+from wp_export import NAMESPACES, iter_export_items
 
 def count_images_in_content(content):
     """Count the number of images referenced in the post content."""
@@ -40,100 +34,145 @@ def count_images_in_content(content):
     
     return len(img_matches) + len(gallery_matches)
 
-def list_wordpress_posts(xml_file, output_file=None):
-    """List all posts from the WordPress export XML file."""
+# Columns of the CSV output
+CSV_FIELDS = ['post_id', 'date', 'title', 'categories', 'tags', 'image_count', 'link', 'post_slug']
+
+def post_record(item):
+    """Return the data of a published post item, or None for other items."""
+    post_type = item.find('.//wp:post_type', NAMESPACES)
+    if post_type is None or post_type.text != 'post':
+        return None
+    post_status = item.find('.//wp:status', NAMESPACES)
+    if post_status is None or post_status.text != 'publish':
+        return None
+    
+    # Extract post data
+    post_id = item.find('.//wp:post_id', NAMESPACES).text
+    title_elem = item.find('title')
+    title = title_elem.text if title_elem is not None and title_elem.text else "Untitled Post"
+    
+    # Get post date
+    post_date = item.find('.//wp:post_date', NAMESPACES).text
+    date_obj = datetime.strptime(post_date, '%Y-%m-%d %H:%M:%S')
+    date_str = date_obj.strftime('%Y-%m-%d')
+    
+    # Get categories and tags
+    categories = []
+    tags = []
+    
+    for cat in item.findall('category'):
+        domain = cat.get('domain', '')
+        if domain == 'category':
+            categories.append(cat.text)
+        elif domain == 'post_tag':
+            tags.append(cat.text)
+    
+    # Get content and count images
+    content_element = item.find('.//content:encoded', NAMESPACES)
+    content = content_element.text if content_element is not None and content_element.text else ""
+    image_count = count_images_in_content(content)
+    
+    # Get permalink
+    link_elem = item.find('link')
+    link = link_elem.text if link_elem is not None else ""
+    
+    # Get post slug
+    post_name = item.find('.//wp:post_name', NAMESPACES)
+    post_slug = post_name.text if post_name is not None else ""
+    
+    return {
+        'type': 'post',
+        'post_id': post_id,
+        'date': date_str,
+        'title': title,
+        'categories': categories,
+        'tags': tags,
+        'image_count': image_count,
+        'link': link,
+        'post_slug': post_slug
+    }
+
+def iter_posts(xml_file):
+    """Yield the record of each published post, in export order, as it is parsed."""
+    for item in iter_export_items(xml_file):
+        record = post_record(item)
+        if record is not None:
+            yield record
+
+def csv_row(post):
+    """Return a post record as a CSV row, with categories and tags joined."""
+    row = {field: post[field] for field in CSV_FIELDS}
+    row['categories'] = ', '.join(post['categories'])
+    row['tags'] = ', '.join(post['tags'])
+    return row
+
+def list_wordpress_posts(xml_file, output_file=None, output_format=None):
+    """List all posts from the WordPress export XML file; return their number.
+    
+    The format defaults to CSV with an output file and text otherwise. NDJSON
+    records are written as the export is parsed, in export order; the other
+    formats are sorted by date (newest first).
+    """
+    output_format = output_format or ('csv' if output_file else 'text')
+    structured = output_format in ('json', 'ndjson')
+    
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        channel = root.find('channel')
-        
-        posts = []
-        
-        # Process all posts
-        for item in channel.findall('item'):
-            post_type = item.find('.//wp:post_type', NAMESPACES)
-            if post_type is not None and post_type.text == 'post':
-                post_status = item.find('.//wp:status', NAMESPACES)
-                if post_status is not None and post_status.text == 'publish':
-                    # Extract post data
-                    post_id = item.find('.//wp:post_id', NAMESPACES).text
-                    title_elem = item.find('title')
-                    title = title_elem.text if title_elem is not None and title_elem.text else "Untitled Post"
-                    
-                    # Get post date
-                    post_date = item.find('.//wp:post_date', NAMESPACES).text
-                    date_obj = datetime.strptime(post_date, '%Y-%m-%d %H:%M:%S')
-                    date_str = date_obj.strftime('%Y-%m-%d')
-                    
-                    # Get categories and tags
-                    categories = []
-                    tags = []
-                    
-                    for cat in item.findall('category'):
-                        domain = cat.get('domain', '')
-                        if domain == 'category':
-                            categories.append(cat.text)
-                        elif domain == 'post_tag':
-                            tags.append(cat.text)
-                    
-                    # Get content and count images
-                    content_element = item.find('.//content:encoded', NAMESPACES)
-                    content = content_element.text if content_element is not None and content_element.text else ""
-                    image_count = count_images_in_content(content)
-                    
-                    # Get permalink
-                    link_elem = item.find('link')
-                    link = link_elem.text if link_elem is not None else ""
-                    
-                    # Get post slug
-                    post_name = item.find('.//wp:post_name', NAMESPACES)
-                    post_slug = post_name.text if post_name is not None else ""
-                    
-                    posts.append({
-                        'post_id': post_id,
-                        'date': date_str,
-                        'title': title,
-                        'categories': ', '.join(categories),
-                        'tags': ', '.join(tags),
-                        'image_count': image_count,
-                        'link': link,
-                        'post_slug': post_slug
-                    })
-        
-        # Sort posts by date (newest first)
-        posts.sort(key=lambda x: x['date'], reverse=True)
+        with contextlib.ExitStack() as stack:
+            stream = sys.stdout
+            if output_file:
+                stream = stack.enter_context(open(output_file, 'w', newline='', encoding='utf-8'))
+            
+            if output_format == 'ndjson':
+                writer = stack.enter_context(RecordWriter('ndjson', stream))
+                for post in iter_posts(xml_file):
+                    writer.write(post)
+                if output_file:
+                    print(f"Found {writer.count} posts. Results saved to {output_file}")
+                return writer.count
+            
+            posts = list(iter_posts(xml_file))
+            
+            # Sort posts by date (newest first)
+            posts.sort(key=lambda x: x['date'], reverse=True)
+            
+            if output_format == 'json':
+                with RecordWriter('json', stream) as writer:
+                    for post in posts:
+                        writer.write(post)
+            elif output_format == 'csv':
+                writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS)
+                writer.writeheader()
+                writer.writerows(csv_row(post) for post in posts)
+            else:
+                print(f"Found {len(posts)} posts:", file=stream)
+                print("-" * 80, file=stream)
+                for post in posts:
+                    print(f"{post['post_id']}\t{post['date']}\t{post['title']} ({post['image_count']} images)", file=stream)
+                    print(f"  Categories: {', '.join(post['categories'])}", file=stream)
+                    print(f"  Tags: {', '.join(post['tags'])}", file=stream)
+                    print(f"  URL: {post['link']}", file=stream)
+                    print("-" * 80, file=stream)
         
-        # Print to console and/or write to CSV
         if output_file:
-            with open(output_file, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=['post_id', 'date', 'title', 'categories', 'tags', 'image_count', 'link', 'post_slug'])
-                writer.writeheader()
-                writer.writerows(posts)
             print(f"Found {len(posts)} posts. Results saved to {output_file}")
-        else:
-            print(f"Found {len(posts)} posts:")
-            print("-" * 80)
-            for post in posts:
-                print(f"{post['post_id']}\t{post['date']}\t{post['title']} ({post['image_count']} images)")
-                print(f"  Categories: {post['categories']}")
-                print(f"  Tags: {post['tags']}")
-                print(f"  URL: {post['link']}")
-                print("-" * 80)
-        
-        return posts
         
+        return len(posts)
+    
     except Exception as e:
-        print(f"Error processing WordPress export: {e}")
+        # Keep standard output parseable for structured formats
+        print(f"Error processing WordPress export: {e}", file=sys.stderr if structured else sys.stdout)
         sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(description='List WordPress export posts')
     parser.add_argument('--xml-file', required=True, help='WordPress export XML file')
-    parser.add_argument('--output', help='Output CSV file')
+    parser.add_argument('--output', help='Write the list to this file (CSV unless --format is given)')
+    parser.add_argument('--format', choices=['text', 'csv', 'json', 'ndjson'],
+                        help='Output format (default: csv with --output, else text); ndjson streams one record per post')
     
     args = parser.parse_args()
     
-    list_wordpress_posts(args.xml_file, args.output)
+    list_wordpress_posts(args.xml_file, args.output, args.format)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
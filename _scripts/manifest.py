@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Conversion manifest for incremental WordPress to Jekyll runs
+
+Records, for every converted post, the hash of its source record, the Jekyll
+file it produced and the images it emitted. A later run against the same
+export skips posts whose source hash, output file and images are unchanged,
+and skips image copies whose source and target still match the recorded
+size, mtime and hash.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from fsutil import atomic_write_json, hash_file, load_json
+
+MANIFEST_VERSION = 3
+MANIFEST_NAME = '.wp_to_jekyll-manifest.json'
+
+def file_signature(path):
+    """Return (size, mtime_ns) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+def hash_record(record, fingerprint=''):
+    """Return a stable hash of a post record and the converter settings."""
+    payload = json.dumps([MANIFEST_VERSION, fingerprint, record], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ConversionManifest:
+    def __init__(self, path):
+        """Create a manifest stored at path."""
+        self.path = Path(path)
+        
+        # Post ID to {'source_hash', 'output', 'size', 'mtime_ns', 'images'}
+        self.posts = {}
+        
+        # Target image path to {'source', 'size', 'mtime_ns', 'source_size', 'source_mtime_ns', 'sha256'}
+        self.images = {}
+    
+    def load(self):
+        """Load the manifest from disk; a missing or outdated file starts empty."""
+        data = load_json(self.path)
+        if data and data.get('version') == MANIFEST_VERSION:
+            self.posts = data.get('posts', {})
+            self.images = data.get('images', {})
+        return self
+    
+    def save(self):
+        """Write the manifest to disk atomically."""
+        atomic_write_json(self.path, {
+            'version': MANIFEST_VERSION,
+            'posts': self.posts,
+            'images': self.images,
+        })
+    
+    def check_image(self, source_path, target_path):
+        """Return the entry for target_path if it is an unchanged copy of source_path.
+        
+        Sizes and mtimes are compared first. If only the source's mtime moved
+        (e.g. the media export was extracted again), its hash decides and the
+        refreshed entry is returned. Returns None if the image must be copied.
+        """
+        entry = self.images.get(str(target_path))
+        if not entry or entry['source'] != str(source_path):
+            return None
+        
+        if file_signature(target_path) != (entry['size'], entry['mtime_ns']):
+            return None
+        
+        source_signature = file_signature(source_path)
+        if source_signature == (entry['source_size'], entry['source_mtime_ns']):
+            return entry
+        
+        if source_signature is None or source_signature[0] != entry['size']:
+            return None
+        
+        # Linked images were never read, so hash the target instead
+        expected = entry['sha256'] or hash_file(target_path)
+        if hash_file(source_path) != expected:
+            return None
+        
+        entry = dict(entry, source_size=source_signature[0], source_mtime_ns=source_signature[1])
+        return entry
+    
+    @staticmethod
+    def image_entry(source_path, target_path, sha256=None):
+        """Build the manifest entry for target_path written from source_path.
+        
+        sha256 may be None when the image was linked rather than copied.
+        """
+        source_size, source_mtime_ns = file_signature(source_path)
+        size, mtime_ns = file_signature(target_path)
+        return {
+            'source': str(source_path),
+            'source_size': source_size,
+            'source_mtime_ns': source_mtime_ns,
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'sha256': sha256,
+        }
+    
+    def is_post_current(self, post_id, source_hash):
+        """Check whether a post was converted from the same source and is untouched."""
+        entry = self.posts.get(post_id)
+        if not entry or entry['source_hash'] != source_hash:
+            return False
+        
+        if file_signature(entry['output']) != (entry['size'], entry['mtime_ns']):
+            return False
+        
+        # Every image the post emitted must still be in place and up to date
+        for target in entry['images']:
+            image = self.images.get(target)
+            if not image or file_signature(target) != (image['size'], image['mtime_ns']):
+                return False
+            if file_signature(image['source']) != (image['source_size'], image['source_mtime_ns']):
+                return False
+        return True
+    
+    def record_post(self, post_id, source_hash, output_path, images):
+        """Record the output file and the images (target path to entry) of a post."""
+        self.images.update(images)
+        size, mtime_ns = file_signature(output_path)
+        self.posts[post_id] = {
+            'source_hash': source_hash,
+            'output': str(output_path),
+            'size': size,
+            'mtime_ns': mtime_ns,
+            'images': sorted(set(images)),
+        }
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Markdown scanner for draft and post statistics
+
+scan_markdown() returns the statistics check_drafts.py and validate_post.py
+report: words, lines, headers, paragraphs, fenced code blocks, images and
+external links. It knows about code fences (``` and ~~~), so a '# comment'
+in a shell snippet is not a header and a Markdown example inside a code
+block is not an image or link.
+
+Each statistic is computed on first use, and the work several of them need
+(the word split and the positions of the code blocks) is done once and
+shared, so the draft list only pays for what it shows. The prose between
+code blocks is handed to compiled patterns bounded by position, so no slice
+or stripped copy of the content is built. (A Python loop over every line
+was measured to be about twice as slow as the separate regex scans.)
+"""
+
+import re
+from functools import cached_property
+from itertools import islice
+
+# Line opening or closing a fenced code block, with its info string
+FENCE_PATTERN = re.compile(r' {0,3}(`{3,}|~{3,})(.*)')
+
+# ATX header: one to six '#' followed by whitespace and text
+HEADER_PATTERN = re.compile(r'#{1,6}[ \t]+\S')
+
+# The same at the start of a later line; the leading newline lets the regex
+# engine skip ahead to candidates instead of trying every position
+NEXT_FENCE_PATTERN = re.compile(r'\n' + FENCE_PATTERN.pattern)
+NEXT_HEADER_PATTERN = re.compile(r'\n' + HEADER_PATTERN.pattern)
+
+IMAGE_PATTERN = re.compile(r'!\[(.*?)\]\(.+?\)')
+LINK_PATTERN = re.compile(r'\[.*?\]\((https?://[^\)]+)\)')
+
+# Tokens made only of these characters are Markdown syntax, not words
+MARKUP_CHARS = '#*`[]()_-'
+
+# Paragraphs longer than this are reported
+LONG_PARAGRAPH = 500
+
+def body_start(content):
+    """Return where the content after the front matter starts (0 without front matter)"""
+    if not content.startswith('---'):
+        return 0
+    end_idx = content.find('---\n', 3)
+    return end_idx + 4 if end_idx != -1 else 0
+
+def is_line_start(content, pos):
+    return pos == 0 or content[pos - 1] == '\n'
+
+def fence_lines(content, start):
+    """Return the matches of all fence lines from start (a line start) on"""
+    fences = list(NEXT_FENCE_PATTERN.finditer(content, start))
+    if is_line_start(content, start):
+        first = FENCE_PATTERN.match(content, start)
+        if first:
+            fences.insert(0, first)
+    return fences
+
+def find_code_blocks(content, start=0):
+    """Return (start, end, language) of the fenced code blocks, fence lines included
+    
+    A block is closed by a fence of the same character that is at least as
+    long and has nothing after it; an unclosed block runs to the end.
+    """
+    blocks = []
+    opening = None
+    for fence in fence_lines(content, start):
+        marker, info = fence.groups()
+        if opening is None:
+            if marker[0] == '`' and '`' in info:
+                # Inline code at the start of a line, not a fence
+                continue
+            opening = fence
+            opening_marker = marker
+        elif marker[0] == opening_marker[0] and len(marker) >= len(opening_marker) and not info.strip():
+            language = opening.group(2).split()
+            blocks.append((opening.start(), fence.end(), language[0] if language else ''))
+            opening = None
+    
+    if opening is not None:
+        language = opening.group(2).split()
+        blocks.append((opening.start(), len(content), language[0] if language else ''))
+    return blocks
+
+class MarkdownStats:
+    def __init__(self, content, start=0):
+        """Statistics of content from start (a line start, e.g. after the front matter) to the end"""
+        self.content = content
+        self.start = start
+    
+    @cached_property
+    def _tokens(self):
+        # The split of the whole content, and how many tokens come before start
+        tokens = self.content.split()
+        return tokens, len(self.content[:self.start].split()) if self.start else 0
+    
+    @cached_property
+    def _code_blocks(self):
+        return find_code_blocks(self.content, self.start)
+    
+    @cached_property
+    def _segments(self):
+        # (start, end) of the prose between code blocks
+        bounds = [self.start]
+        for block_start, block_end, _ in self._code_blocks:
+            bounds.extend((block_start, block_end))
+        bounds.append(len(self.content))
+        return list(zip(bounds[::2], bounds[1::2]))
+    
+    @cached_property
+    def words(self):
+        """Whitespace-separated tokens"""
+        tokens, skipped = self._tokens
+        return len(tokens) - skipped
+    
+    @cached_property
+    def text_words(self):
+        """Tokens with more than Markdown punctuation, as counted for the reading time"""
+        tokens, skipped = self._tokens
+        markup = sum(1 for token in islice(tokens, skipped, None) if not token.strip(MARKUP_CHARS))
+        return self.words - markup
+    
+    @cached_property
+    def lines(self):
+        content = self.content
+        lines = content.count('\n', self.start)
+        if len(content) > self.start and not content.endswith('\n'):
+            lines += 1
+        return lines
+    
+    @cached_property
+    def code_languages(self):
+        """Language of each fenced code block ('' if not given)"""
+        return [language for _, _, language in self._code_blocks]
+    
+    @cached_property
+    def headers(self):
+        """Number of headers outside code blocks"""
+        headers = 0
+        for start, end in self._segments:
+            if is_line_start(self.content, start) and HEADER_PATTERN.match(self.content, start, end):
+                headers += 1
+            headers += len(NEXT_HEADER_PATTERN.findall(self.content, start, end))
+        return headers
+    
+    @cached_property
+    def long_paragraphs(self):
+        """Number of paragraphs outside code blocks longer than LONG_PARAGRAPH"""
+        count = 0
+        for start, end in self._segments:
+            # Paragraphs are separated by an empty line
+            pos = start
+            while pos < end:
+                end_idx = self.content.find('\n\n', pos, end)
+                if end_idx == -1:
+                    end_idx = end
+                if end_idx - pos > LONG_PARAGRAPH:
+                    count += 1
+                pos = end_idx + 2
+        return count
+    
+    @cached_property
+    def image_alts(self):
+        """Alt text of each image outside code blocks"""
+        return [alt for start, end in self._segments for alt in IMAGE_PATTERN.findall(self.content, start, end)]
+    
+    @cached_property
+    def links(self):
+        """External link URLs outside code blocks, in order"""
+        return [url for start, end in self._segments for url in LINK_PATTERN.findall(self.content, start, end)]
+
+def scan_markdown(content, start=0):
+    """Return the statistics of content from start on; each is computed on first use"""
+    return MarkdownStats(content, start)
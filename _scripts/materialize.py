@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Image materialization strategies for the WordPress to Jekyll converter
+
+Places a media file at its target path in the Jekyll images directory without
+duplicating its data where the filesystem allows it:
+
+    reflink   copy-on-write clone (Btrfs/XFS via FICLONE, APFS via clonefile)
+    hardlink  second directory entry for the same file (same filesystem only)
+    copy      chunked byte-for-byte copy
+
+Every strategy writes to a temporary name in the target directory first and
+renames it into place, so a target is never left half-written.
+"""
+
+import os
+import shutil
+import sys
+import uuid
+from pathlib import Path
+
+from fsutil import copy_file
+
+STRATEGIES = ('copy', 'reflink', 'hardlink', 'auto')
+
+# Methods tried in order for each strategy; copy is always the last resort
+FALLBACKS = {
+    'copy': ('copy',),
+    'reflink': ('reflink', 'copy'),
+    'hardlink': ('hardlink', 'copy'),
+    'auto': ('reflink', 'hardlink', 'copy'),
+}
+
+# ioctl request number of FICLONE on Linux
+FICLONE = 0x40049409
+
+def reflink(source_path, target_path):
+    """Create target_path as a copy-on-write clone of source_path."""
+    if sys.platform.startswith('linux'):
+        import fcntl
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        shutil.copystat(source_path, target_path)
+    elif sys.platform == 'darwin':
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if libc.clonefile(os.fsencode(source_path), os.fsencode(target_path), 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(target_path))
+    else:
+        raise OSError(f"Reflinks are not supported on {sys.platform}")
+
+def hardlink(source_path, target_path):
+    """Create target_path as a hard link to source_path on the same filesystem."""
+    if os.stat(source_path).st_dev != os.stat(Path(target_path).parent).st_dev:
+        raise OSError(f"{source_path} and {target_path} are on different filesystems")
+    os.link(source_path, target_path)
+
+def materialize(source_path, target_path, strategy='copy'):
+    """Place source_path at target_path using the given strategy.
+    
+    Returns (method, bytes_written, sha256): the method that succeeded, the
+    number of data bytes actually written (0 for reflinks and hard links) and
+    the SHA-256 of the data if it was computed along the way, else None.
+    """
+    target_path = Path(target_path)
+    
+    # A hard link to the file that is already in place would be a no-op
+    if target_path.exists() and os.path.samefile(source_path, target_path):
+        return 'hardlink', 0, None
+    
+    tmp_path = target_path.parent / f".{target_path.name}.{uuid.uuid4().hex}.tmp"
+    last_error = None
+    for method in FALLBACKS[strategy]:
+        try:
+            if method == 'reflink':
+                reflink(source_path, tmp_path)
+                result = (method, 0, None)
+            elif method == 'hardlink':
+                hardlink(source_path, tmp_path)
+                result = (method, 0, None)
+            else:
+                sha256 = copy_file(source_path, tmp_path)
+                result = (method, os.path.getsize(tmp_path), sha256)
+            
+            os.replace(tmp_path, target_path)
+            return result
+        except OSError as e:
+            last_error = e
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    raise last_error
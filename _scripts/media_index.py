@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Filename index for WordPress media exports
+
+Walks the media directory once and maps every filename to the paths it occurs
+at, so the converter can resolve attachments without scanning the media tree
+for each file. The index is persisted together with the mtime of every
+directory it covers; a later run reuses it as long as none of those
+directories changed.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from fsutil import atomic_write_json, load_json
+
+INDEX_VERSION = 1
+
+class MediaIndex:
+    def __init__(self, media_dir, cache_file=None):
+        """Create an index for media_dir, persisted to cache_file if given."""
+        self.media_dir = Path(media_dir)
+        self.cache_file = Path(cache_file) if cache_file else None
+        
+        # Filename to sorted list of paths relative to media_dir
+        self.files = {}
+        
+        # Directory (relative to media_dir) to mtime in nanoseconds
+        self.dir_mtimes = {}
+        
+        self.from_cache = False
+    
+    @staticmethod
+    def default_cache_file(media_dir, cache_dir):
+        """Return the cache file used for media_dir inside cache_dir."""
+        key = hashlib.sha1(str(Path(media_dir).resolve()).encode('utf-8')).hexdigest()[:12]
+        return Path(cache_dir) / f"media-index-{key}.json"
+    
+    def load(self, rebuild=False):
+        """Load the index from the cache if it is still fresh, else rebuild it."""
+        if not rebuild and self.cache_file and self._load_cache():
+            self.from_cache = True
+            return self
+        
+        self.scan()
+        self.save()
+        return self
+    
+    def save(self):
+        """Write the index to the cache file, if there is one."""
+        if not self.cache_file:
+            return
+        try:
+            atomic_write_json(self.cache_file, {
+                'version': INDEX_VERSION,
+                'media_dir': str(self.media_dir.resolve()),
+                'dirs': self.dir_mtimes,
+                'files': self.files,
+            })
+        except OSError as e:
+            print(f"Warning: Could not write media index cache {self.cache_file}: {e}")
+    
+    def _load_cache(self):
+        """Populate the index from the cache file; return False if it is stale."""
+        data = load_json(self.cache_file)
+        if not data or data.get('version') != INDEX_VERSION:
+            return False
+        if data.get('media_dir') != str(self.media_dir.resolve()):
+            return False
+        
+        # Any added, removed or renamed file changes its directory's mtime
+        for rel_dir, mtime in data['dirs'].items():
+            try:
+                if os.stat(self.media_dir / rel_dir).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        
+        self.dir_mtimes = data['dirs']
+        self.files = data['files']
+        return True
+    
+    def scan(self):
+        """Walk the media directory once and build the filename index."""
+        self.files = {}
+        self.dir_mtimes = {}
+        
+        pending = ['']
+        while pending:
+            rel_dir = pending.pop()
+            abs_dir = self.media_dir / rel_dir
+            try:
+                self.dir_mtimes[rel_dir] = os.stat(abs_dir).st_mtime_ns
+                with os.scandir(abs_dir) as entries:
+                    for entry in entries:
+                        rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                        if entry.is_dir():
+                            pending.append(rel_path)
+                        else:
+                            self.files.setdefault(entry.name, []).append(rel_path)
+            except OSError as e:
+                print(f"Warning: Could not scan media directory {abs_dir}: {e}")
+        
+        for paths in self.files.values():
+            paths.sort()
+    
+    def add(self, rel_path):
+        """Add a file that was written below the media directory after the scan.
+        
+        The mtimes of the directories along its path are refreshed, so the
+        cached index stays valid without rescanning the media directory.
+        """
+        rel_path = Path(rel_path).as_posix()
+        paths = self.files.setdefault(Path(rel_path).name, [])
+        if rel_path not in paths:
+            paths.append(rel_path)
+            paths.sort()
+        
+        rel_dir = Path(rel_path).parent
+        while True:
+            key = '' if rel_dir == Path('.') else rel_dir.as_posix()
+            self.dir_mtimes[key] = os.stat(self.media_dir / key).st_mtime_ns
+            if not key:
+                break
+            rel_dir = rel_dir.parent
+    
+    def fingerprint(self):
+        """Return a hash that changes whenever a directory in the index changes."""
+        payload = json.dumps(self.dir_mtimes, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+    
+    def __len__(self):
+        return sum(len(paths) for paths in self.files.values())
+    
+    def find_in(self, filename, directories):
+        """Return the path of filename directly inside the first matching directory."""
+        paths = self.files.get(filename)
+        if not paths:
+            return None
+        
+        for directory in directories:
+            rel_path = f"{directory}/{filename}"
+            if rel_path in paths:
+                return self.media_dir / rel_path
+        return None
+    
+    def find(self, filename, prefixes=()):
+        """Return a path for filename, preferring paths below the given prefixes.
+        
+        Prefixes are tried in order (e.g. ['2011/03/', '2011/']) and the first
+        path below one of them wins; otherwise any path with that filename is
+        returned. Returns None if the filename is not in the media directory.
+        """
+        paths = self.files.get(filename)
+        if not paths:
+            return None
+        
+        for prefix in prefixes:
+            for rel_path in paths:
+                if rel_path.startswith(prefix):
+                    return self.media_dir / rel_path
+        return self.media_dir / paths[0]
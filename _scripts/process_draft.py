@@ -7,10 +7,13 @@ Usage: python _scripts/process_draft.py _drafts/my-post.md
 import sys
 import os
 import re
-import yaml
 from datetime import datetime
 from pathlib import Path
 
+from corpus import Corpus
+from front_matter import dump_frontmatter
+from tag_suggester import suggest_categories_and_tags
+
 def extract_title_from_content(content):
     """Extract title from first H1 or use filename"""
     lines = content.split('\n')
@@ -32,33 +35,6 @@ def clean_bear_content(content):
     
     return content.strip()
 
-def suggest_categories_and_tags(content, title):
-    """Suggest categories and tags based on content"""
-    content_lower = content.lower()
-    title_lower = title.lower() if title else ""
-    
-    # Common categories for mtc.berlin blog
-    categories = []
-    if any(word in content_lower for word in ['python', 'javascript', 'code', 'programming', 'development']):
-        categories.append('Development')
-    if any(word in content_lower for word in ['business', 'client', 'consulting', 'strategy']):
-        categories.append('Business')
-    if any(word in content_lower for word in ['tool', 'software', 'app', 'productivity']):
-        categories.append('Tools')
-    if any(word in content_lower for word in ['tutorial', 'how to', 'guide', 'step']):
-        categories.append('Tutorials')
-    if not categories:
-        categories.append('Technology')
-    
-    # Extract potential tags
-    tags = []
-    tech_keywords = ['python', 'javascript', 'jekyll', 'github', 'docker', 'aws', 'automation', 'ai', 'machine learning']
-    for keyword in tech_keywords:
-        if keyword in content_lower or keyword in title_lower:
-            tags.append(keyword)
-    
-    return categories[:2], tags[:5]  # Limit to reasonable numbers
-
 def create_jekyll_frontmatter(title, categories, tags, description=""):
     """Create Jekyll front matter"""
     now = datetime.now()
@@ -71,17 +47,17 @@ def create_jekyll_frontmatter(title, categories, tags, description=""):
         'author': 'Arne Krueger'
     }
     
-    return "---\n" + yaml.dump(frontmatter, default_flow_style=False, allow_unicode=True) + "---\n\n"
+    return dump_frontmatter(frontmatter)
 
-def process_draft(draft_path):
+def process_draft(draft_path, corpus=None):
     """Main processing function"""
     if not os.path.exists(draft_path):
         print(f"Error: File {draft_path} not found")
         return False
     
     # Read the draft
-    with open(draft_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    corpus = corpus or Corpus()
+    content = corpus.get(draft_path).content
     
     # Extract title
     title = extract_title_from_content(content)
@@ -106,8 +82,7 @@ def process_draft(draft_path):
     final_content = frontmatter + cleaned_content
     
     # Write back to file
-    with open(draft_path, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+    corpus.write(draft_path, final_content)
     
     print(f"✅ Processed draft: {draft_path}")
     print(f"📝 Title: {title}")
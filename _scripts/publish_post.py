@@ -2,32 +2,31 @@
 """
 Publish draft to _posts with proper Jekyll filename
 Usage: python _scripts/publish_post.py _drafts/my-post.md
+       python _scripts/publish_post.py --overwrite never --remove-draft always _drafts/*.md
+
+With several drafts nothing is asked: every draft is checked and its target
+filename resolved before the first post is written, and --overwrite and
+--remove-draft (default: never) decide what happens to existing posts and to
+the published drafts.
 """
 
 import sys
 import os
 import re
-import yaml
-import shutil
+import argparse
 from datetime import datetime
 from pathlib import Path
 
+from corpus import Corpus
+from front_matter import dump_frontmatter, parse_frontmatter
+
+# What to do with an existing post or a published draft
+POLICIES = ('ask', 'always', 'never')
+
 def extract_frontmatter(content):
     """Extract and parse front matter"""
-    if not content.startswith('---\n'):
-        return None, content
-    
-    end_idx = content.find('\n---\n', 4)
-    if end_idx == -1:
-        return None, content
-    
-    try:
-        fm_content = content[4:end_idx]
-        frontmatter = yaml.safe_load(fm_content)
-        post_content = content[end_idx + 5:]
-        return frontmatter, post_content
-    except yaml.YAMLError:
-        return None, content
+    frontmatter, _, offset = parse_frontmatter(content)
+    return frontmatter, content[offset:]
 
 def create_jekyll_filename(title, date_str):
     """Create Jekyll post filename format: YYYY-MM-DD-title.md"""
@@ -64,53 +63,85 @@ def update_frontmatter_for_publishing(frontmatter):
     
     return frontmatter
 
-def publish_post(draft_path):
-    """Main publishing function"""
-    if not os.path.exists(draft_path):
-        print(f"❌ Draft not found: {draft_path}")
+def confirm(question, policy):
+    """Apply a policy, asking the question only for 'ask'"""
+    if policy != 'ask':
+        return policy == 'always'
+    try:
+        return input(question).lower() == 'y'
+    except EOFError:
+        # No one to answer (e.g. stdin is not a terminal)
+        print()
         return False
+
+def prepare_post(draft_path, corpus):
+    """Build the published post of a draft without writing anything
+    
+    Returns (post, None) with post holding the draft and target paths, the
+    updated front matter and the final content, or (None, error message).
+    """
+    if not os.path.exists(draft_path):
+        return None, f"Draft not found: {draft_path}"
     
     # Read draft
-    with open(draft_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    document = corpus.get(draft_path)
     
     # Extract front matter
-    frontmatter, post_content = extract_frontmatter(content)
+    frontmatter, post_content = document.frontmatter, document.body
     if not frontmatter:
-        print("❌ No valid front matter found. Run process_draft.py first.")
-        return False
+        return None, "No valid front matter found. Run process_draft.py first."
     
     # Validate required fields
     required_fields = ['title', 'date']
     for field in required_fields:
         if field not in frontmatter:
-            print(f"❌ Missing required field: {field}")
-            return False
+            return None, f"Missing required field: {field}"
     
     # Update front matter for publishing
     frontmatter = update_frontmatter_for_publishing(frontmatter)
     
     # Create Jekyll filename
     filename = create_jekyll_filename(frontmatter['title'], frontmatter['date'])
-    posts_path = Path('_posts') / filename
+    
+    return {
+        'draft': Path(draft_path),
+        'target': Path('_posts') / filename,
+        'frontmatter': frontmatter,
+        'content': dump_frontmatter(frontmatter) + post_content,
+    }, None
+
+def write_post(post, corpus):
+    """Write a prepared post to _posts atomically"""
+    # Ensure _posts directory exists
+    Path('_posts').mkdir(exist_ok=True)
+    corpus.write(post['target'], post['content'])
+
+def remove_draft(post, corpus):
+    """Remove the draft of a published post, unless the post replaced it"""
+    if post['draft'].resolve() == post['target'].resolve():
+        return False
+    corpus.remove(post['draft'])
+    return True
+
+def publish_post(draft_path, corpus=None, overwrite='ask', remove='ask'):
+    """Main publishing function"""
+    corpus = corpus or Corpus()
+    post, error = prepare_post(draft_path, corpus)
+    if error:
+        print(f"❌ {error}")
+        return False
+    
+    frontmatter = post['frontmatter']
+    posts_path = post['target']
     
     # Check if post already exists
     if posts_path.exists():
-        response = input(f"⚠️  Post {filename} already exists. Overwrite? (y/N): ")
-        if response.lower() != 'y':
+        if not confirm(f"⚠️  Post {posts_path.name} already exists. Overwrite? (y/N): ", overwrite):
             print("❌ Publishing cancelled")
             return False
     
-    # Create final content
-    final_frontmatter = "---\n" + yaml.dump(frontmatter, default_flow_style=False, allow_unicode=True) + "---\n\n"
-    final_content = final_frontmatter + post_content
-    
-    # Ensure _posts directory exists
-    Path('_posts').mkdir(exist_ok=True)
-    
     # Write published post
-    with open(posts_path, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+    write_post(post, corpus)
     
     print(f"✅ Published post: {posts_path}")
     print(f"📝 Title: {frontmatter['title']}")
@@ -119,9 +150,7 @@ def publish_post(draft_path):
     print(f"🔖 Tags: {', '.join(frontmatter.get('tags', []))}")
     
     # Ask if user wants to remove draft
-    response = input(f"\n🗑️  Remove draft {draft_path}? (y/N): ")
-    if response.lower() == 'y':
-        os.remove(draft_path)
+    if confirm(f"\n🗑️  Remove draft {draft_path}? (y/N): ", remove) and remove_draft(post, corpus):
         print(f"✅ Removed draft: {draft_path}")
     
     print(f"\n🎉 Next steps:")
@@ -134,11 +163,92 @@ def publish_post(draft_path):
     
     return True
 
+def plan_posts(draft_paths, corpus, overwrite):
+    """Prepare the posts of many drafts and resolve filename collisions up front
+    
+    Two drafts with the same target filename are both refused, as neither
+    should silently replace the other; an existing post is replaced only if
+    the overwrite policy allows it. Returns (posts to write, {draft: error}).
+    """
+    posts = {}
+    failed = {}
+    for draft_path in draft_paths:
+        post, error = prepare_post(draft_path, corpus)
+        if error:
+            failed[draft_path] = error
+        else:
+            posts.setdefault(post['target'], []).append((draft_path, post))
+    
+    planned = []
+    for target, candidates in posts.items():
+        if len(candidates) > 1:
+            names = ', '.join(str(draft_path) for draft_path, _ in candidates)
+            for draft_path, _ in candidates:
+                failed[draft_path] = f"{target.name} would be written by several drafts: {names}"
+            continue
+        
+        draft_path, post = candidates[0]
+        if target.exists() and target.resolve() != post['draft'].resolve():
+            if not confirm(f"⚠️  Post {target.name} already exists. Overwrite? (y/N): ", overwrite):
+                failed[draft_path] = f"Post {target.name} already exists"
+                continue
+        planned.append(post)
+    
+    return planned, failed
+
+def publish_posts(draft_paths, corpus=None, overwrite='never', remove='never'):
+    """Publish many drafts without asking (unless a policy is 'ask')
+    
+    Nothing is written until every draft is prepared and every collision
+    resolved; each post is then written atomically, so an interrupted run
+    leaves complete posts only.
+    """
+    corpus = corpus or Corpus()
+    print(f"📤 Publishing {len(draft_paths)} draft(s)")
+    print("=" * 50)
+    
+    posts, failed = plan_posts(draft_paths, corpus, overwrite)
+    for draft_path, error in failed.items():
+        print(f"❌ {draft_path}: {error}")
+    
+    for post in posts:
+        write_post(post, corpus)
+        print(f"✅ {post['draft']} → {post['target']}")
+    
+    removed = 0
+    if posts and confirm(f"\n🗑️  Remove the {len(posts)} published draft(s)? (y/N): ", remove):
+        removed = sum(remove_draft(post, corpus) for post in posts)
+    
+    print("\n📈 Publishing Summary:")
+    print(f"   ✅ Published: {len(posts)}")
+    print(f"   ❌ Failed: {len(failed)}")
+    print(f"   🗑️  Drafts removed: {removed}")
+    
+    if posts:
+        print("\n🎉 Next steps:")
+        print("   1. Test locally: bundle exec jekyll serve")
+        print("   2. Commit and push to deploy:")
+        print("      git add _posts")
+        print(f"      git commit -m 'Add {len(posts)} new posts'")
+        print("      git push origin master")
+    
+    return not failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish drafts to _posts with a Jekyll filename')
+    parser.add_argument('drafts', nargs='+', help='Drafts to publish')
+    parser.add_argument('--overwrite', choices=POLICIES,
+                        help='Replace existing posts: ask, always or never (default: ask for one draft, never for several)')
+    parser.add_argument('--remove-draft', choices=POLICIES,
+                        help='Remove published drafts: ask, always or never (default: ask for one draft, never for several)')
+    
+    args = parser.parse_args()
+    
+    if len(args.drafts) == 1:
+        success = publish_post(args.drafts[0], overwrite=args.overwrite or 'ask', remove=args.remove_draft or 'ask')
+    else:
+        success = publish_posts(args.drafts, overwrite=args.overwrite or 'never', remove=args.remove_draft or 'never')
+    sys.exit(0 if success else 1)
+
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python _scripts/publish_post.py _drafts/my-post.md")
-        sys.exit(1)
-    
-    draft_path = sys.argv[1]
-    success = publish_post(draft_path)
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Machine-readable output for the blog and migration scripts
+
+With --format json a script prints one JSON array of records when it is
+done; with --format ndjson it prints each record on its own line as soon as
+the item is processed, so CI tools can stream the results instead of
+scraping the text output. Every record has a "type" (e.g. "draft", "post",
+"link" or "summary") and the same fields in both formats.
+"""
+
+import json
+import os
+import sys
+from datetime import date, datetime
+from pathlib import PurePath
+
+FORMATS = ('text', 'json', 'ndjson')
+
+def json_default(value):
+    """Serialize the values front matter and results contain besides JSON types"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, PurePath):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def add_format_argument(parser, formats=FORMATS):
+    """Add the --format option to an argument parser"""
+    parser.add_argument('--format', choices=formats, default='text',
+                        help='Output format: text for people, json (one array) or ndjson (one record per line, streamed)')
+
+class RecordWriter:
+    def __init__(self, output_format, stream=None):
+        """Write records as JSON or NDJSON to stream (default: stdout)"""
+        if output_format not in ('json', 'ndjson'):
+            raise ValueError(f"Not a record format: {output_format}")
+        self.output_format = output_format
+        self.stream = stream or sys.stdout
+        self.records = []
+        self.count = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def write(self, record):
+        """Emit a record (NDJSON) or keep it for the array (JSON)"""
+        self.count += 1
+        if self.output_format != 'ndjson':
+            self.records.append(record)
+            return
+        
+        try:
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=json_default) + '\n')
+            self.stream.flush()
+        except BrokenPipeError:
+            # The reader stopped early (e.g. head), so stop quietly like other
+            # command line tools; point stdout at devnull for the final flush
+            os.dup2(os.open(os.devnull, os.O_WRONLY), self.stream.fileno())
+            sys.exit(1)
+    
+    def close(self):
+        """Write the JSON array, if any"""
+        if self.output_format == 'json':
+            json.dump(self.records, self.stream, ensure_ascii=False, indent=2, default=json_default)
+            self.stream.write('\n')
+            self.records = []
+        self.stream.flush()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Precompute the related posts of every post into _data/related_posts.json
+Usage: python _scripts/related_posts.py [--top-k 5] [--full]
+
+Each post is a sparse vector of its tags and categories and a sparse TF-IDF
+vector of its title and text (both weighted by inverse document frequency and
+normalized); two posts are as related as the weighted sum of the cosine
+similarities of their vectors. Similarities are accumulated through inverted
+indexes, so a post is only compared with posts that share a term with it,
+and each text vector keeps only its strongest terms.
+
+The vectors, document frequencies and results are kept in
+.cache/related_posts.pickle. On the next run only changed posts are read
+again, and only the rows that can be affected are recomputed: those of the
+changed posts, those that listed a changed or removed post, and those a
+changed post now ranks in. Document frequencies are frozen between full
+runs, so unchanged pairs keep their scores; they are recomputed (with all
+rows) when the number of posts drifted by more than REBUILD_DRIFT, or with
+--full.
+
+Layouts read the data file by the post's path, e.g.
+{% for related in site.data.related_posts[page.path] %}
+  <a href="{{ related.url | relative_url }}">{{ related.title }}</a>
+{% endfor %}
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import pickle
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import yaml
+
+from front_matter import YAML_LOADER, as_list, parse_frontmatter
+from fsutil import atomic_write_bytes, atomic_write_text, cache_dir
+from tag_suggester import term_key, tokenize
+
+POSTS_DIR = '_posts'
+OUTPUT_FILE = Path('_data') / 'related_posts.json'
+CONFIG_FILE = '_config.yml'
+
+CACHE_NAME = 'related_posts.pickle'
+
+# Bump when the format of the cache changes
+CACHE_VERSION = 1
+
+# Related posts listed per post
+TOP_K = 5
+
+# Share of the similarity from tags and categories; the rest is from the text
+TAG_WEIGHT = 0.5
+
+# Strongest terms kept per text vector
+MAX_TERMS = 64
+
+# Words in more than this share of posts say nothing about a post
+MAX_DOCUMENT_SHARE = 0.5
+
+# Words shorter than this are ignored
+MIN_WORD_LENGTH = 3
+
+# Digits similarities are compared with
+SCORE_DIGITS = 9
+
+# Relative change of the number of posts that triggers a full recomputation
+REBUILD_DRIFT = 0.1
+
+POST_NAME_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})-(.+)')
+
+# Permalink of posts when _config.yml does not set one
+DEFAULT_PERMALINK = '/posts/:title/'
+
+def post_permalink(config_file=CONFIG_FILE):
+    """Return the permalink pattern of posts from the front matter defaults of _config.yml"""
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = yaml.load(f, Loader=YAML_LOADER) or {}
+    except (OSError, yaml.YAMLError):
+        return DEFAULT_PERMALINK
+    
+    for default in config.get('defaults') or []:
+        if (default.get('scope') or {}).get('type') == 'posts':
+            permalink = (default.get('values') or {}).get('permalink')
+            if permalink:
+                return permalink
+    return config.get('permalink') or DEFAULT_PERMALINK
+
+def post_url(permalink, name, frontmatter):
+    """Return the URL Jekyll gives a post, or None for placeholders not handled here"""
+    if frontmatter.get('permalink'):
+        return frontmatter['permalink']
+    
+    # Posts are named YYYY-MM-DD-slug.md
+    match = POST_NAME_PATTERN.match(Path(name).stem)
+    if not match:
+        return None
+    year, month, day, slug = match.groups()
+    slug = frontmatter.get('slug') or slug
+    url = permalink
+    for placeholder, value in ((':title', slug), (':slug', slug), (':year', year), (':month', month), (':day', day)):
+        url = url.replace(placeholder, str(value))
+    return None if ':' in url else url
+
+def read_post(path, permalink):
+    """Read a post into (metadata, word counts, taxonomy terms)"""
+    content = path.read_text(encoding='utf-8')
+    frontmatter, _, offset = parse_frontmatter(content)
+    frontmatter = frontmatter if isinstance(frontmatter, dict) else {}
+    
+    title = str(frontmatter.get('title', ''))
+    words = Counter(tokenize(f"{title}\n{content[offset:]}"))
+    for word in [word for word in words if len(word) < MIN_WORD_LENGTH or word.isdigit()]:
+        del words[word]
+    terms = {term_key(term) for term in as_list(frontmatter.get('tags')) + as_list(frontmatter.get('categories'))}
+    terms.discard('')
+    
+    meta = {
+        'path': f"{POSTS_DIR}/{path.name}",
+        'url': post_url(permalink, path.name, frontmatter),
+        'title': title,
+        'date': str(frontmatter.get('date', '')),
+    }
+    return meta, words, sorted(terms)
+
+def normalize(vector):
+    """Scale a sparse vector to unit length"""
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {term: weight / norm for term, weight in vector.items()} if norm else {}
+
+class RelatedPosts:
+    def __init__(self, cache_file=None, top_k=TOP_K):
+        """Load the cached vectors and results (a missing or outdated cache starts empty)"""
+        self.cache_file = cache_file or cache_dir() / CACHE_NAME
+        self.top_k = top_k
+        
+        # Post name to ((mtime_ns, size), metadata, word counts, taxonomy terms)
+        self.posts = {}
+        # Frozen document frequencies: (posts, word counts, taxonomy term counts)
+        self.frequencies = (0, Counter(), Counter())
+        # Post name to [(negated score, related post name)], best first
+        self.rows = {}
+        
+        try:
+            with open(self.cache_file, 'rb') as f:
+                version, state = pickle.load(f)
+            if version == CACHE_VERSION and state['top_k'] == top_k:
+                self.posts, self.frequencies, self.rows = state['posts'], state['frequencies'], state['rows']
+        except Exception:
+            pass
+    
+    def save(self):
+        state = {'top_k': self.top_k, 'posts': self.posts, 'frequencies': self.frequencies, 'rows': self.rows}
+        atomic_write_bytes(self.cache_file, pickle.dumps((CACHE_VERSION, state), protocol=pickle.HIGHEST_PROTOCOL))
+    
+    def scan(self, posts_dir=POSTS_DIR):
+        """Read the new and changed posts; return (changed names, removed names)"""
+        permalink = post_permalink()
+        current = {}
+        for entry in os.scandir(posts_dir):
+            if entry.name.endswith('.md'):
+                stat = entry.stat()
+                current[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        
+        removed = set(self.posts) - set(current)
+        for name in removed:
+            del self.posts[name]
+            self.rows.pop(name, None)
+        
+        changed = set()
+        for name, key in current.items():
+            cached = self.posts.get(name)
+            if cached and cached[0] == key:
+                continue
+            try:
+                self.posts[name] = (key, *read_post(Path(posts_dir) / name, permalink))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"⚠️  Skipping {name}: {e}")
+                self.posts.pop(name, None)
+                self.rows.pop(name, None)
+                removed.add(name)
+                continue
+            changed.add(name)
+        return changed, removed
+    
+    def count_frequencies(self):
+        """Freeze the document frequencies of the current posts"""
+        words = Counter()
+        terms = Counter()
+        for _, _, post_words, post_terms in self.posts.values():
+            words.update(post_words.keys())
+            terms.update(post_terms)
+        self.frequencies = (len(self.posts), words, terms)
+    
+    def needs_full_run(self):
+        """Whether the number of posts drifted too far from the frozen frequencies"""
+        documents = self.frequencies[0]
+        return not documents or abs(len(self.posts) - documents) > documents * REBUILD_DRIFT
+    
+    def vectors(self):
+        """Return the normalized (text, taxonomy) vector of every post"""
+        documents, word_frequency, term_frequency = self.frequencies
+        max_frequency = max(1, documents * MAX_DOCUMENT_SHARE)
+        
+        def idf(frequency):
+            return math.log((1 + documents) / (1 + frequency)) + 1
+        
+        vectors = {}
+        for name, (_, _, words, terms) in self.posts.items():
+            text = {word: (1 + math.log(count)) * idf(word_frequency[word])
+                    for word, count in words.items() if word_frequency[word] <= max_frequency}
+            if len(text) > MAX_TERMS:
+                text = dict(heapq.nlargest(MAX_TERMS, text.items(), key=lambda item: item[1]))
+            taxonomy = {term: idf(term_frequency[term]) for term in terms}
+            vectors[name] = (normalize(text), normalize(taxonomy))
+        return vectors
+    
+    @staticmethod
+    def inverted_indexes(vectors):
+        """Return the (text, taxonomy) postings: term to [(post name, weight)]"""
+        text_index = defaultdict(list)
+        taxonomy_index = defaultdict(list)
+        for name, (text, taxonomy) in vectors.items():
+            for term, weight in text.items():
+                text_index[term].append((name, weight))
+            for term, weight in taxonomy.items():
+                taxonomy_index[term].append((name, weight))
+        return text_index, taxonomy_index
+    
+    @staticmethod
+    def similarities(name, vectors, indexes):
+        """Return the similarity of a post to every post it shares a term with"""
+        scores = defaultdict(float)
+        for vector, index, weight in zip(vectors[name], indexes, (1 - TAG_WEIGHT, TAG_WEIGHT)):
+            for term, term_weight in vector.items():
+                for other, other_weight in index[term]:
+                    scores[other] += weight * term_weight * other_weight
+        scores.pop(name, None)
+        return scores
+    
+    def best(self, scores):
+        """Return the top_k (score, name) pairs, best first and ties by name
+        
+        Scores are negated for the ordering and rounded, so sums added up in a
+        different order compare equal.
+        """
+        return heapq.nsmallest(self.top_k, ((-round(score, SCORE_DIGITS), other) for other, score in scores.items()))
+    
+    def update(self, posts_dir=POSTS_DIR, full=False):
+        """Bring the results up to date; return the number of recomputed rows"""
+        changed, removed = self.scan(posts_dir)
+        if full or self.needs_full_run():
+            self.count_frequencies()
+            affected = set(self.posts)
+        else:
+            affected = set(changed)
+        if not affected and not removed:
+            return 0
+        
+        vectors = self.vectors()
+        indexes = self.inverted_indexes(vectors)
+        
+        # Similarities of the changed posts also tell which other rows they enter
+        candidates = defaultdict(dict)
+        if len(affected) < len(self.posts):
+            gone = changed | removed
+            for name in changed:
+                for other, score in self.similarities(name, vectors, indexes).items():
+                    candidates[other][name] = score
+            for name, row in self.rows.items():
+                if name not in affected and any(other in gone for _, other in row):
+                    affected.add(name)
+        
+        for name in affected:
+            self.rows[name] = self.best(self.similarities(name, vectors, indexes))
+        
+        # A changed post can only push others out of a row it now scores in
+        merged = 0
+        for name, scores in candidates.items():
+            if name in affected:
+                continue
+            row = self.rows.get(name, [])
+            if len(row) == self.top_k and round(max(scores.values()), SCORE_DIGITS) < -row[-1][0]:
+                continue
+            entries = {other: -score for score, other in row}
+            entries.update(scores)
+            self.rows[name] = self.best(entries)
+            merged += 1
+        
+        return len(affected) + merged
+    
+    def related(self):
+        """Return the data file content: post path to its related posts"""
+        data = {}
+        for name, row in self.rows.items():
+            related = []
+            for score, other in row:
+                meta = dict(self.posts[other][1])
+                meta['score'] = round(-score, 4)
+                related.append(meta)
+            data[self.posts[name][1]['path']] = related
+        return data
+
+def write_related(data, output_file=OUTPUT_FILE):
+    """Write the data file unless it is unchanged; return whether it was written"""
+    text = json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True) + '\n'
+    try:
+        if Path(output_file).read_text(encoding='utf-8') == text:
+            return False
+    except OSError:
+        pass
+    Path(output_file).parent.mkdir(exist_ok=True)
+    atomic_write_text(output_file, text)
+    return True
+
+def update_related_posts(top_k=TOP_K, full=False):
+    """Update _data/related_posts.json from _posts/"""
+    if not Path(POSTS_DIR).is_dir():
+        print(f"❌ No {POSTS_DIR} directory found")
+        return False
+    
+    index = RelatedPosts(top_k=top_k)
+    recomputed = index.update(full=full)
+    written = write_related(index.related())
+    index.save()
+    
+    print(f"🔗 Related posts: {recomputed} of {len(index.posts)} rows recomputed")
+    if written:
+        print(f"✅ Updated {OUTPUT_FILE}")
+    else:
+        print(f"✅ {OUTPUT_FILE} is up to date")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute the related posts of every post into _data/related_posts.json')
+    parser.add_argument('--top-k', type=int, default=TOP_K, help=f'Related posts per post (default: {TOP_K})')
+    parser.add_argument('--full', action='store_true', help='Recompute all rows and document frequencies')
+    
+    args = parser.parse_args()
+    
+    success = update_related_posts(args.top_k, args.full)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
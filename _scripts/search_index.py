@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Build a sharded, compressed search index of the posts into assets/search/
+Usage: python _scripts/search_index.py [--prefix-length 2] [--output-dir assets/search]
+
+Instead of one JSON file with the content of every post, the words of all
+posts go into an inverted index (word to the posts containing it and how
+often), split into shards by the first characters of the word. A search
+client loads manifest.json, then only the shards of the words typed so far:
+all words starting with the same prefix are in the same shard, so prefix
+matching ("pyth" finds "python") needs no other file. The title, URL, date,
+taxonomy and a short excerpt of the posts are in files of DOCS_PER_FILE
+posts each, by the document numbers the postings refer to, so showing the
+first results needs only the files they are in.
+
+Shards are gzip-compressed JSON objects mapping each word to its postings,
+[document, count, document gap, count, ...], with document numbers stored
+as the gap to the previous one. File names carry a content hash, so they can
+be cached forever; unchanged shards keep their names and are not rewritten,
+and files no longer listed in the manifest are removed.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from front_matter import as_list, parse_frontmatter
+from fsutil import atomic_write_bytes, atomic_write_json
+from related_posts import post_permalink, post_url
+
+POSTS_DIR = '_posts'
+OUTPUT_DIR = Path('assets') / 'search'
+MANIFEST_NAME = 'manifest.json'
+SHARDS_DIR = 'shards'
+
+# Bump when the format of the files changes, so clients can tell
+INDEX_VERSION = 1
+
+# Characters of a word that select its shard
+PREFIX_LENGTH = 2
+
+# Shorter words are not indexed
+MIN_WORD_LENGTH = 2
+
+# Characters of the text shown with a result
+EXCERPT_LENGTH = 160
+
+# gzip level of the files: 9 took ten times as long for 5% smaller files
+COMPRESS_LEVEL = 6
+
+# Posts per documents file
+DOCS_PER_FILE = 500
+
+# Words of tag_suggester.tokenize with at least MIN_WORD_LENGTH characters
+WORD_PATTERN = re.compile(r'\w[\w+#]{%d,}' % (MIN_WORD_LENGTH - 1))
+
+# Posts below this count per worker are read in the main process
+MIN_FILES_PER_WORKER = 64
+
+# Markup that is not searchable text: link targets, HTML tags, Liquid tags
+LINK_TARGET_PATTERN = re.compile(r'\]\([^)]*\)')
+MARKUP_PATTERN = re.compile(r'<[^>]+>|\{%.*?%\}|\{\{.*?\}\}')
+
+def searchable_text(body):
+    """Return the text of a post body without link targets and markup"""
+    return MARKUP_PATTERN.sub(' ', LINK_TARGET_PATTERN.sub(']', body))
+
+def excerpt(text):
+    """Return the start of a text, cut at a word boundary"""
+    text = ' '.join(re.sub(r'[#*_`>\[\]!]', ' ', text).split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    return text[:EXCERPT_LENGTH].rsplit(' ', 1)[0] + '…'
+
+def read_post(path, permalink):
+    """Return (document, word counts) of a post, or None if it cannot be read"""
+    try:
+        content = Path(path).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"⚠️  Skipping {path}: {e}")
+        return None
+    
+    frontmatter, _, offset = parse_frontmatter(content)
+    frontmatter = frontmatter if isinstance(frontmatter, dict) else {}
+    title = str(frontmatter.get('title', ''))
+    categories = [str(category) for category in as_list(frontmatter.get('categories'))]
+    tags = [str(tag) for tag in as_list(frontmatter.get('tags'))]
+    text = searchable_text(content[offset:])
+    
+    document = {
+        'title': title,
+        'url': post_url(permalink, Path(path).name, frontmatter),
+        'date': str(frontmatter.get('date', '')),
+        'categories': categories,
+        'tags': tags,
+        'excerpt': str(frontmatter.get('description') or excerpt(text)),
+    }
+    return document, Counter(WORD_PATTERN.findall(' '.join([title, *categories, *tags, text]).lower()))
+
+def read_posts(posts_dir=POSTS_DIR, jobs=None):
+    """Return (documents, word counts) of every post, in file name order
+    
+    Many posts are read and tokenized in worker processes.
+    """
+    permalink = post_permalink()
+    paths = sorted(Path(posts_dir).glob('*.md'))
+    
+    jobs = jobs or os.cpu_count() or 1
+    workers = min(jobs, len(paths) // MIN_FILES_PER_WORKER)
+    if workers <= 1:
+        results = [read_post(path, permalink) for path in paths]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        chunksize = max(1, len(paths) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(read_post, paths, [permalink] * len(paths), chunksize=chunksize))
+    
+    results = [result for result in results if result]
+    return [document for document, _ in results], [counts for _, counts in results]
+
+def build_shards(counts, prefix_length=PREFIX_LENGTH):
+    """Invert the word counts of the documents into {prefix: {word: postings}}"""
+    index = defaultdict(list)
+    for document, words in enumerate(counts):
+        for word, count in words.items():
+            index[word] += (document, count)
+    
+    shards = defaultdict(dict)
+    for word, postings in index.items():
+        # Documents were added in order; store each as the gap to the previous one
+        documents = postings[::2]
+        postings[2::2] = [document - previous for previous, document in zip(documents, documents[1:])]
+        shards[word[:prefix_length]][word] = postings
+    return shards
+
+def compress(data):
+    """Serialize data as compact JSON and gzip it reproducibly (no timestamp)"""
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    return gzip.compress(text.encode('utf-8'), compresslevel=COMPRESS_LEVEL, mtime=0)
+
+def write_file(output_dir, stem, data):
+    """Write data compressed under a name with its hash; return (name, size)"""
+    payload = compress(data)
+    name = f"{stem}-{hashlib.sha256(payload).hexdigest()[:10]}.json.gz"
+    path = output_dir / name
+    if not path.exists():
+        atomic_write_bytes(path, payload)
+    return name, len(payload)
+
+def write_index(documents, shards, output_dir=OUTPUT_DIR, prefix_length=PREFIX_LENGTH):
+    """Write the documents, shards and manifest; return the manifest"""
+    shards_dir = Path(output_dir) / SHARDS_DIR
+    shards_dir.mkdir(parents=True, exist_ok=True)
+    
+    manifest = {
+        'version': INDEX_VERSION,
+        'prefix_length': prefix_length,
+        'min_word_length': MIN_WORD_LENGTH,
+        'documents': len(documents),
+        'docs_per_file': DOCS_PER_FILE,
+        'docs': [],
+        'shards': {},
+    }
+    for start in range(0, len(documents), DOCS_PER_FILE):
+        name, size = write_file(Path(output_dir), f"docs-{start // DOCS_PER_FILE}", documents[start:start + DOCS_PER_FILE])
+        manifest['docs'].append({'file': name, 'bytes': size})
+    for prefix in sorted(shards):
+        # Prefixes may hold any letter, so file names use their UTF-8 bytes in hex
+        name, size = write_file(shards_dir, prefix.encode('utf-8').hex(), shards[prefix])
+        manifest['shards'][prefix] = {'file': f"{SHARDS_DIR}/{name}", 'terms': len(shards[prefix]), 'bytes': size}
+    
+    atomic_write_json(Path(output_dir) / MANIFEST_NAME, manifest)
+    
+    # Remove the files of earlier builds
+    current = {Path(entry['file']).name for entry in manifest['docs'] + list(manifest['shards'].values())}
+    for directory in (Path(output_dir), shards_dir):
+        for path in directory.glob('*.json.gz'):
+            if path.name not in current:
+                path.unlink()
+    return manifest
+
+def index_sizes(manifest):
+    """Return the number of shards and words and the compressed sizes of an index"""
+    shards = manifest['shards'].values()
+    return {
+        'shards': len(shards),
+        'terms': sum(shard['terms'] for shard in shards),
+        'shard_bytes': sum(shard['bytes'] for shard in shards),
+        'largest_shard': max((shard['bytes'] for shard in shards), default=0),
+        'docs_bytes': sum(entry['bytes'] for entry in manifest['docs']),
+    }
+
+def build_search_index(posts_dir=POSTS_DIR, output_dir=OUTPUT_DIR, prefix_length=PREFIX_LENGTH):
+    """Build the search index of posts_dir into output_dir; return the manifest"""
+    documents, counts = read_posts(posts_dir)
+    shards = build_shards(counts, prefix_length)
+    return write_index(documents, shards, output_dir, prefix_length)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a sharded, compressed search index of _posts/')
+    parser.add_argument('--posts-dir', default=POSTS_DIR, help=f'Posts to index (default: {POSTS_DIR})')
+    parser.add_argument('--output-dir', default=str(OUTPUT_DIR), help=f'Where to write the index (default: {OUTPUT_DIR})')
+    parser.add_argument('--prefix-length', type=int, default=PREFIX_LENGTH, help=f'Characters of a word that select its shard (default: {PREFIX_LENGTH})')
+    
+    args = parser.parse_args()
+    
+    if not Path(args.posts_dir).is_dir():
+        print(f"❌ No {args.posts_dir} directory found")
+        sys.exit(1)
+    if args.prefix_length < 1:
+        parser.error("--prefix-length must be at least 1")
+    
+    manifest = build_search_index(args.posts_dir, args.output_dir, args.prefix_length)
+    sizes = index_sizes(manifest)
+    print(f"🔍 Indexed {manifest['documents']} posts: {sizes['terms']} words in {sizes['shards']} shards")
+    print(f"📦 {(sizes['shard_bytes'] + sizes['docs_bytes']) / 1024:.0f} KB compressed in total: "
+          f"shards {sizes['shard_bytes'] / 1024:.0f} KB (largest {sizes['largest_shard'] / 1024:.1f} KB), "
+          f"documents {sizes['docs_bytes'] / 1024:.0f} KB in {len(manifest['docs'])} files")
+    print(f"✅ Manifest: {Path(args.output_dir) / MANIFEST_NAME}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Tag and category suggestions learned from the published posts
+Usage: python _scripts/tag_suggester.py _drafts/my-post.md [--top N]
+
+The vocabulary is every tag and category used in _posts/, plus a few seed
+keywords so a new blog gets suggestions too. A draft is matched against all
+terms at once by an Aho-Corasick automaton over its words, so the time per
+draft grows with its length, not with the number of terms, and a term only
+matches whole words ("ai" does not match "maintain"; "machine learning" and
+"machine-learning" match each other). Matches are ranked by TF-IDF: how often
+the draft mentions a term, weighted by how rare the term is in the bodies of
+the published posts. Categories are ranked by their own matches plus those
+of the tags they were used with.
+
+The vocabulary is kept in .cache/tag_vocabulary.pickle and rebuilt only when
+a post in _posts/ changed.
+"""
+
+import argparse
+import math
+import os
+import pickle
+import re
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from front_matter import as_list, parse_frontmatter
+from fsutil import atomic_write_bytes, cache_dir
+
+# Words are letters, digits and underscores; '+' and '#' may follow (c++, c#)
+TOKEN_PATTERN = re.compile(r'\w[\w+#]*')
+
+VOCABULARY_NAME = 'tag_vocabulary.pickle'
+
+# Bump when the format of the vocabulary changes
+VOCABULARY_VERSION = 1
+
+# Directory the vocabulary is learned from
+POSTS_DIR = '_posts'
+
+# Matches in the title count this many times
+TITLE_WEIGHT = 3
+
+# Tags suggested before any post uses them
+SEED_TAGS = ['python', 'javascript', 'jekyll', 'github', 'docker', 'aws', 'automation', 'ai', 'machine learning']
+
+# Keywords that hint at a category before any post uses it
+SEED_CATEGORIES = {
+    'Development': ['python', 'javascript', 'code', 'programming', 'development'],
+    'Business': ['business', 'client', 'consulting', 'strategy'],
+    'Tools': ['tool', 'software', 'app', 'productivity'],
+    'Tutorials': ['tutorial', 'how to', 'guide', 'step'],
+}
+
+# Category suggested when nothing matches
+DEFAULT_CATEGORY = 'Technology'
+
+def tokenize(text):
+    """Split text into lowercase words"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def term_key(term):
+    """Return the normalized form of a tag, category or keyword (its words joined by spaces)"""
+    return ' '.join(tokenize(str(term)))
+
+class TermMatcher:
+    def __init__(self, terms):
+        """Build an Aho-Corasick automaton over the words of the given terms
+        
+        States are numbered from the root (0); each has its transitions by
+        word, a failure link to the longest proper suffix that is also a
+        prefix of some term, and the terms ending there (including those of
+        its failure chain).
+        """
+        self.terms = list(terms)
+        self.goto = [{}]
+        self.outputs = [[]]
+        
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for word in term.split():
+                next_state = self.goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][word] = next_state
+                    self.goto.append({})
+                    self.outputs.append([])
+                state = next_state
+            if state:
+                self.outputs[state].append(term_id)
+        
+        # Failure links in breadth-first order, so shorter suffixes are done first
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(word, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state].extend(self.outputs[self.fail[next_state]])
+    
+    def count(self, words):
+        """Return how often each term (by index) occurs in a sequence of words"""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        counts = Counter()
+        state = 0
+        for word in words:
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            if outputs[state]:
+                counts.update(outputs[state])
+        return counts
+
+class TagVocabulary:
+    def __init__(self):
+        """Create an empty vocabulary; add posts, then call finish()"""
+        # Term key to the spellings used for it, most common first when shown
+        self.spellings = defaultdict(Counter)
+        self.tags = Counter()
+        self.categories = Counter()
+        # Term key to the category keys of the posts using it, and how many posts used it
+        self.associations = defaultdict(Counter)
+        self.association_uses = Counter()
+        self.document_frequency = Counter()
+        self.documents = 0
+        self.matcher = None
+    
+    def add_terms(self, tags, categories):
+        """Learn the tags and categories of one post (or a seed)"""
+        category_keys = []
+        for category in categories:
+            key = term_key(category)
+            if key:
+                self.spellings[key][str(category)] += 1
+                self.categories[key] += 1
+                category_keys.append(key)
+        
+        for tag in tags:
+            key = term_key(tag)
+            if key:
+                self.spellings[key][str(tag)] += 1
+                self.tags[key] += 1
+                self.association_uses[key] += 1
+                for category_key in category_keys:
+                    self.associations[key][category_key] += 1
+    
+    def add_seeds(self):
+        """Add the seed tags and category keywords with a weight of one post"""
+        for tag in SEED_TAGS:
+            self.add_terms([tag], [])
+        for category, keywords in SEED_CATEGORIES.items():
+            key = term_key(category)
+            self.spellings[key][category] += 1
+            self.categories.setdefault(key, 0)
+            for keyword in keywords:
+                keyword_key = term_key(keyword)
+                self.spellings[keyword_key].setdefault(keyword, 0)
+                self.associations[keyword_key][key] += 1
+                self.association_uses[keyword_key] += 1
+    
+    def label(self, key):
+        """Return the most used spelling of a term"""
+        return self.spellings[key].most_common(1)[0][0]
+    
+    def finish(self, texts):
+        """Build the matcher and count in how many of the given texts each term occurs"""
+        self.matcher = TermMatcher(sorted(self.spellings))
+        for text in texts:
+            self.documents += 1
+            for term_id in self.matcher.count(tokenize(text)):
+                self.document_frequency[self.matcher.terms[term_id]] += 1
+        return self
+    
+    def idf(self, key):
+        """Smoothed inverse document frequency of a term in the published posts"""
+        return math.log((1 + self.documents) / (1 + self.document_frequency[key])) + 1
+    
+    def score_terms(self, title, content):
+        """Return the TF-IDF score of every term the draft mentions"""
+        counts = self.matcher.count(tokenize(content))
+        for term_id, count in self.matcher.count(tokenize(title or '')).items():
+            counts[term_id] += count * TITLE_WEIGHT
+        
+        terms = self.matcher.terms
+        return {terms[term_id]: count * self.idf(terms[term_id]) for term_id, count in counts.items()}
+    
+    def suggest(self, title, content, max_categories=2, max_tags=5):
+        """Return ([(category, score)], [(tag, score)]) for a draft, best first"""
+        scores = self.score_terms(title, content)
+        
+        tags = [(self.label(key), score) for key, score in scores.items() if key in self.tags]
+        tags.sort(key=lambda item: (-item[1], item[0]))
+        
+        # A category scores with its own name and with the words of its posts' tags
+        category_scores = Counter()
+        for key, score in scores.items():
+            if key in self.categories:
+                category_scores[key] += score
+            for category_key, uses in self.associations.get(key, {}).items():
+                category_scores[category_key] += score * uses / self.association_uses[key]
+        categories = [(self.label(key), score) for key, score in category_scores.items()]
+        categories.sort(key=lambda item: (-item[1], item[0]))
+        
+        return categories[:max_categories], tags[:max_tags]
+    
+    # The cache holds the counts only (not this class, which is pickled by
+    # module name), and the matcher is rebuilt from them
+    STATE = ('spellings', 'tags', 'categories', 'associations', 'association_uses', 'document_frequency', 'documents')
+    
+    def state(self):
+        """Return the counts of the vocabulary as plain data"""
+        return {name: getattr(self, name) for name in self.STATE}
+    
+    @classmethod
+    def from_state(cls, state):
+        """Restore a vocabulary from its state()"""
+        vocabulary = cls()
+        vocabulary.__dict__.update(state)
+        vocabulary.matcher = TermMatcher(sorted(vocabulary.spellings))
+        return vocabulary
+
+def posts_signature(posts_dir):
+    """Return the (name, mtime, size) of every post, which the cached vocabulary is valid for"""
+    if not os.path.isdir(posts_dir):
+        return ()
+    return tuple(sorted((entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                        for entry in os.scandir(posts_dir) if entry.name.endswith('.md')))
+
+def build_vocabulary(posts_dir=POSTS_DIR):
+    """Learn the vocabulary from all posts in posts_dir"""
+    vocabulary = TagVocabulary()
+    vocabulary.add_seeds()
+    
+    texts = []
+    for path in sorted(Path(posts_dir).glob('*.md')):
+        try:
+            content = path.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            continue
+        frontmatter, _, offset = parse_frontmatter(content)
+        frontmatter = frontmatter if isinstance(frontmatter, dict) else {}
+        vocabulary.add_terms(as_list(frontmatter.get('tags')), as_list(frontmatter.get('categories')))
+        texts.append(f"{frontmatter.get('title', '')}\n{content[offset:]}")
+    
+    return vocabulary.finish(texts)
+
+def load_vocabulary(posts_dir=POSTS_DIR, cache_file=None):
+    """Return the vocabulary of posts_dir, from the cache unless a post changed"""
+    cache_file = cache_file or cache_dir() / VOCABULARY_NAME
+    signature = posts_signature(posts_dir)
+    
+    # A missing, outdated or corrupt cache is simply rebuilt
+    try:
+        with open(cache_file, 'rb') as f:
+            version, cached_signature, state = pickle.load(f)
+        if version == VOCABULARY_VERSION and cached_signature == signature:
+            return TagVocabulary.from_state(state)
+    except Exception:
+        pass
+    
+    vocabulary = build_vocabulary(posts_dir)
+    atomic_write_bytes(cache_file, pickle.dumps((VOCABULARY_VERSION, signature, vocabulary.state()), protocol=pickle.HIGHEST_PROTOCOL))
+    return vocabulary
+
+def suggest_categories_and_tags(content, title, vocabulary=None, max_categories=2, max_tags=5):
+    """Return the names of the suggested categories and tags for a draft"""
+    vocabulary = vocabulary or load_vocabulary()
+    categories, tags = vocabulary.suggest(title, content, max_categories, max_tags)
+    return [name for name, _ in categories] or [DEFAULT_CATEGORY], [name for name, _ in tags]
+
+def main():
+    parser = argparse.ArgumentParser(description='Suggest tags and categories for a draft from those used in _posts/')
+    parser.add_argument('drafts', nargs='+', help='Drafts to suggest tags and categories for')
+    parser.add_argument('--top', type=int, default=5, help='Number of suggestions to show (default: 5)')
+    
+    args = parser.parse_args()
+    
+    vocabulary = load_vocabulary()
+    print(f"📚 Vocabulary: {len(vocabulary.tags)} tags, {len(vocabulary.categories)} categories from {vocabulary.documents} posts")
+    
+    for draft in args.drafts:
+        content = Path(draft).read_text(encoding='utf-8')
+        frontmatter, _, offset = parse_frontmatter(content)
+        title = frontmatter.get('title', '') if isinstance(frontmatter, dict) else ''
+        categories, tags = vocabulary.suggest(title, content[offset:], args.top, args.top)
+        
+        print(f"\n📄 {draft}")
+        print(f"🏷️  Categories: {', '.join(f'{name} ({score:.1f})' for name, score in categories) or DEFAULT_CATEGORY}")
+        print(f"🔖 Tags: {', '.join(f'{name} ({score:.1f})' for name, score in tags) or '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Tests for link_checker.LinkChecker against a local HTTP server
+
+The server answers HEAD and GET from a script of (status, delay) per path
+and counts how many requests it is serving at once, so a test can check the
+GET fallback, the cache and the per-host connection limit.
+"""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from link_checker import LinkChecker
+from validate_post import print_link_report
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answer each request with the status scripted for its method and path, after its delay."""
+    
+    def respond(self):
+        server = self.server
+        server.requests.append((self.command, self.path))
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        status, delay = server.responses[self.path][self.command]
+        time.sleep(delay)
+        with server.lock:
+            server.active -= 1
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    do_HEAD = do_GET = respond
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    httpd.requests = []
+    httpd.responses = {}
+    httpd.lock = threading.Lock()
+    httpd.active = httpd.peak = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+def test_fallback_broken_links_and_cache(server, tmp_path, capsys):
+    server.responses['/ok'] = {'HEAD': (200, 0)}
+    server.responses['/no-head'] = {'HEAD': (405, 0), 'GET': (200, 0)}
+    server.responses['/missing'] = {'HEAD': (404, 0), 'GET': (404, 0)}
+    server.responses['/slow'] = {'HEAD': (200, 0.2)}
+    urls = [url(server, path) for path in ('/ok', '/no-head', '/missing', '/slow')]
+    cache_file = tmp_path / 'link-check.json'
+    
+    results = LinkChecker(cache_file).check_all(urls)
+    
+    ok, no_head, missing, slow = (results[link] for link in urls)
+    assert (ok['ok'], ok['status'], ok['method']) == (True, 200, 'HEAD')
+    assert (no_head['ok'], no_head['status'], no_head['method']) == (True, 200, 'GET')
+    assert (missing['ok'], missing['status'], missing['method']) == (False, 404, 'GET')
+    assert not any(result['cached'] for result in results.values())
+    assert slow['latency_ms'] >= 200
+    assert sorted(server.requests) == sorted([
+        ('HEAD', '/ok'), ('HEAD', '/no-head'), ('GET', '/no-head'),
+        ('HEAD', '/missing'), ('GET', '/missing'), ('HEAD', '/slow'),
+    ])
+    
+    # The report lists the slowest link first, with its latency
+    print_link_report(results)
+    report = capsys.readouterr().out.splitlines()
+    assert report[1] == "🔗 Links: 4 checked (0 from cache)"
+    assert report[2] == f"   ✅ 200 {slow['latency_ms']:7.0f} ms  {urls[3]}"
+    assert f"   ❌ 404 {missing['latency_ms']:7.0f} ms  {urls[2]}" in report
+    
+    # The next run answers from the cache, broken links included
+    server.requests.clear()
+    cached = LinkChecker(cache_file).check_all(urls)
+    
+    assert server.requests == []
+    assert all(result['cached'] for result in cached.values())
+    assert {link: result['status'] for link, result in cached.items()} == {
+        link: result['status'] for link, result in results.items()}
+    
+    # Unless the links are refreshed
+    refreshed = LinkChecker(cache_file, refresh=True).check_all(urls)
+    
+    assert not any(result['cached'] for result in refreshed.values())
+    assert len(server.requests) == 6
+
+def test_per_host_limit(server, tmp_path):
+    paths = [f'/page-{i}' for i in range(8)]
+    for path in paths:
+        server.responses[path] = {'HEAD': (200, 0.1)}
+    
+    checker = LinkChecker(tmp_path / 'link-check.json', connections=8, per_host=2)
+    results = checker.check_all(url(server, path) for path in paths)
+    
+    assert all(result['ok'] for result in results.values())
+    assert len(server.requests) == len(paths)
+    assert server.peak == 2
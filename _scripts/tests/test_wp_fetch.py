@@ -0,0 +1,85 @@
+"""
+Tests for wp_fetch.MediaFetcher against a local HTTP server
+
+The server answers from a script of responses per path, so a test can make
+the first request fail with 503, cut the second one short and check that
+the third asks for the rest with a Range header.
+"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wp_fetch import MediaFetcher
+
+PHOTO = bytes(range(256)) * 64
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    """Answer each request with the next response scripted for its path."""
+    
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('Range')))
+        responses = self.server.responses[self.path]
+        status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ScriptedHandler)
+    httpd.requests = []
+    httpd.responses = {}
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+def test_retry_resume_and_remembered_failure(server, tmp_path):
+    half = len(PHOTO) // 2
+    server.responses['/2020/01/photo.jpg'] = [
+        (503, {'Content-Length': '0'}, b''),
+        # Announces the whole file, but the connection closes after half of it
+        (200, {'Content-Length': str(len(PHOTO))}, PHOTO[:half]),
+        (206, {'Content-Length': str(len(PHOTO) - half),
+               'Content-Range': f'bytes {half}-{len(PHOTO) - 1}/{len(PHOTO)}'}, PHOTO[half:]),
+    ]
+    server.responses['/2020/01/gone.jpg'] = [(404, {'Content-Length': '0'}, b'')]
+    
+    media_dir = tmp_path / 'media'
+    state_file = tmp_path / 'fetch-state.json'
+    downloads = [(url(server, '/2020/01/photo.jpg'), '2020/01/photo.jpg'),
+                 (url(server, '/2020/01/gone.jpg'), '2020/01/gone.jpg')]
+    
+    fetched = MediaFetcher(media_dir, state_file, backoff=0.01).fetch_all(downloads)
+    
+    assert fetched == ['2020/01/photo.jpg']
+    assert (media_dir / '2020/01/photo.jpg').read_bytes() == PHOTO
+    assert not list(media_dir.rglob('*.part'))
+    assert [request for request in server.requests if request[0] == '/2020/01/photo.jpg'] == [
+        ('/2020/01/photo.jpg', None),
+        ('/2020/01/photo.jpg', None),
+        ('/2020/01/photo.jpg', f'bytes={half}-'),
+    ]
+    assert server.requests.count(('/2020/01/gone.jpg', None)) == 1
+    
+    # The next run requests neither the fetched file nor the one that was not found
+    server.requests.clear()
+    fetched = MediaFetcher(media_dir, state_file, backoff=0.01).fetch_all(downloads)
+    
+    assert fetched == ['2020/01/photo.jpg']
+    assert server.requests == []
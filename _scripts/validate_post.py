@@ -2,36 +2,45 @@
 """
 Validate Jekyll post formatting and requirements
 Usage: python _scripts/validate_post.py _drafts/my-post.md
+       python _scripts/validate_post.py --all [--jobs N] [--quiet] [--check-links]
+       python _scripts/validate_post.py '_posts/2024-*.md' _drafts/my-post.md
+       python _scripts/validate_post.py --all --format ndjson
 """
 
 import sys
 import os
-import re
-import yaml
-import requests
+import argparse
+import glob
 from pathlib import Path
 from urllib.parse import urlparse
 
-def validate_frontmatter(content):
+from corpus import Corpus, Document
+from front_matter import MISSING_END, MISSING_START
+from markdown_stats import body_start, scan_markdown
+from records import RecordWriter, add_format_argument
+
+# Prefix of an issue message and the severity it stands for
+SEVERITIES = {'❌': 'error', '⚠️': 'warning'}
+
+def validate_frontmatter(content, document=None):
     """Validate Jekyll front matter"""
     issues = []
     
-    if not content.startswith('---\n'):
+    # Extract front matter (parsed once per document)
+    document = document or Document(None, content)
+    frontmatter = document.frontmatter
+    error = document.frontmatter_error
+    
+    if error == MISSING_START:
         issues.append("❌ Missing front matter delimiter at start")
         return issues, None
     
-    # Extract front matter
-    try:
-        end_idx = content.find('\n---\n', 4)
-        if end_idx == -1:
-            issues.append("❌ Missing front matter closing delimiter")
-            return issues, None
-        
-        fm_content = content[4:end_idx]
-        frontmatter = yaml.safe_load(fm_content)
-        
-    except yaml.YAMLError as e:
-        issues.append(f"❌ Invalid YAML in front matter: {e}")
+    if error == MISSING_END:
+        issues.append("❌ Missing front matter closing delimiter")
+        return issues, None
+    
+    if error is not None:
+        issues.append(f"❌ Invalid YAML in front matter: {error}")
         return issues, None
     
     # Required fields
@@ -65,41 +74,45 @@ def validate_frontmatter(content):
     
     return issues, frontmatter
 
-def validate_content_structure(content):
+def scan_post(content):
+    """Return the Markdown statistics of a post's body (after the front matter)"""
+    return scan_markdown(content, body_start(content))
+
+def validate_content_structure(content, stats=None):
     """Validate content structure and formatting"""
     issues = []
+    stats = stats or scan_post(content)
     
     # Check for headers
-    headers = re.findall(r'^#{1,6}\s+(.+)$', content, re.MULTILINE)
-    if len(headers) < 2:
+    if stats.headers < 2:
         issues.append("⚠️  Consider adding more headers for better structure")
     
     # Check for very long paragraphs
-    paragraphs = content.split('\n\n')
-    long_paragraphs = [p for p in paragraphs if len(p) > 500 and not p.startswith('```')]
-    if long_paragraphs:
-        issues.append(f"⚠️  {len(long_paragraphs)} paragraphs are very long (>500 chars)")
+    if stats.long_paragraphs:
+        issues.append(f"⚠️  {stats.long_paragraphs} paragraphs are very long (>500 chars)")
     
     # Check for code blocks
-    code_blocks = re.findall(r'```(\w+)?\n', content)
-    for i, block in enumerate(code_blocks):
-        if not block:
+    for i, language in enumerate(stats.code_languages):
+        if not language:
             issues.append(f"⚠️  Code block {i+1} missing language specification")
     
     # Check for images without alt text
-    images = re.findall(r'!\[(.*?)\]\(.+?\)', content)
-    for img_alt in images:
+    for img_alt in stats.image_alts:
         if not img_alt.strip():
             issues.append("⚠️  Image found without alt text")
     
     return issues
 
-def validate_links(content):
+def extract_links(content):
+    """Find all external Markdown links"""
+    return scan_post(content).links
+
+def validate_links(content, stats=None):
     """Validate external links (basic check)"""
     issues = []
     
     # Find all links
-    links = re.findall(r'\[.*?\]\((https?://[^\)]+)\)', content)
+    links = (stats or scan_post(content)).links
     
     for link in links:
         try:
@@ -115,44 +128,136 @@ def validate_links(content):
     
     return issues
 
-def estimate_reading_time(content):
+def estimate_reading_time(content, stats=None):
     """Estimate reading time"""
-    # Remove front matter and markdown formatting for word count
-    text_content = re.sub(r'^---.*?---\n', '', content, flags=re.DOTALL)
-    text_content = re.sub(r'[#*`\[\]()_-]', '', text_content)
-    words = len(text_content.split())
+    # Words of the body, not counting bare Markdown punctuation
+    words = (stats or scan_post(content)).text_words
     
     reading_time = max(1, round(words / 200))  # 200 words per minute
     return words, reading_time
 
-def validate_post(file_path):
-    """Main validation function"""
-    if not os.path.exists(file_path):
-        print(f"❌ File not found: {file_path}")
-        return False
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    print(f"🔍 Validating: {file_path}")
-    print("=" * 50)
+# Directories validated by --all
+POST_DIRS = ('_drafts', '_posts')
+
+# Files below this count per worker are validated in the main process
+MIN_FILES_PER_WORKER = 16
+
+def analyze_post(file_path, corpus=None):
+    """Run all validations on a post and return the results"""
+    document = (corpus or Corpus()).get(file_path)
+    content = document.content
     
     all_issues = []
     
     # Validate front matter
-    fm_issues, frontmatter = validate_frontmatter(content)
+    fm_issues, frontmatter = validate_frontmatter(content, document)
     all_issues.extend(fm_issues)
     
+    # Scan the body once for all following checks
+    stats = scan_post(content)
+    
     # Validate content structure
-    content_issues = validate_content_structure(content)
+    content_issues = validate_content_structure(content, stats)
     all_issues.extend(content_issues)
     
     # Validate links
-    link_issues = validate_links(content)
+    link_issues = validate_links(content, stats)
     all_issues.extend(link_issues)
     
     # Content statistics
-    words, reading_time = estimate_reading_time(content)
+    words, reading_time = estimate_reading_time(content, stats)
+    
+    return {
+        'path': str(file_path),
+        'issues': all_issues,
+        'frontmatter': frontmatter,
+        'words': words,
+        'reading_time': reading_time,
+        'links': stats.links,
+    }
+
+def analyze_post_safely(file_path, corpus=None):
+    """Analyze a post, reporting any failure as an error instead of raising"""
+    try:
+        return analyze_post(file_path, corpus)
+    except Exception as e:
+        return {'path': str(file_path), 'issues': [f"❌ Could not validate: {e}"],
+                'frontmatter': None, 'words': 0, 'reading_time': 0, 'links': []}
+
+def count_issues(issues):
+    """Count errors and warnings in a list of issues"""
+    errors = len([i for i in issues if i.startswith('❌')])
+    warnings = len([i for i in issues if i.startswith('⚠️')])
+    return errors, warnings
+
+def issue_record(issue):
+    """Split an issue message into its severity and the message itself"""
+    for prefix, severity in SEVERITIES.items():
+        if issue.startswith(prefix):
+            return {'severity': severity, 'message': issue[len(prefix):].strip()}
+    return {'severity': 'info', 'message': issue}
+
+def post_record(result, quiet=False):
+    """Return the results of a post as a record for the structured formats"""
+    errors, warnings = count_issues(result['issues'])
+    issues = [issue_record(issue) for issue in result['issues']]
+    if quiet:
+        issues = [issue for issue in issues if issue['severity'] == 'error']
+    return {
+        'type': 'post',
+        'path': result['path'],
+        'ok': errors == 0,
+        'errors': errors,
+        'warnings': warnings,
+        'issues': issues,
+        'words': result['words'],
+        'reading_time': result['reading_time'],
+        'frontmatter': result['frontmatter'],
+        'links': result['links'],
+    }
+
+def check_links(results, checker):
+    """Check the links of all posts at once and add broken ones to their issues"""
+    link_results = checker.check_all(link for result in results for link in result['links'])
+    
+    for result in results:
+        for link in sorted(set(result['links'])):
+            link_result = link_results[link]
+            if not link_result['ok']:
+                reason = link_result['status'] or link_result['error']
+                result['issues'].append(f"⚠️  Broken link ({reason}): {link}")
+    
+    return link_results
+
+def print_link_report(link_results, broken_only=False):
+    """Print the status and latency of each checked link"""
+    if not link_results:
+        return
+    
+    cached = len([r for r in link_results.values() if r['cached']])
+    print(f"\n🔗 Links: {len(link_results)} checked ({cached} from cache)")
+    for link, result in sorted(link_results.items(), key=lambda item: -item[1]['latency_ms']):
+        if broken_only and result['ok']:
+            continue
+        status = "✅" if result['ok'] else "❌"
+        code = result['status'] or result['error']
+        source = " (cached)" if result['cached'] else ""
+        print(f"   {status} {code} {result['latency_ms']:7.0f} ms  {link}{source}")
+
+def validate_post(file_path, checker=None, corpus=None):
+    """Main validation function"""
+    if not os.path.exists(file_path):
+        print(f"❌ File not found: {file_path}")
+        return False
+    
+    print(f"🔍 Validating: {file_path}")
+    print("=" * 50)
+    
+    result = analyze_post(file_path, corpus)
+    link_results = check_links([result], checker) if checker else {}
+    all_issues = result['issues']
+    frontmatter = result['frontmatter']
+    words, reading_time = result['words'], result['reading_time']
     
     # Report results
     if not all_issues:
@@ -171,6 +276,8 @@ def validate_post(file_path):
         print(f"   🏷️  Categories: {', '.join(frontmatter.get('categories', []))}")
         print(f"   🔖 Tags: {', '.join(frontmatter.get('tags', []))}")
     
+    print_link_report(link_results)
+    
     # Recommendations
     print(f"\n💡 Recommendations:")
     if words < 300:
@@ -180,8 +287,7 @@ def validate_post(file_path):
     else:
         print("   ✅ Good content length")
     
-    severity_count = len([i for i in all_issues if i.startswith('❌')])
-    warning_count = len([i for i in all_issues if i.startswith('⚠️')])
+    severity_count, warning_count = count_issues(all_issues)
     
     print(f"\n📈 Validation Summary:")
     print(f"   ❌ Errors: {severity_count}")
@@ -195,11 +301,162 @@ def validate_post(file_path):
         print(f"\n🔧 Please fix errors before publishing")
         return False
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python _scripts/validate_post.py _drafts/my-post.md")
+def find_posts(patterns, include_all=False):
+    """Expand file names and glob patterns into a sorted list of posts"""
+    paths = set()
+    if include_all:
+        for post_dir in POST_DIRS:
+            paths.update(str(path) for path in Path(post_dir).glob('*.md'))
+    
+    for pattern in patterns:
+        # Keep names that match nothing so they are reported as missing
+        paths.update(glob.glob(pattern, recursive=True) or [pattern])
+    
+    return sorted(paths)
+
+def iter_analyses(paths, jobs=None, corpus=None):
+    """Yield the results of many posts in order, spreading them across worker processes
+    
+    Posts of a shared corpus are analyzed in this process, where they are
+    already loaded. Each result is yielded as soon as it is available.
+    """
+    jobs = jobs or os.cpu_count() or 1
+    workers = min(jobs, len(paths) // MIN_FILES_PER_WORKER)
+    if workers <= 1 or corpus:
+        for path in paths:
+            yield analyze_post_safely(path, corpus)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(analyze_post_safely, paths, chunksize=chunksize)
+
+def analyze_posts(paths, jobs=None, corpus=None):
+    """Analyze many posts, spreading them across worker processes"""
+    return list(iter_analyses(paths, jobs, corpus))
+
+def validate_posts(paths, jobs=None, quiet=False, checker=None, corpus=None):
+    """Validate many posts in one process and print an aggregated report"""
+    missing = [path for path in paths if not os.path.exists(path)]
+    for path in missing:
+        print(f"❌ File not found: {path}")
+    
+    existing = [path for path in paths if os.path.exists(path)]
+    print(f"🔍 Validating {len(existing)} files")
+    print("=" * 50)
+    
+    results = analyze_posts(existing, jobs, corpus)
+    link_results = check_links(results, checker) if checker else {}
+    
+    total_errors = total_warnings = failed_files = 0
+    for result in results:
+        errors, warnings = count_issues(result['issues'])
+        total_errors += errors
+        total_warnings += warnings
+        if errors:
+            failed_files += 1
+        
+        shown = [i for i in result['issues'] if not quiet or i.startswith('❌')]
+        if shown:
+            status = "❌" if errors else "⚠️ "
+            print(f"{status} {result['path']} ({errors} errors, {warnings} warnings)")
+            for issue in shown:
+                print(f"     {issue}")
+    
+    print_link_report(link_results, broken_only=quiet)
+    
+    total_words = sum(result['words'] for result in results)
+    print("\n📈 Validation Summary:")
+    print(f"   📄 Files: {len(results)} ({len(results) - failed_files} ready for publishing)")
+    print(f"   ❌ Errors: {total_errors} in {failed_files} files")
+    print(f"   ⚠️  Warnings: {total_warnings}")
+    print(f"   📝 Word count: {total_words}")
+    
+    return total_errors == 0 and not missing
+
+def write_records(paths, output_format, jobs=None, quiet=False, checker=None, corpus=None):
+    """Write a record per post, per checked link and a summary as JSON or NDJSON
+    
+    Without link checking each post is written as soon as it is analyzed;
+    with it, posts are written once all links are checked, since broken
+    links are added to their issues.
+    """
+    existing = [path for path in paths if os.path.exists(path)]
+    missing = [path for path in paths if not os.path.exists(path)]
+    total_errors = total_warnings = total_words = failed_files = 0
+    
+    with RecordWriter(output_format) as writer:
+        for path in missing:
+            writer.write({'type': 'post', 'path': path, 'ok': False, 'errors': 1, 'warnings': 0,
+                          'issues': [{'severity': 'error', 'message': 'File not found'}]})
+        
+        results = iter_analyses(existing, jobs, corpus)
+        link_results = {}
+        if checker:
+            results = list(results)
+            link_results = check_links(results, checker)
+        
+        for result in results:
+            record = post_record(result, quiet)
+            total_errors += record['errors']
+            total_warnings += record['warnings']
+            total_words += record['words']
+            if record['errors']:
+                failed_files += 1
+            writer.write(record)
+        
+        for link, link_result in sorted(link_results.items()):
+            if quiet and link_result['ok']:
+                continue
+            writer.write({'type': 'link', 'url': link, **link_result})
+        
+        success = total_errors == 0 and not missing
+        writer.write({
+            'type': 'summary',
+            'ok': success,
+            'files': len(existing),
+            'ready': len(existing) - failed_files,
+            'missing': len(missing),
+            'errors': total_errors,
+            'failed_files': failed_files,
+            'warnings': total_warnings,
+            'words': total_words,
+        })
+    
+    return success
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate Jekyll post formatting and requirements')
+    parser.add_argument('files', nargs='*', help='Posts to validate (glob patterns are expanded)')
+    parser.add_argument('--all', action='store_true', help='Validate every post in _drafts/ and _posts/')
+    parser.add_argument('--jobs', type=int, default=0, help='Number of worker processes (default: one per CPU)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Only report errors in batch mode, not warnings')
+    parser.add_argument('--check-links', action='store_true', help='Check that external links are reachable (results are cached)')
+    parser.add_argument('--refresh-links', action='store_true', help='Recheck all links, ignoring cached results')
+    add_format_argument(parser)
+    
+    args = parser.parse_args()
+    
+    if not args.files and not args.all:
+        parser.print_usage()
         sys.exit(1)
     
-    file_path = sys.argv[1]
-    success = validate_post(file_path)
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    paths = find_posts(args.files, args.all)
+    checker = None
+    if args.check_links or args.refresh_links:
+        # requests is only needed (and imported) for link checking
+        from link_checker import LinkChecker
+        checker = LinkChecker(refresh=args.refresh_links)
+    
+    # A single file keeps the detailed report
+    if args.format != 'text':
+        success = write_records(paths, args.format, jobs=args.jobs, quiet=args.quiet, checker=checker)
+    elif len(paths) == 1 and not args.all:
+        success = validate_post(paths[0], checker)
+    else:
+        success = validate_posts(paths, jobs=args.jobs, quiet=args.quiet, checker=checker)
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Streaming access to WordPress export (WXR) files
+
+Shared by the converter and the post lister, which only need the items one
+at a time and should not hold a large export in memory.
+"""
+
+import xml.etree.ElementTree as ET
+
+# Define XML namespaces used in WordPress export
+NAMESPACES = {
+    'wp': 'http://wordpress.org/export/1.2/',
+    'content': 'http://purl.org/rss/1.0/modules/content/',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'excerpt': 'http://wordpress.org/export/1.2/excerpt/',
+}
+
+def iter_export_items(xml_file):
+    """Yield each <item> of a WordPress export as soon as it is fully parsed.
+    
+    Items are cleared and detached from the channel once the caller is done
+    with them, so memory use stays flat regardless of the export size.
+    """
+    channel = None
+    for event, elem in ET.iterparse(xml_file, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'channel':
+                channel = elem
+            continue
+        
+        if elem.tag == 'item':
+            yield elem
+            elem.clear()
+            if channel is not None:
+                channel.remove(elem)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Concurrent fetcher for WordPress media missing from the media export
+
+Downloads attachments that the export references but the media dump does not
+contain, so the converter can copy them like any other image instead of
+leaving a dead files.wordpress.com URL in the post.
+
+Downloads run concurrently on an asyncio loop, with a bounded number of open
+connections. Transient errors (timeouts, 429 and 5xx responses) are retried
+with exponential backoff. Data is written to <target>.part and renamed into
+place once complete, so an interrupted run resumes with an HTTP range
+request. URLs that failed permanently (e.g. 404) are remembered in a state
+file and not requested again until FAILURE_TTL has passed.
+"""
+
+import asyncio
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from fsutil import CHUNK_SIZE, atomic_write_json, load_json
+
+USER_AGENT = 'wp_to_jekyll media fetcher'
+
+# Statuses worth retrying; every other HTTP error is permanent
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Seconds before a permanently failed URL is requested again
+FAILURE_TTL = 24 * 60 * 60
+
+class PermanentFetchError(Exception):
+    """A download that retrying will not fix."""
+
+class MediaFetcher:
+    def __init__(self, media_dir, state_file, connections=8, retries=4, backoff=1.0, timeout=30):
+        """Create a fetcher writing below media_dir, remembering failures in state_file."""
+        self.media_dir = Path(media_dir)
+        self.state_file = Path(state_file)
+        self.connections = max(1, connections)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        
+        # URL to {'error', 'time'} of permanent failures
+        self.failures = {}
+    
+    def fetch_all(self, downloads):
+        """Download (url, rel_path) pairs; return the rel_paths now present.
+        
+        Files that already exist are not requested again.
+        """
+        self.failures = load_json(self.state_file, {})
+        try:
+            return asyncio.run(self._fetch_all(downloads))
+        finally:
+            atomic_write_json(self.state_file, self.failures)
+    
+    async def _fetch_all(self, downloads):
+        semaphore = asyncio.Semaphore(self.connections)
+        results = await asyncio.gather(*(self._fetch(url, rel_path, semaphore) for url, rel_path in downloads))
+        return [rel_path for rel_path in results if rel_path]
+    
+    async def _fetch(self, url, rel_path, semaphore):
+        """Download one URL with retries; return rel_path on success, else None."""
+        target = self.media_dir / rel_path
+        if target.exists():
+            return rel_path
+        
+        failure = self.failures.get(url)
+        if failure and time.time() - failure['time'] < FAILURE_TTL:
+            print(f"Skipping {url}: failed with {failure['error']} in a previous run")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            try:
+                async with semaphore:
+                    size = await loop.run_in_executor(None, self._download, url, target)
+                self.failures.pop(url, None)
+                print(f"Fetched {url} ({size / 1024:.0f} KB)")
+                return rel_path
+            except PermanentFetchError as e:
+                self.failures[url] = {'error': str(e), 'time': time.time()}
+                print(f"Warning: Could not fetch {url}: {e}")
+                return None
+            except (OSError, urllib.error.URLError) as e:
+                if attempt == self.retries:
+                    print(f"Warning: Could not fetch {url} after {attempt + 1} attempts: {e}")
+                    return None
+                delay = self.backoff * 2 ** attempt * (1 + random.random())
+                print(f"Retrying {url} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    def _download(self, url, target):
+        """Download url to target, resuming a partial download; return its size.
+        
+        Runs in a worker thread.
+        """
+        target.parent.mkdir(parents=True, exist_ok=True)
+        part_path = target.with_name(target.name + '.part')
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        
+        request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+        if offset:
+            request.add_header('Range', f'bytes={offset}-')
+        
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # The partial file is already complete
+                os.replace(part_path, target)
+                return offset
+            if e.code in RETRY_STATUSES:
+                raise
+            raise PermanentFetchError(f"HTTP {e.code}") from e
+        
+        with response:
+            # A server that ignores the range sends the whole file again
+            mode = 'ab' if offset and response.status == 206 else 'wb'
+            with open(part_path, mode) as f:
+                while True:
+                    chunk = response.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            
+            expected = response.headers.get('Content-Length')
+            written = part_path.stat().st_size - (offset if mode == 'ab' else 0)
+            if expected is not None and written < int(expected):
+                raise OSError(f"Connection closed after {written} of {expected} bytes")
+        
+        os.replace(part_path, target)
+        return target.stat().st_size
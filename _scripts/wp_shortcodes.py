@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Gallery and shortcode parser for the WordPress to Jekyll converter
+
+All patterns are compiled once at import time. A single scan of a post
+extracts every gallery (Jetpack tiled-gallery blocks and [gallery] shortcodes)
+together with the src of every wp-image-N image, so expanding the galleries of
+a post costs one pass over its content instead of one pass per attachment.
+"""
+
+import re
+from collections import namedtuple
+
+# Jetpack tiled-gallery blocks and classic [gallery] shortcodes, in one alternation
+GALLERY_PATTERN = re.compile(
+    r'(?P<jetpack><!-- wp:jetpack/tiled-gallery \{.*?"ids":\[(?P<jetpack_ids>[^\]]+)\].*? /-->)'
+    r'|\[gallery(?P<attrs>[^\]]*)\]'
+)
+
+# Explicit attachment IDs of a [gallery] shortcode
+GALLERY_IDS_PATTERN = re.compile(r'ids="([^"]+)"')
+
+# Image tags WordPress tagged with their attachment ID
+WP_IMAGE_PATTERN = re.compile(r'wp-image-(\d+)"[^>]*src="([^"]+)"')
+
+# A gallery found in post content. kind is 'jetpack' or 'gallery'; ids is
+# None for a [gallery] shortcode without ids, which shows all attachments.
+Gallery = namedtuple('Gallery', ['kind', 'start', 'end', 'ids'])
+
+def split_ids(ids_str):
+    """Split a comma-separated list of attachment IDs, dropping quotes and spaces."""
+    return ids_str.replace('"', '').replace(' ', '').split(',')
+
+def parse_shortcodes(content):
+    """Scan post content once for galleries and wp-image-N image sources.
+    
+    Returns (galleries, image_sources): the galleries in document order and a
+    map of attachment ID to the src of the first image tagged with that ID.
+    """
+    galleries = []
+    for match in GALLERY_PATTERN.finditer(content):
+        if match.group('jetpack'):
+            galleries.append(Gallery('jetpack', match.start(), match.end(), split_ids(match.group('jetpack_ids'))))
+        else:
+            ids_match = GALLERY_IDS_PATTERN.search(match.group('attrs'))
+            ids = split_ids(ids_match.group(1)) if ids_match else None
+            galleries.append(Gallery('gallery', match.start(), match.end(), ids))
+    
+    image_sources = {}
+    for match in WP_IMAGE_PATTERN.finditer(content):
+        image_sources.setdefault(match.group(1), match.group(2))
+    
+    return galleries, image_sources
+
+def replace_galleries(content, galleries, render):
+    """Replace each gallery with render(gallery), building the result in one pass."""
+    parts = []
+    position = 0
+    for gallery in galleries:
+        parts.append(content[position:gallery.start])
+        parts.append(render(gallery))
+        position = gallery.end
+    parts.append(content[position:])
+    return ''.join(parts)
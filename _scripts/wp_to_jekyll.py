@@ -6,44 +6,123 @@ This script converts WordPress export XML files to Jekyll blog posts,
 preserving metadata, content, and downloading associated images.
 
 Usage:
-    python wp_to_jekyll.py --xml-file <wordpress_export.xml> --media-dir <media_directory> [--output-dir <jekyll_posts_dir>] [--post-ids id1,id2,id3] [--date-after YYYY-MM-DD] [--date-before YYYY-MM-DD]
+    python wp_to_jekyll.py --xml-file <wordpress_export.xml> --media-dir <media_directory> [--output-dir <jekyll_posts_dir>] [--post-ids id1,id2,id3] [--date-after YYYY-MM-DD] [--date-before YYYY-MM-DD] [--stream] [--rebuild-media-index] [--jobs N] [--force] [--link-mode copy|reflink|hardlink|auto] [--dedupe] [--fetch-missing]
 
 Requirements:
     - beautifulsoup4
-    - html2markdown
-    - python-dateutil
+    - html2markdown (0.1.7 converts fastest; other versions work, parsing each post twice)
 """
 
 import argparse
+import contextlib
+import io
+import json
 import os
 import re
-import shutil
 import sys
+import tempfile
 import xml.etree.ElementTree as ET
 import html
+from collections import deque
 from datetime import datetime
 from urllib.parse import urlparse, unquote
 from pathlib import Path
 
-try:
-    from bs4 import BeautifulSoup
-    import html2markdown
-    import dateutil.parser
-except ImportError:
-    print("Required packages missing. Install with: pip install beautifulsoup4 html2markdown python-dateutil")
-    sys.exit(1)
+from attachment_index import AttachmentIndex, url_keys
+from fsutil import cache_dir
+from image_store import ImageStore
+from manifest import MANIFEST_NAME, ConversionManifest, hash_record
+from materialize import STRATEGIES, materialize
+from media_index import MediaIndex
+from wp_export import NAMESPACES, iter_export_items
+from wp_shortcodes import parse_shortcodes, replace_galleries
 
-# Define XML namespaces used in WordPress export
-NAMESPACES = {
-    'wp': 'http://wordpress.org/export/1.2/',
-    'content': 'http://purl.org/rss/1.0/modules/content/',
-    'dc': 'http://purl.org/dc/elements/1.1/',
-    'excerpt': 'http://wordpress.org/export/1.2/excerpt/',
-}
+# Upload folder (/YYYY/MM/) in a WordPress media URL
+YEAR_MONTH_PATTERN = re.compile(r'/(\d{4})/(\d{2})/')
+
+# HTML parsing and Markdown packages, imported by load_conversion_packages()
+BeautifulSoup = None
+html2markdown = None
+
+# html2markdown releases whose private _markdownify() tree_to_markdown() was
+# checked against; with any other, it uses the public convert()
+TREE_CONVERSION_VERSIONS = {'0.1.7'}
+markdownify_tree = None
+
+def load_conversion_packages():
+    """Import the packages needed to convert posts, on first use.
+    
+    They take longer to import than the rest of the script together, so
+    --help and argument errors do not pay for them.
+    """
+    global BeautifulSoup, html2markdown, markdownify_tree
+    if BeautifulSoup is not None:
+        return
+    
+    try:
+        from bs4 import BeautifulSoup as soup_class
+        import html2markdown as markdown_module
+    except ImportError:
+        print("Required packages missing. Install with: pip install beautifulsoup4 html2markdown")
+        sys.exit(1)
+    BeautifulSoup, html2markdown = soup_class, markdown_module
+    
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        installed = version('html2markdown')
+    except PackageNotFoundError:
+        installed = None
+    if installed in TREE_CONVERSION_VERSIONS:
+        markdownify_tree = getattr(markdown_module, '_markdownify', None)
+
+def tree_to_markdown(soup):
+    """Convert a parsed HTML tree to Markdown in place.
+    
+    Equivalent to html2markdown.convert(str(soup)), but converts the tree we
+    already have instead of serializing it and parsing it again, if the
+    installed html2markdown is one of TREE_CONVERSION_VERSIONS.
+    """
+    if markdownify_tree is None:
+        return html2markdown.convert(str(soup))
+    
+    markdownify_tree(soup)
+    markdown = str(soup).replace('\xa0', '&nbsp;')
+    markdown = re.sub(r'\n{3,}', r'\n\n', markdown)
+    
+    # Same placeholder handling as html2markdown.convert()
+    markdown = re.sub(r'&lt;&lt;&lt;FLOATING LINK: (.+)&gt;&gt;&gt;', r'<\1>', markdown)
+    parts = re.split(r'(&lt;&lt;&lt;BLOCKQUOTE: .*?&gt;&gt;&gt;)', markdown, flags=re.DOTALL)
+    for i, part in enumerate(parts):
+        if part.startswith('&lt;&lt;&lt;BLOCKQUOTE:'):
+            part = '> ' + part[len('&lt;&lt;&lt;BLOCKQUOTE:'):-len('&gt;&gt;&gt;')]
+            parts[i] = part.replace('\n', '\n> ')
+    return ''.join(parts).strip('\n')
+
+# Converter used by the worker processes of a parallel run
+_worker_converter = None
+
+def _init_worker(converter):
+    """Install the converter state shared by all posts in a worker process."""
+    global _worker_converter
+    load_conversion_packages()
+    _worker_converter = converter
+
+def _convert_in_worker(record):
+    """Convert one post record in a worker, capturing its console output."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            success = _worker_converter.convert_post_record(record)
+        except Exception as e:
+            print(f"Error converting post '{record.get('title')}': {e}")
+            success = False
+    return success, output.getvalue(), _worker_converter.post_result()
 
 class WordPressToJekyllConverter:
-    def __init__(self, xml_file, media_dir, output_dir=None, post_ids=None, date_after=None, date_before=None):
+    def __init__(self, xml_file, media_dir, output_dir=None, post_ids=None, date_after=None, date_before=None, stream=False, rebuild_media_index=False, jobs=1, force=False, link_mode='copy', dedupe=False, fetch_missing=False, fetch_connections=8):
         """Initialize the converter with file paths and filters."""
+        load_conversion_packages()
+        
         self.xml_file = xml_file
         self.media_dir = Path(media_dir)
         
@@ -66,8 +145,15 @@ class WordPressToJekyllConverter:
         self.jekyll_images_dir = jekyll_root / 'images'
         self.jekyll_images_dir.mkdir(exist_ok=True)
         
-        # Store attachment URL to file path mapping
-        self.attachment_map = {}
+        # Filename index of the media directory, cached between runs
+        self.media_index = MediaIndex(
+            self.media_dir,
+            cache_file=MediaIndex.default_cache_file(self.media_dir, cache_dir(jekyll_root))
+        )
+        self.rebuild_media_index = rebuild_media_index
+        
+        # Attachments by ID, parent post and normalized URL
+        self.attachments = AttachmentIndex()
         
         # Parse post IDs for filtering
         self.post_ids = set(post_ids) if post_ids else None
@@ -76,14 +162,54 @@ class WordPressToJekyllConverter:
         self.date_after = datetime.strptime(date_after, '%Y-%m-%d') if date_after else None
         self.date_before = datetime.strptime(date_before, '%Y-%m-%d') if date_before else None
         
-        # Regular expression to find image references in HTML
-        self.img_pattern = re.compile(r'<img[^>]+src="([^"]+)"[^>]*>')
+        # Use a single iterparse pass instead of loading the whole tree
+        self.stream = stream
         
-        # Map of post IDs to attachments
-        self.post_attachments = {}
-
+        # Number of worker processes used to convert posts
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        
+        # Manifest of previous conversions, used to skip unchanged posts and images
+        self.manifest = ConversionManifest(self.output_dir / MANIFEST_NAME)
+        self.force = force
+        
+        # How images are placed into the Jekyll images directory
+        self.link_mode = link_mode
+        
+        # Store each distinct image once under images/cas/ instead of per post
+        self.image_store = None
+        if dedupe:
+            self.image_store = ImageStore(self.jekyll_images_dir, cache_dir(jekyll_root) / 'image-digests.json')
+        
+        # Download attachments missing from the media export before converting
+        self.fetcher = None
+        if fetch_missing:
+            from wp_fetch import MediaFetcher
+            self.fetcher = MediaFetcher(self.media_dir, cache_dir(jekyll_root) / 'fetch-state.json', connections=fetch_connections)
+        
+        # (attachment ID, URL) of attachments that are not in the media directory
+        self.missing_attachments = []
+        
+        # Output file, images (target path to manifest entry) and the
+        # (source, target) pairs already placed by the current post
+        self.post_output = None
+        self.post_images = {}
+        self.post_copied = set()
+        self.post_materialized = {}
+        self.post_lookups = {}
+    
+    def load_media_index(self):
+        """Load the media filename index, rebuilding it if the media dir changed."""
+        self.media_index.load(rebuild=self.rebuild_media_index)
+        source = "cached" if self.media_index.from_cache else "scanned"
+        print(f"Media index: {len(self.media_index)} files ({source})")
+    
     def parse_wordpress_export(self):
         """Parse the WordPress export XML file."""
+        self.load_media_index()
+        
+        if self.stream:
+            return self.parse_wordpress_export_streaming()
+        
         try:
             tree = ET.parse(self.xml_file)
             root = tree.getroot()
@@ -106,6 +232,7 @@ class WordPressToJekyllConverter:
             converted_posts = 0
             
             # Process all posts based on filters
+            records = []
             for item in channel.findall('item'):
                 post_type = item.find('.//wp:post_type', NAMESPACES)
                 if post_type is not None and post_type.text == 'post':
@@ -113,8 +240,12 @@ class WordPressToJekyllConverter:
                     if post_status is not None and post_status.text == 'publish':
                         total_posts += 1
                         if self.should_process_post(item):
-                            if self.convert_post_to_jekyll(item):
-                                converted_posts += 1
+                            record = self.try_extract_post_record(item)
+                            if record:
+                                records.append(record)
+            
+            self.fetch_missing_attachments()
+            converted_posts = self.convert_posts(records)
             
             print(f"Conversion complete. Processed {converted_posts} of {total_posts} posts.")
             print(f"Jekyll posts saved to {self.output_dir}")
@@ -123,6 +254,161 @@ class WordPressToJekyllConverter:
             print(f"Error parsing WordPress export: {e}")
             sys.exit(1)
     
+    def parse_wordpress_export_streaming(self):
+        """Parse the WordPress export XML file in a single streaming pass.
+        
+        Every <item> is classified once: attachments only feed the attachment
+        maps, and posts that pass the filters are reduced to plain records and
+        spooled to a temporary file. The posts are converted once the stream is
+        exhausted, when all attachments are known.
+        """
+        try:
+            total_posts = 0
+            converted_posts = 0
+            
+            with tempfile.TemporaryFile(mode='w+', encoding='utf-8') as spool:
+                for item in iter_export_items(self.xml_file):
+                    post_type = item.findtext('.//wp:post_type', namespaces=NAMESPACES)
+                    if post_type == 'attachment':
+                        self.process_attachment_mapping(item)
+                        self.process_attachment(item)
+                    elif post_type == 'post':
+                        post_status = item.findtext('.//wp:status', namespaces=NAMESPACES)
+                        if post_status == 'publish':
+                            total_posts += 1
+                            if self.should_process_post(item):
+                                record = self.try_extract_post_record(item)
+                                if record:
+                                    spool.write(json.dumps(record) + '\n')
+                
+                self.fetch_missing_attachments()
+                spool.seek(0)
+                converted_posts = self.convert_posts(json.loads(line) for line in spool)
+            
+            print(f"Conversion complete. Processed {converted_posts} of {total_posts} posts.")
+            print(f"Jekyll posts saved to {self.output_dir}")
+            
+        except Exception as e:
+            print(f"Error parsing WordPress export: {e}")
+            sys.exit(1)
+    
+    def fetch_missing_attachments(self):
+        """Download attachments missing from the media directory and index them.
+        
+        Files are stored at their upload path (e.g. 2019/01/photo.jpg) below
+        the media directory, where later runs find them like any other media.
+        """
+        if not self.fetcher or not self.missing_attachments:
+            return
+        
+        downloads = {}
+        for attachment_id, url in self.missing_attachments:
+            rel_path = Path(*[part for part in url_keys(url)[0].split('/') if part not in ('', '.', '..')])
+            if rel_path.suffix:
+                downloads[url] = (attachment_id, rel_path)
+        
+        print(f"Fetching {len(downloads)} attachments missing from the media directory...")
+        fetched = set(self.fetcher.fetch_all([(url, rel_path) for url, (_, rel_path) in downloads.items()]))
+        
+        for url, (attachment_id, rel_path) in downloads.items():
+            if rel_path in fetched:
+                self.media_index.add(rel_path)
+                self.attachments.add(attachment_id, url, self.media_dir / rel_path)
+        self.media_index.save()
+        print(f"Fetched {len(fetched)} of {len(downloads)} missing attachments.")
+    
+    def convert_posts(self, records):
+        """Convert post records, serially or on a process pool; return the count.
+        
+        Posts whose source record, output file and images are unchanged since
+        the last run (according to the manifest) are skipped and counted as
+        processed. Each remaining record is a self-contained unit of work, so a
+        parallel run writes the same files as a serial one. Results and console
+        output are collected in the main process in the order of the records.
+        """
+        if not self.force:
+            self.manifest.load()
+        if self.image_store:
+            self.image_store.load()
+        
+        # Posts depend on the media tree and on where images are stored
+        fingerprint = self.media_index.fingerprint() + (':cas' if self.image_store else '')
+        
+        stats = {'converted': 0, 'unchanged': 0, 'skipped': 0, 'deduplicated': 0,
+                 'copy': 0, 'reflink': 0, 'hardlink': 0, 'bytes_written': 0, 'hits': 0, 'misses': 0}
+        
+        # Blobs written again by a worker that did not see another post store them
+        rewritten = set()
+        
+        def pending_records():
+            for record in records:
+                source_hash = hash_record(record, fingerprint)
+                if not self.force and self.manifest.is_post_current(record['post_id'], source_hash):
+                    output = Path(self.manifest.posts[record['post_id']]['output'])
+                    print(f"Unchanged, skipping: {output.name}")
+                    stats['unchanged'] += 1
+                    continue
+                yield record, source_hash
+        
+        def collect(record, source_hash, success, result):
+            if not success:
+                return
+            stats['converted'] += 1
+            for key, value in result['lookups'].items():
+                stats[key] += value
+            for key, value in result['materialized'].items():
+                stats[key] += value
+            if self.image_store:
+                for blob, how, bytes_written in self.image_store.merge(result['store']):
+                    stats[how] -= 1
+                    stats['bytes_written'] -= bytes_written
+                    stats['deduplicated'] += 1
+                    if how != 'skipped':
+                        rewritten.add(blob)
+            self.manifest.record_post(record['post_id'], source_hash, result['output'], result['images'])
+        
+        try:
+            if self.jobs == 1:
+                for record, source_hash in pending_records():
+                    success = self.convert_post_record(record)
+                    collect(record, source_hash, success, self.post_result())
+            else:
+                from concurrent.futures import ProcessPoolExecutor
+                pending = deque()
+                
+                def collect_next():
+                    record, source_hash, future = pending.popleft()
+                    success, output, result = future.result()
+                    sys.stdout.write(output)
+                    collect(record, source_hash, success, result)
+                
+                with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker, initargs=(self,)) as pool:
+                    for record, source_hash in pending_records():
+                        pending.append((record, source_hash, pool.submit(_convert_in_worker, record)))
+                        # Bound the number of queued records to keep memory flat
+                        if len(pending) >= self.jobs * 4:
+                            collect_next()
+                    
+                    while pending:
+                        collect_next()
+        finally:
+            # The last write of such a blob decides its mtime, not the last post recorded
+            for blob in rewritten:
+                entry = self.manifest.images.get(blob)
+                if entry:
+                    self.manifest.images[blob] = self.manifest.image_entry(Path(entry['source']), Path(blob), entry['sha256'])
+            self.manifest.save()
+            if self.image_store:
+                self.image_store.save()
+        
+        if stats['unchanged']:
+            print(f"Skipped {stats['unchanged']} unchanged posts.")
+        print(f"Images: {stats['copy']} copied, {stats['reflink']} reflinked, {stats['hardlink']} hardlinked, "
+              f"{stats['deduplicated']} deduplicated, {stats['skipped']} already up to date "
+              f"({stats['bytes_written'] / 1024 / 1024:.1f} MB written).")
+        print(f"Attachment index: {stats['hits']} hits, {stats['misses']} misses.")
+        return stats['converted'] + stats['unchanged']
+    
     def should_process_post(self, item):
         """Determine if post should be processed based on filters."""
         # Check post ID filter
@@ -150,11 +436,7 @@ class WordPressToJekyllConverter:
         if post_parent is not None and post_parent.text:
             parent_id = post_parent.text
             attachment_id = item.find('.//wp:post_id', NAMESPACES).text
-            
-            if parent_id not in self.post_attachments:
-                self.post_attachments[parent_id] = []
-            
-            self.post_attachments[parent_id].append(attachment_id)
+            self.attachments.add_child(parent_id, attachment_id)
     
     def process_attachment(self, item):
         """Process an attachment item and add it to the attachment map."""
@@ -167,81 +449,115 @@ class WordPressToJekyllConverter:
             filename = unquote(os.path.basename(parsed_url.path))
             
             # Check if file exists in media directory
-            year_month_pattern = re.compile(r'/(\d{4})/(\d{2})/')
-            year_month_match = year_month_pattern.search(parsed_url.path)
+            path = None
+            year_month_match = YEAR_MONTH_PATTERN.search(parsed_url.path)
             
             if year_month_match:
                 year, month = year_month_match.groups()
                 # Search for the file in the media directory structure
-                potential_paths = [
-                    self.media_dir / year / month / filename,
-                    self.media_dir / f"{year}-{month}" / filename,
-                    self.media_dir / year / filename,
-                ]
-                
-                for path in potential_paths:
-                    if path.exists():
-                        self.attachment_map[attachment_url] = path
-                        self.attachment_map[attachment_id] = path  # Also map by ID
-                        break
+                path = self.media_index.find_in(filename, [f"{year}/{month}", f"{year}-{month}", year])
             
             # If not found, try a more general search
-            if attachment_url not in self.attachment_map:
-                for root, _, files in os.walk(self.media_dir):
-                    if filename in files:
-                        path = Path(root) / filename
-                        self.attachment_map[attachment_url] = path
-                        self.attachment_map[attachment_id] = path  # Also map by ID
-                        break
+            if not path:
+                path = self.media_index.find(filename)
+            
+            if path:
+                self.attachments.add(attachment_id, attachment_url, path)
+            else:
+                self.missing_attachments.append((attachment_id, attachment_url))
             
         except Exception as e:
             print(f"Error processing attachment: {e}")
     
+    def extract_post_record(self, item):
+        """Extract everything needed to convert a post into a plain dict."""
+        title = item.find('title').text
+        if title is None:
+            title = "Untitled Post"
+        
+        # Get content
+        content_element = item.find('.//content:encoded', NAMESPACES)
+        content = content_element.text if content_element is not None and content_element.text else ""
+        
+        # Get excerpt
+        excerpt_element = item.find('.//excerpt:encoded', NAMESPACES)
+        excerpt = excerpt_element.text if excerpt_element is not None and excerpt_element.text else ""
+        
+        # Get categories and tags
+        categories = []
+        tags = []
+        
+        for cat in item.findall('category'):
+            domain = cat.get('domain', '')
+            if domain == 'category':
+                categories.append(cat.text)
+            elif domain == 'post_tag':
+                tags.append(cat.text)
+        
+        return {
+            'title': title,
+            'post_id': item.find('.//wp:post_id', NAMESPACES).text,
+            'post_date': item.find('.//wp:post_date', NAMESPACES).text,
+            'post_name': item.find('.//wp:post_name', NAMESPACES).text,
+            'content': content,
+            'excerpt': excerpt,
+            'categories': categories,
+            'tags': tags,
+        }
+    
+    def try_extract_post_record(self, item):
+        """Extract a post record, reporting the error and returning None on failure."""
+        try:
+            return self.extract_post_record(item)
+        except Exception as e:
+            print(f"Error converting post 'unknown': {e}")
+            return None
+    
     def convert_post_to_jekyll(self, item):
         """Convert a WordPress post to a Jekyll post."""
+        record = self.try_extract_post_record(item)
+        if not record:
+            return False
+        
+        return self.convert_post_record(record)
+    
+    def convert_post_record(self, record):
+        """Convert an extracted post record to a Jekyll post."""
+        # Attachments discovered while converting this post stay local to it,
+        # so that the result does not depend on which posts ran before
+        shared_attachments = self.attachments
+        self.attachments = shared_attachments.overlay()
+        self.post_output = None
+        self.post_images = {}
+        self.post_copied = set()
+        self.post_materialized = {}
         try:
-            # Extract post metadata
-            title = item.find('title').text
-            if title is None:
-                title = "Untitled Post"
-            
-            post_id = item.find('.//wp:post_id', NAMESPACES).text
+            return self._convert_post_record(record)
+        finally:
+            self.post_lookups = {'hits': self.attachments.hits, 'misses': self.attachments.misses}
+            self.attachments = shared_attachments
+    
+    def _convert_post_record(self, record):
+        """Convert a post record using the current attachment index."""
+        title = record['title']
+        try:
+            post_id = record['post_id']
             
             # Get post date
-            post_date = item.find('.//wp:post_date', NAMESPACES).text
-            date_obj = datetime.strptime(post_date, '%Y-%m-%d %H:%M:%S')
+            date_obj = datetime.strptime(record['post_date'], '%Y-%m-%d %H:%M:%S')
             
             # Format date for Jekyll filename and front matter
             date_str = date_obj.strftime('%Y-%m-%d')
             datetime_str = date_obj.strftime('%Y-%m-%d %H:%M:%S +0100')  # Adjust timezone if needed
             
-            # Get content
-            content_element = item.find('.//content:encoded', NAMESPACES)
-            content = content_element.text if content_element is not None and content_element.text else ""
-            
-            # Get excerpt
-            excerpt_element = item.find('.//excerpt:encoded', NAMESPACES)
-            excerpt = excerpt_element.text if excerpt_element is not None and excerpt_element.text else ""
-            
-            # Get categories and tags
-            categories = []
-            tags = []
-            
-            for cat in item.findall('category'):
-                domain = cat.get('domain', '')
-                if domain == 'category':
-                    categories.append(cat.text)
-                elif domain == 'post_tag':
-                    tags.append(cat.text)
-            
             # Process content: replace image URLs and convert to Markdown
-            content = self.process_content(content, date_obj, post_id)
+            content = self.process_content(record['content'], date_obj, post_id)
             
             # Create Jekyll front matter
-            front_matter = self.create_front_matter(title, datetime_str, categories, tags, excerpt)
+            front_matter = self.create_front_matter(title, datetime_str, record['categories'], record['tags'], record['excerpt'])
             
             # Create Jekyll post filename
-            post_name = item.find('.//wp:post_name', NAMESPACES).text
+            post_name = record['post_name']
             if not post_name:
                 # Generate slug from title
                 post_name = title.lower().replace(' ', '-')
@@ -255,14 +571,63 @@ class WordPressToJekyllConverter:
                 f.write(front_matter)
                 f.write('\n\n')
                 f.write(content)
+            self.post_output = str(post_path)
             
             print(f"Created Jekyll post: {filename}")
             return True
             
         except Exception as e:
-            print(f"Error converting post '{title if 'title' in locals() else 'unknown'}': {e}")
+            print(f"Error converting post '{title}': {e}")
             return False
     
+    def post_result(self):
+        """Return the output file and images produced by the last converted post."""
+        return {
+            'output': self.post_output,
+            'images': self.post_images,
+            'materialized': self.post_materialized,
+            'lookups': self.post_lookups,
+            'store': self.image_store.drain() if self.image_store else None,
+        }
+    
+    def count_materialized(self, key, amount=1):
+        """Add to the image statistics of the current post."""
+        self.post_materialized[key] = self.post_materialized.get(key, 0) + amount
+    
+    def copy_image(self, source_path, target_path):
+        """Copy an image into the Jekyll images directory; return its public URL.
+        
+        Images that are already up to date are not copied again. With the
+        content-addressed store enabled, target_path only becomes an alias and
+        the image is stored (at most once) under its content digest.
+        """
+        digest = None
+        if self.image_store:
+            alias = target_path.relative_to(self.jekyll_images_dir).as_posix()
+            target_path, digest = self.image_store.blob_path(source_path, alias)
+        url = '/images/' + target_path.relative_to(self.jekyll_images_dir).as_posix()
+        
+        if (source_path, target_path) in self.post_copied:
+            # The same image again in this post: counted the first time
+            return url
+        self.post_copied.add((source_path, target_path))
+        
+        entry = None if self.force else self.manifest.check_image(source_path, target_path)
+        how, bytes_written = 'skipped', 0
+        if entry is None and digest and target_path.exists():
+            # Another post (or another media file) already stored this content
+            entry = self.manifest.image_entry(source_path, target_path, digest)
+            how = 'deduplicated'
+        if entry is None:
+            how, bytes_written, sha256 = materialize(source_path, target_path, self.link_mode)
+            entry = self.manifest.image_entry(source_path, target_path, sha256 or digest)
+            self.count_materialized('bytes_written', bytes_written)
+        self.count_materialized(how)
+        if self.image_store:
+            self.image_store.placed(target_path, how, bytes_written)
+        self.post_images[str(target_path)] = entry
+        return url
+    
     def process_content(self, content, post_date, post_id):
         """Process post content: handle images, galleries, and convert to Markdown."""
         if not content:
@@ -271,234 +636,128 @@ class WordPressToJekyllConverter:
         # Create a year-month folder for this post's images
         year_month = post_date.strftime('%Y-%m-%d')
         post_images_dir = self.jekyll_images_dir / year_month
-        post_images_dir.mkdir(exist_ok=True)
+        if not self.image_store:
+            post_images_dir.mkdir(exist_ok=True)
         
         # Replace gallery shortcodes with actual images
         content = self.process_galleries(content, post_id, post_images_dir, year_month)
         
-        # Process inline images
-        content = self.process_images(content, post_images_dir, year_month, post_date)
+        # Parse once; every HTML transform below visits the same tree
+        visitors = [
+            lambda soup: self.process_images(soup, post_images_dir, year_month, post_date),  # Process inline images
+            self.clean_image_markup,        # Clean WordPress-specific image markup
+            self.group_consecutive_images,  # Group consecutive images for better layout
+        ]
+        soup = self.transform_html(content, visitors)
+        
+        # Converting the tree changes it in place, so keep its HTML for the
+        # fallback instead of running the visitors (and copying images) again
+        transformed = str(soup) if markdownify_tree is not None else None
         
         # Convert HTML to Markdown (optional)
         try:
-            content = html2markdown.convert(content)
+            return tree_to_markdown(soup)
         except Exception as e:
             print(f"Markdown conversion failed: {e}")
             # If conversion fails, keep HTML
-            pass
-        
-        return content
+            return transformed if transformed is not None else str(soup)
+    
+    def transform_html(self, content, visitors):
+        """Parse HTML once and apply each visitor to the tree in turn."""
+        soup = BeautifulSoup(content, 'html.parser')
+        for visitor in visitors:
+            soup = visitor(soup)
+        return soup
     
     def process_galleries(self, content, post_id, post_images_dir, year_month):
         """Replace gallery shortcodes with actual images."""
-        if post_id not in self.post_attachments:
+        if not self.attachments.has_children(post_id):
             return content
         
-        # First, handle the special case of Jetpack tiled gallery
-        jetpack_pattern = re.compile(r'<!-- wp:jetpack/tiled-gallery \{.*?"ids":\[([^\]]+)\].*? /-->')
-        jetpack_matches = jetpack_pattern.findall(content)
-        
-        # Also check for simple format
-        if not jetpack_matches:
-            simple_pattern = re.compile(r'<!-- wp:jetpack/tiled-gallery \{"ids":\[([^\]]+)\].*? /-->')
-            jetpack_matches = simple_pattern.findall(content)
-        
-        for ids_str in jetpack_matches:
-            # Get the full shortcode - try different patterns
-            shortcode = None
-            
-            # Try to find the exact shortcode in the content
-            patterns = [
-                r'<!-- wp:jetpack/tiled-gallery \{"ids":\[' + re.escape(ids_str) + r'\].*? /-->',
-                r'<!-- wp:jetpack/tiled-gallery \{.*?"ids":\[' + re.escape(ids_str) + r'\].*? /-->'
-            ]
-            
-            for pattern in patterns:
-                shortcode_pattern = re.compile(pattern)
-                shortcode_match = shortcode_pattern.search(content)
-                if shortcode_match:
-                    shortcode = shortcode_match.group(0)
-                    break
-            
-            # If we still can't find it, use a more general approach
-            if not shortcode:
-                # Just find any Jetpack tiled gallery shortcode
-                general_pattern = re.compile(r'<!-- wp:jetpack/tiled-gallery .*? /-->')
-                shortcode_match = general_pattern.search(content)
-                if shortcode_match:
-                    shortcode = shortcode_match.group(0)
-            
-            if shortcode:
-                # Clean up the IDs string (remove quotes and spaces)
-                ids_str = ids_str.replace('"', '').replace(' ', '')
-                attachment_ids = ids_str.split(',')
-                print(f"Found Jetpack gallery attachment IDs: {attachment_ids}")
-                
-                # Build image HTML for these attachments
-                gallery_html = "<div class='gallery'>\n"
-                for attachment_id in attachment_ids:
-                    if attachment_id in self.attachment_map:
-                        source_path = self.attachment_map[attachment_id]
-                        filename = source_path.name
-                        
-                        # Copy image to Jekyll images dir
-                        target_path = post_images_dir / filename
-                        try:
-                            shutil.copy2(source_path, target_path)
-                            print(f"Copied gallery image: {filename} to {target_path}")
-                            
-                            # Add image to gallery HTML
-                            gallery_html += f"<img src='/images/{year_month}/{filename}' alt='{filename}' />\n"
-                        except Exception as e:
-                            print(f"Error copying gallery image {source_path}: {e}")
-                            
-                    # Try to find the image by ID in the WP export
-                    else:
-                        print(f"Looking for attachment ID {attachment_id} for post {post_id}...")
-                        # Search for image URL in content
-                        img_id_pattern = re.compile(f'wp-image-{attachment_id}"[^>]*src="([^"]+)"')
-                        img_id_match = img_id_pattern.search(content)
-                        
-                        if img_id_match:
-                            img_url = img_id_match.group(1)
-                            print(f"Found image URL: {img_url}")
-                            
-                            # Parse URL to get filename
-                            parsed_url = urlparse(img_url)
-                            filename = unquote(os.path.basename(parsed_url.path))
-                            
-                            # Look for the file in the media directory
-                            for root, _, files in os.walk(self.media_dir):
-                                if filename in files:
-                                    source_path = Path(root) / filename
-                                    # Add to attachment map for future use
-                                    self.attachment_map[attachment_id] = source_path
-                                    self.attachment_map[img_url] = source_path
-                                    
-                                    # Copy image to Jekyll images dir
-                                    target_path = post_images_dir / filename
-                                    try:
-                                        shutil.copy2(source_path, target_path)
-                                        print(f"Copied gallery image: {filename} to {target_path}")
-                                        
-                                        # Add image to gallery HTML
-                                        gallery_html += f"<img src='/images/{year_month}/{filename}' alt='{filename}' />\n"
-                                        break
-                                    except Exception as e:
-                                        print(f"Error copying gallery image {source_path}: {e}")
-                
-                gallery_html += "</div>"
-                
-                # Replace gallery shortcode with actual images
-                content = content.replace(shortcode, gallery_html)
-        
-        # Now handle standard gallery shortcodes
-        gallery_pattern = re.compile(r'\[gallery([^\]]*)\]')
-        gallery_matches = gallery_pattern.findall(content)
+        # One scan finds every gallery and every wp-image-N source in the post
+        galleries, image_sources = parse_shortcodes(content)
+        if not galleries:
+            return content
         
-        for gallery_attrs in gallery_matches:
-            shortcode = f"[gallery{gallery_attrs}]"
-            
-            # Parse gallery attributes to get IDs
-            ids_pattern = re.compile(r'ids="([^"]+)"')
-            ids_match = ids_pattern.search(gallery_attrs)
-            
-            attachment_ids = []
-            if ids_match:
+        def render(gallery):
+            if gallery.kind == 'jetpack':
+                print(f"Found Jetpack gallery attachment IDs: {gallery.ids}")
+                attachment_ids = gallery.ids
+            elif gallery.ids is not None:
                 # Use specified IDs
-                ids_str = ids_match.group(1)
-                # Clean up the IDs string (remove quotes and spaces)
-                ids_str = ids_str.replace('"', '').replace(' ', '')
-                attachment_ids = ids_str.split(',')
-                print(f"Found gallery attachment IDs: {attachment_ids}")
+                print(f"Found gallery attachment IDs: {gallery.ids}")
+                attachment_ids = gallery.ids
             else:
                 # Use all attachments for this post
-                attachment_ids = self.post_attachments[post_id]
-            
-            # Build image HTML for these attachments
-            gallery_html = "<div class='gallery'>\n"
-            for attachment_id in attachment_ids:
-                if attachment_id in self.attachment_map:
-                    source_path = self.attachment_map[attachment_id]
-                    filename = source_path.name
-                    
-                    # Copy image to Jekyll images dir
-                    target_path = post_images_dir / filename
-                    try:
-                        shutil.copy2(source_path, target_path)
-                        print(f"Copied gallery image: {filename} to {target_path}")
-                        
-                        # Add image to gallery HTML
-                        gallery_html += f"<img src='/images/{year_month}/{filename}' alt='{filename}' />\n"
-                    except Exception as e:
-                        print(f"Error copying gallery image {source_path}: {e}")
-                        
+                attachment_ids = self.attachments.children(post_id)
+            return self.render_gallery(attachment_ids, image_sources, post_id, post_images_dir)
+        
+        # Replace gallery shortcodes with actual images
+        return replace_galleries(content, galleries, render)
+    
+    def render_gallery(self, attachment_ids, image_sources, post_id, post_images_dir):
+        """Copy the images of a gallery and return its HTML."""
+        gallery_html = "<div class='gallery'>\n"
+        for attachment_id in attachment_ids:
+            source_path = self.attachments.get(attachment_id)
+            if not source_path:
                 # Try to find the image by ID in the WP export
-                elif post_id in self.post_attachments:
-                    print(f"Looking for attachment ID {attachment_id} for post {post_id}...")
-                    # Search for image URL in content
-                    img_id_pattern = re.compile(f'wp-image-{attachment_id}"[^>]*src="([^"]+)"')
-                    img_id_match = img_id_pattern.search(content)
-                    
-                    if img_id_match:
-                        img_url = img_id_match.group(1)
-                        print(f"Found image URL: {img_url}")
-                        
-                        # Parse URL to get filename
-                        parsed_url = urlparse(img_url)
-                        filename = unquote(os.path.basename(parsed_url.path))
-                        
-                        # Look for the file in the media directory
-                        for root, _, files in os.walk(self.media_dir):
-                            if filename in files:
-                                source_path = Path(root) / filename
-                                # Add to attachment map for future use
-                                self.attachment_map[attachment_id] = source_path
-                                self.attachment_map[img_url] = source_path
-                                
-                                # Copy image to Jekyll images dir
-                                target_path = post_images_dir / filename
-                                try:
-                                    shutil.copy2(source_path, target_path)
-                                    print(f"Copied gallery image: {filename} to {target_path}")
-                                    
-                                    # Add image to gallery HTML
-                                    gallery_html += f"<img src='/images/{year_month}/{filename}' alt='{filename}' />\n"
-                                    break
-                                except Exception as e:
-                                    print(f"Error copying gallery image {source_path}: {e}")
-            
-            gallery_html += "</div>"
-            
-            # Replace gallery shortcode with actual images
-            content = content.replace(shortcode, gallery_html)
-        
-        return content
-    
-    def process_images(self, content, post_images_dir, year_month, post_date):
-        """Process images in content and copy them to Jekyll images directory."""
-        if not content:
-            return ""
+                print(f"Looking for attachment ID {attachment_id} for post {post_id}...")
+                img_url = image_sources.get(attachment_id)
+                if not img_url:
+                    continue
+                print(f"Found image URL: {img_url}")
+                
+                # Parse URL to get filename
+                parsed_url = urlparse(img_url)
+                filename = unquote(os.path.basename(parsed_url.path))
+                
+                # Look for the file in the media directory
+                source_path = self.media_index.find(filename)
+                if not source_path:
+                    continue
+                
+                # Add to attachment index for future use
+                self.attachments.add_id(attachment_id, source_path)
+                self.attachments.add_url(img_url, source_path)
+            
+            # Copy image to Jekyll images dir
+            filename = source_path.name
+            target_path = post_images_dir / filename
+            try:
+                image_url = self.copy_image(source_path, target_path)
+                print(f"Copied gallery image: {filename} to {image_url}")
+                
+                # Add image to gallery HTML
+                gallery_html += f"<img src='{image_url}' alt='{filename}' />\n"
+            except Exception as e:
+                print(f"Error copying gallery image {source_path}: {e}")
         
+        gallery_html += "</div>"
+        return gallery_html
+    
+    def process_images(self, soup, post_images_dir, year_month, post_date):
+        """Process images in the parsed content and copy them to Jekyll images directory."""
         # Find all image references
-        soup = BeautifulSoup(content, 'html.parser')
         for img in soup.find_all('img'):
             src = img.get('src', '')
             
-            if src in self.attachment_map:
+            # A resized copy the post uses is kept if it is on disk, so only
+            # the exact URL is looked up here; other sizes are the fallback
+            source_path = self.attachments.resolve(src, sizes=False) if src else None
+            if source_path:
                 # We have this image locally
-                source_path = self.attachment_map[src]
                 
                 # Get filename and copy to Jekyll images dir
                 filename = source_path.name
                 target_path = post_images_dir / filename
                 
                 try:
-                    shutil.copy2(source_path, target_path)
-                    print(f"Copied image: {filename} to {target_path}")
+                    image_url = self.copy_image(source_path, target_path)
+                    print(f"Copied image: {filename} to {image_url}")
                     
                     # Update image src to Jekyll path
-                    img['src'] = f"/images/{year_month}/{filename}"
+                    img['src'] = image_url
                 except Exception as e:
                     print(f"Error copying image {source_path}: {e}")
             else:
@@ -518,49 +777,40 @@ class WordPressToJekyllConverter:
                         year_path = post_date.strftime('%Y')
                         
                         # Priority search order: exact date match > year match > any match
-                        search_paths = [
-                            self.media_dir / year_month_path,        # e.g., 2011/03/
-                            self.media_dir / year_path,              # e.g., 2011/
-                            self.media_dir                           # fallback: search all
-                        ]
+                        source_path = self.media_index.find(filename, prefixes=[
+                            f"{year_month_path}/",                   # e.g., 2011/03/
+                            f"{year_path}/",                         # e.g., 2011/
+                        ])
+                        
+                        if source_path:
+                            # Add to attachment index for future use
+                            self.attachments.add_url(src, source_path)
+                        else:
+                            # Not in this size: use another size of the same attachment
+                            source_path = self.attachments.other_size(src)
+                            if source_path:
+                                filename = source_path.name
                         
                         found = False
-                        for search_path in search_paths:
-                            if search_path.exists():
-                                for root, _, files in os.walk(search_path):
-                                    if filename in files:
-                                        source_path = Path(root) / filename
-                                        # Add to attachment map for future use
-                                        self.attachment_map[src] = source_path
-                                        
-                                        # Copy image to Jekyll images dir
-                                        target_path = post_images_dir / filename
-                                        try:
-                                            shutil.copy2(source_path, target_path)
-                                            print(f"Copied image: {filename} to {target_path} (from {root})")
-                                            
-                                            # Update image src to Jekyll path
-                                            img['src'] = f"/images/{year_month}/{filename}"
-                                            found = True
-                                            break
-                                        except Exception as e:
-                                            print(f"Error copying image {source_path}: {e}")
+                        if source_path:
+                            # Copy image to Jekyll images dir
+                            target_path = post_images_dir / filename
+                            try:
+                                image_url = self.copy_image(source_path, target_path)
+                                print(f"Copied image: {filename} to {image_url} (from {source_path.parent})")
                                 
-                                if found:
-                                    break
+                                # Update image src to Jekyll path
+                                img['src'] = image_url
+                                found = True
+                            except Exception as e:
+                                print(f"Error copying image {source_path}: {e}")
                         
                         if not found:
                             print(f"Warning: Image {filename} not found in any date-appropriate directory")
                 except Exception as e:
                     print(f"Error processing image URL {src}: {e}")
         
-        # Clean WordPress-specific image markup
-        soup = self.clean_image_markup(soup)
-        
-        # Group consecutive images for better layout
-        soup = self.group_consecutive_images(soup)
-        
-        return str(soup)
+        return soup
     
     def clean_image_markup(self, soup):
         """Clean WordPress-specific image markup and improve layout"""
@@ -601,33 +851,53 @@ class WordPressToJekyllConverter:
         return soup
     
     def group_consecutive_images(self, soup):
-        """Group consecutive images for better layout"""
+        """Group consecutive images for better layout
+        
+        Runs of sibling img tags are collected in a single pass over the tree
+        and wrapped afterwards. A parent with runs has its children detached
+        from the front and appended again, with each run inside a wrapper:
+        bs4 finds the first child immediately, so this keeps the cost linear
+        in the size of the post and avoids mutating the tree while it is
+        being walked.
+        """
         
         # Find sequences of img tags that are siblings
+        img_runs = []
         for parent in soup.find_all():
-            children = list(parent.children)
-            img_groups = []
-            current_group = []
-            
-            for child in children:
-                if hasattr(child, 'name') and child.name == 'img':
-                    current_group.append(child)
+            runs = []
+            run_start = None
+            for index, child in enumerate(parent.contents):
+                if child.name == 'img':
+                    if run_start is None:
+                        run_start = index
                 else:
-                    if len(current_group) > 1:
-                        img_groups.append(current_group)
-                    current_group = []
-            
-            # Handle final group
-            if len(current_group) > 1:
-                img_groups.append(current_group)
-            
-            # Wrap groups in divs for better styling with left alignment
-            for group in img_groups:
-                if len(group) > 1:
-                    wrapper = soup.new_tag('div', style='text-align: left !important; margin: 20px 0; display: block !important;')
-                    group[0].insert_before(wrapper)
-                    for img in group:
-                        wrapper.append(img)
+                    if run_start is not None and index - run_start > 1:
+                        runs.append((run_start, index))
+                    run_start = None
+            
+            # Handle final run
+            if run_start is not None and len(parent.contents) - run_start > 1:
+                runs.append((run_start, len(parent.contents)))
+            if runs:
+                img_runs.append((parent, runs))
+        
+        # Wrap runs in divs for better styling with left alignment
+        for parent, runs in img_runs:
+            children = list(parent.contents)
+            for child in children:
+                child.extract()
+            
+            position = 0
+            for start, end in runs:
+                for child in children[position:start]:
+                    parent.append(child)
+                wrapper = soup.new_tag('div', style='text-align: left !important; margin: 20px 0; display: block !important;')
+                for img in children[start:end]:
+                    wrapper.append(img)
+                parent.append(wrapper)
+                position = end
+            for child in children[position:]:
+                parent.append(child)
         
         return soup
     
@@ -668,6 +938,18 @@ def main():
     parser.add_argument('--post-ids', help='Comma-separated list of post IDs to convert')
     parser.add_argument('--date-after', help='Only convert posts after this date (YYYY-MM-DD)')
     parser.add_argument('--date-before', help='Only convert posts before this date (YYYY-MM-DD)')
+    parser.add_argument('--stream', action='store_true', help='Parse the export in a single streaming pass (for very large exports)')
+    parser.add_argument('--rebuild-media-index', action='store_true', help='Rescan the media directory instead of using the cached index')
+    parser.add_argument('--force', action='store_true', help='Reconvert all posts and recopy all images, ignoring the manifest')
+    parser.add_argument('--link-mode', choices=STRATEGIES, default='copy',
+                        help='How images are placed in the images directory: copy, reflink, hardlink, '
+                             'or auto (reflink, then hardlink, then copy). Default: copy')
+    parser.add_argument('--dedupe', action='store_true',
+                        help='Store each distinct image once under images/cas/ and link all posts to it')
+    parser.add_argument('--fetch-missing', action='store_true',
+                        help='Download attachments missing from the media directory before converting')
+    parser.add_argument('--fetch-connections', type=int, default=8, help='Concurrent downloads for --fetch-missing (default: 8)')
+    parser.add_argument('--jobs', type=int, default=1, help='Number of worker processes for converting posts (0 = one per CPU, default: 1)')
     
     args = parser.parse_args()
     
@@ -680,7 +962,15 @@ def main():
         output_dir=args.output_dir,
         post_ids=post_ids,
         date_after=args.date_after,
-        date_before=args.date_before
+        date_before=args.date_before,
+        stream=args.stream,
+        rebuild_media_index=args.rebuild_media_index,
+        jobs=args.jobs,
+        force=args.force,
+        link_mode=args.link_mode,
+        dedupe=args.dedupe,
+        fetch_missing=args.fetch_missing,
+        fetch_connections=args.fetch_connections
     )
     
     converter.parse_wordpress_export()